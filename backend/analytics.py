@@ -0,0 +1,233 @@
+import datetime
+import threading
+import time
+import numpy as np
+from flask import current_app
+from metrics import CACHE_LOOKUPS
+from models import Certificate
+
+GRANULARITIES = ("day", "week", "month")
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _to_day(value):
+    """Days since 1970-01-01 for a date"""
+    return (value - _EPOCH).days
+
+
+def _day_to_date(day):
+    return _EPOCH + datetime.timedelta(days=int(day))
+
+
+def _bucket_ids(days, granularity):
+    """
+    Map day numbers to bucket numbers, vectorized
+
+    day: the day itself; week: ISO weeks starting on Monday (1970-01-01 was a
+    Thursday, hence the +3); month: months since 1970-01.
+    """
+    if granularity == "day":
+        return days
+    if granularity == "week":
+        return (days + 3) // 7
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _bucket_label(bucket, granularity):
+    if granularity == "day":
+        return _day_to_date(bucket).isoformat()
+    if granularity == "week":
+        return _day_to_date(bucket * 7 - 3).isoformat()  # Monday of the week
+    return str(np.datetime64(int(bucket), "M"))
+
+
+class CertificateSnapshot:
+    """
+    Columnar copy of the certificate table
+
+    Issue dates are int64 day numbers, issuance times int64 epoch seconds
+    (sorted copy kept for rate lookups), degrees and issuers are dictionary
+    encoded as int32 codes into the degrees / issuers lists.
+    """
+
+    def __init__(self, session, batch_size=5000):
+        """Load every certificate through a streaming cursor"""
+        degree_codes = {}
+        issuer_codes = {}
+        issue_days = []
+        issued_at = []
+        degrees = []
+        issuers = []
+        revoked = []
+        revoked_days = []
+
+        query = session.query(
+            Certificate.issue_date,
+            Certificate.issued_at,
+            Certificate.degree,
+            Certificate.created_by,
+            Certificate.status,
+            Certificate.revoked_at
+        ).yield_per(batch_size)
+
+        for issue_date, issued, degree, issuer, status, revoked_at in query:
+            issue_days.append(_to_day(issue_date))
+            issued_at.append(int(issued.replace(tzinfo=datetime.timezone.utc).timestamp()) if issued else -1)
+            degrees.append(degree_codes.setdefault(degree, len(degree_codes)))
+            issuers.append(issuer_codes.setdefault(issuer, len(issuer_codes)))
+            is_revoked = status == 'revoked'
+            revoked.append(is_revoked)
+            # revoked_at is an ISO timestamp string; -1 when unknown or active
+            revoked_days.append(
+                _to_day(datetime.date.fromisoformat(revoked_at[:10])) if is_revoked and revoked_at else -1
+            )
+
+        self.issue_days = np.array(issue_days, dtype=np.int64)
+        self.issued_at = np.array(issued_at, dtype=np.int64)
+        self.issued_at_sorted = np.sort(self.issued_at[self.issued_at >= 0])
+        self.degree_codes = np.array(degrees, dtype=np.int32)
+        self.issuer_codes = np.array(issuers, dtype=np.int32)
+        self.revoked = np.array(revoked, dtype=bool)
+        self.revoked_days = np.array(revoked_days, dtype=np.int64)
+        self.degrees = list(degree_codes)
+        self.issuers = list(issuer_codes)
+        self.taken_at = datetime.datetime.utcnow()
+        self.taken_at_monotonic = time.monotonic()
+
+    def __len__(self):
+        return len(self.issue_days)
+
+    def trends(self, start_day, end_day, granularity):
+        """
+        Certificates issued and revoked per time bucket between two day numbers (inclusive)
+
+        Returns:
+            dict: buckets (labels), issued, revoked, active_issued and cumulative_issued
+        """
+        first = int(_bucket_ids(np.array([start_day], dtype=np.int64), granularity)[0])
+        last = int(_bucket_ids(np.array([end_day], dtype=np.int64), granularity)[0])
+        size = last - first + 1
+
+        def histogram(days, mask=None):
+            in_window = (days >= start_day) & (days <= end_day)
+            if mask is not None:
+                in_window &= mask
+            return np.bincount(_bucket_ids(days[in_window], granularity) - first, minlength=size)[:size]
+
+        issued = histogram(self.issue_days)
+        issued_then_revoked = histogram(self.issue_days, self.revoked)
+        revoked = histogram(self.revoked_days, self.revoked_days >= 0)
+        issued_before = int(np.count_nonzero(self.issue_days < start_day))
+
+        return {
+            "buckets": [_bucket_label(bucket, granularity) for bucket in range(first, last + 1)],
+            "issued": issued.tolist(),
+            "revoked": revoked.tolist(),
+            "active_issued": (issued - issued_then_revoked).tolist(),
+            "cumulative_issued": (np.cumsum(issued) + issued_before).tolist()
+        }
+
+    def distribution(self, codes, names, mask, top):
+        """Top values of a dictionary-encoded column among rows selected by mask"""
+        counts = np.bincount(codes[mask], minlength=len(names))
+        total = int(counts.sum())
+        order = np.argsort(-counts, kind="stable")[:top]
+        return [
+            {
+                "name": names[code],
+                "count": int(counts[code]),
+                "share": round(float(counts[code]) / total, 4) if total else 0.0
+            }
+            for code in order if counts[code] > 0
+        ]
+
+    def issuance_rates(self, now_seconds):
+        """Certificates recorded in trailing windows, via binary search on sorted issuance times"""
+        rates = {}
+        for name, seconds in (("last_hour", 3600), ("last_24_hours", 86400), ("last_7_days", 7 * 86400), ("last_30_days", 30 * 86400)):
+            count = int(
+                np.searchsorted(self.issued_at_sorted, now_seconds, side="right")
+                - np.searchsorted(self.issued_at_sorted, now_seconds - seconds, side="right")
+            )
+            rates[name] = {"count": count, "per_day": round(count * 86400 / seconds, 2)}
+        return rates
+
+
+class AnalyticsEngine:
+    """Keeps a CertificateSnapshot and refreshes it once it is older than max_age seconds"""
+
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, session, force=False):
+        """Current snapshot, rebuilt if missing or stale (one rebuild at a time)"""
+        snapshot = self._snapshot
+        if not force and snapshot is not None and time.monotonic() - snapshot.taken_at_monotonic < self.max_age:
+            CACHE_LOOKUPS.inc("analytics_snapshot", "hit")
+            return snapshot
+
+        CACHE_LOOKUPS.inc("analytics_snapshot", "miss")
+        with self._lock:
+            snapshot = self._snapshot
+            if force or snapshot is None or time.monotonic() - snapshot.taken_at_monotonic >= self.max_age:
+                snapshot = CertificateSnapshot(session)
+                self._snapshot = snapshot
+        return snapshot
+
+    def report(self, session, window_days, granularity, top, today=None, refresh=False):
+        """
+        Compute the /analytics/live payload
+
+        Args:
+            session: Database session (used only when the snapshot is refreshed)
+            window_days (int): Length of the trend window, ending today
+            granularity (str): "day", "week" or "month"
+            top (int): Number of entries in each distribution
+            refresh (bool): Rebuild the snapshot even if it is still fresh
+
+        Returns:
+            dict: snapshot, window, trends, distributions and issuance_rates
+        """
+        snapshot = self.snapshot(session, force=refresh)
+        today = today or datetime.date.today()
+        end_day = _to_day(today)
+        start_day = end_day - window_days + 1
+        in_window = (snapshot.issue_days >= start_day) & (snapshot.issue_days <= end_day)
+        revoked_count = int(np.count_nonzero(snapshot.revoked))
+
+        return {
+            "snapshot": {
+                "taken_at": snapshot.taken_at.isoformat(),
+                "age_seconds": round(time.monotonic() - snapshot.taken_at_monotonic, 3),
+                "certificates": len(snapshot),
+                "max_age_seconds": self.max_age
+            },
+            "window": {
+                "start": _day_to_date(start_day).isoformat(),
+                "end": today.isoformat(),
+                "days": window_days,
+                "granularity": granularity
+            },
+            "trends": snapshot.trends(start_day, end_day, granularity),
+            "distributions": {
+                "degrees": snapshot.distribution(snapshot.degree_codes, snapshot.degrees, in_window, top),
+                "issuers": snapshot.distribution(snapshot.issuer_codes, snapshot.issuers, in_window, top),
+                "status": {
+                    "active": len(snapshot) - revoked_count,
+                    "revoked": revoked_count
+                }
+            },
+            "issuance_rates": snapshot.issuance_rates(int(time.time()))
+        }
+
+
+def get_analytics_engine():
+    """Get the application's analytics engine, creating it on first use"""
+    engine = current_app.extensions.get("analytics_engine")
+    if engine is None:
+        engine = AnalyticsEngine(current_app.config.get("ANALYTICS_SNAPSHOT_MAX_AGE", 60))
+        current_app.extensions["analytics_engine"] = engine
+    return engine
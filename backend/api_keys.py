@@ -0,0 +1,134 @@
+import collections
+import datetime
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from flask import current_app
+from database import db
+from metrics import CACHE_LOOKUPS
+from models import ApiKey
+
+# Request header carrying the key
+API_KEY_HEADER = "X-API-Key"
+
+# What a key may be used for
+API_KEY_SCOPES = ("verify", "search")
+
+# Keys look like bcv_<prefix>_<secret>; the prefix is stored in clear for lookup
+KEY_MARKER = "bcv"
+
+ApiKeyIdentity = collections.namedtuple("ApiKeyIdentity", ["id", "prefix", "name", "scopes", "rate_limit"])
+
+
+def hash_api_key(raw_key):
+    """SHA-256 of a full key (keys are random, so a slow password hash is not needed)"""
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+def generate_api_key():
+    """
+    Create a new random key
+
+    Returns:
+        tuple: (raw_key, prefix) - the raw key is shown to the caller once
+    """
+    prefix = secrets.token_hex(6)
+    return f"{KEY_MARKER}_{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+
+def parse_prefix(raw_key):
+    """The lookup prefix of a key, or None if it is malformed"""
+    parts = raw_key.split("_", 2)
+    if len(parts) != 3 or parts[0] != KEY_MARKER or not parts[1] or not parts[2]:
+        return None
+    return parts[1]
+
+
+def create_api_key(name, scopes, created_by, rate_limit=None):
+    """
+    Store a new key (the caller commits)
+
+    Returns:
+        tuple: (ApiKey row, raw_key)
+    """
+    raw_key, prefix = generate_api_key()
+    key = ApiKey(
+        prefix=prefix,
+        key_hash=hash_api_key(raw_key),
+        name=name,
+        scopes=",".join(scopes),
+        rate_limit=rate_limit,
+        created_by=created_by,
+        created_at=datetime.datetime.utcnow().isoformat()
+    )
+    db.session.add(key)
+    return key, raw_key
+
+
+class ApiKeyAuthenticator:
+    """
+    Validates API keys with an in-process LRU in front of the database
+
+    A key seen in the last ttl seconds is accepted with a dict lookup; other
+    keys cost one query on the unique prefix index and a SHA-256 comparison.
+    Revocations take effect at once in the revoking process and within ttl
+    seconds in the others.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._cache = collections.OrderedDict()  # raw key -> (identity, valid until)
+        self._lock = threading.Lock()
+
+    def authenticate(self, raw_key):
+        """
+        Resolve a raw key to its identity
+
+        Returns:
+            ApiKeyIdentity or None if the key is unknown, malformed or revoked
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(raw_key)
+            if cached is not None and cached[1] > now:
+                self._cache.move_to_end(raw_key)
+                CACHE_LOOKUPS.inc("api_key", "hit")
+                return cached[0]
+
+        CACHE_LOOKUPS.inc("api_key", "miss")
+
+        prefix = parse_prefix(raw_key)
+        if prefix is None:
+            return None
+        key = ApiKey.query.filter_by(prefix=prefix).first()
+        if key is None or key.revoked_at or not hmac.compare_digest(key.key_hash, hash_api_key(raw_key)):
+            return None
+
+        identity = ApiKeyIdentity(key.id, key.prefix, key.name, frozenset(key.scopes.split(",")), key.rate_limit)
+        with self._lock:
+            self._cache[raw_key] = (identity, now + self.ttl)
+            self._cache.move_to_end(raw_key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return identity
+
+    def invalidate(self, prefix):
+        """Forget cached entries for a key (after revoking it)"""
+        with self._lock:
+            for raw_key in [raw_key for raw_key, (identity, _) in self._cache.items() if identity.prefix == prefix]:
+                del self._cache[raw_key]
+
+
+def get_api_key_authenticator():
+    """Get the application's API key authenticator, creating it on first use"""
+    authenticator = current_app.extensions.get("api_key_authenticator")
+    if authenticator is None:
+        authenticator = ApiKeyAuthenticator(
+            current_app.config.get("API_KEY_CACHE_SIZE", 1024),
+            current_app.config.get("API_KEY_CACHE_TTL", 60)
+        )
+        current_app.extensions["api_key_authenticator"] = authenticator
+    return authenticator
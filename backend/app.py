@@ -1,9 +1,15 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from database import db
+from database import REPLICA_BIND, db, configure_engine, engine_options, init_read_routing
 from auth import auth_bp, is_token_blacklisted
 from certificates import cert_bp
+from rate_limit import init_rate_limiting
+from metrics import init_metrics
+from profiling import init_profiling
+from query_monitor import init_query_monitor
+from health import get_health_monitor, init_health
+from migrations import current_version, pending_migrations, upgrade as upgrade_schema
 import os
 import datetime
 from dotenv import load_dotenv
@@ -23,11 +29,137 @@ def create_app():
     db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'app.db')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', f'sqlite:///{db_path}')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # Engine tuning: "auto" applies the sqlite (WAL + pragmas) or postgres (pool) profile
+    app.config['DB_ENGINE_PROFILE'] = os.getenv('DB_ENGINE_PROFILE', 'auto')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    app.config['SQLITE_CACHE_SIZE_KB'] = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_TIMEOUT'] = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config['SQLALCHEMY_DATABASE_URI'], app.config['DB_ENGINE_PROFILE'], app.config
+    )
+    
+    # Optional read replica for read-only endpoints (see database.read_only)
+    app.config['DATABASE_REPLICA_URL'] = os.getenv('DATABASE_REPLICA_URL')
+    app.config['READ_REPLICA_STICKY_SECONDS'] = int(os.getenv('READ_REPLICA_STICKY_SECONDS', 5))
+    if app.config['DATABASE_REPLICA_URL']:
+        app.config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND: {
+                "url": app.config['DATABASE_REPLICA_URL'],
+                **engine_options(app.config['DATABASE_REPLICA_URL'], app.config['DB_ENGINE_PROFILE'], app.config)
+            }
+        }
+    
+    # Apply pending schema migrations at startup; set to false when they run at deploy time
+    # (python migrate_database.py upgrade), e.g. with several workers starting at once
+    app.config['DB_AUTO_MIGRATE'] = os.getenv('DB_AUTO_MIGRATE', 'true').lower() == 'true'
+    
+    # Password hashing runs in a process pool; when max_pending hashes are queued,
+    # /login and /register answer 503 with Retry-After
+    app.config['PASSWORD_HASH_ALGORITHM'] = os.getenv('PASSWORD_HASH_ALGORITHM', 'pbkdf2')  # or bcrypt
+    app.config['PASSWORD_HASH_COST'] = int(os.getenv('PASSWORD_HASH_COST', 0)) or None  # None = algorithm default
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))  # 0 = hash on the request thread
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0)) or None  # None = 4 per worker
+    app.config['PASSWORD_HASH_WAIT_SECONDS'] = float(os.getenv('PASSWORD_HASH_WAIT_SECONDS', 0.5))
+    
+    # Validated API keys kept in memory; a revocation reaches other workers within the TTL
+    app.config['API_KEY_CACHE_SIZE'] = int(os.getenv('API_KEY_CACHE_SIZE', 1024))
+    app.config['API_KEY_CACHE_TTL'] = int(os.getenv('API_KEY_CACHE_TTL', 60))
+    
+    # Prometheus metrics on /metrics (per process)
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Slow query log and per-endpoint query budgets, e.g. QUERY_BUDGETS="cert.get_stats=8;cert.search_certificates=4".
+    # Requests over budget, or repeating one statement more than QUERY_REPEAT_THRESHOLD times
+    # (N+1), are logged; QUERY_BUDGET_ASSERT=true raises instead (for tests).
+    app.config['QUERY_MONITOR_ENABLED'] = os.getenv('QUERY_MONITOR_ENABLED', 'true').lower() == 'true'
+    app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', 100))
+    app.config['QUERY_BUDGET_DEFAULT'] = int(os.getenv('QUERY_BUDGET_DEFAULT', 20))
+    app.config['QUERY_BUDGETS'] = os.getenv('QUERY_BUDGETS', '')
+    app.config['QUERY_REPEAT_THRESHOLD'] = int(os.getenv('QUERY_REPEAT_THRESHOLD', 10))
+    app.config['QUERY_BUDGET_ASSERT'] = os.getenv('QUERY_BUDGET_ASSERT', 'false').lower() == 'true'
+    
+    # Request profiling: requests sent by an admin with "X-Profile: 1", plus a random
+    # PROFILING_SAMPLE_RATE share of all requests, are run under cProfile with their SQL timed
+    app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    app.config['PROFILING_SAMPLE_RATE'] = float(os.getenv('PROFILING_SAMPLE_RATE', 0.0))
+    app.config['PROFILING_DIR'] = os.getenv(
+        'PROFILING_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'profiles')
+    )
+    app.config['PROFILING_MAX_STORED'] = int(os.getenv('PROFILING_MAX_STORED', 100))
+    app.config['PROFILING_TOP_ENTRIES'] = int(os.getenv('PROFILING_TOP_ENTRIES', 30))  # Functions and queries per summary
+    
+    # Health probes: the chain audit and counters they report are refreshed in the background
+    # once older than this many seconds (an admin can force one with POST /api/health/deep)
+    app.config['HEALTH_CHECK_MAX_AGE'] = int(os.getenv('HEALTH_CHECK_MAX_AGE', 300))
+    # A deep check that raised (e.g. a locked database) is retried sooner
+    app.config['HEALTH_CHECK_RETRY_SECONDS'] = int(os.getenv('HEALTH_CHECK_RETRY_SECONDS', 30))
+    
+    # Endpoints reading the whole chain (revocation feed, /chain, /stats) check for blocks
+    # other workers stored at most this often; lookups of one certificate check on a miss
+    app.config['CHAIN_SYNC_SECONDS'] = float(os.getenv('CHAIN_SYNC_SECONDS', 1.0))
+    
+    # Token-bucket rate limits per client (API key or IP) on public endpoints, e.g.
+    # RATE_LIMITS="auth.login=20/minute;cert.verify_certificate_public=300/minute:50"
+    # overrides the defaults in rate_limit.py. "sqlite" shares buckets between workers on the host.
+    app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATE_LIMITS'] = os.getenv('RATE_LIMITS', '')
+    app.config['RATE_LIMIT_STORE'] = os.getenv('RATE_LIMIT_STORE', 'memory')
+    app.config['RATE_LIMIT_DB_PATH'] = os.getenv(
+        'RATE_LIMIT_DB_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'rate_limits.db')
+    )
+    
+    # Load shedding: rate-limited endpoints answer 429 while more requests than this are
+    # in flight or the average response time is above the threshold (0 = off)
+    app.config['LOAD_SHED_MAX_IN_FLIGHT'] = int(os.getenv('LOAD_SHED_MAX_IN_FLIGHT', 32))
+    app.config['LOAD_SHED_LATENCY_MS'] = int(os.getenv('LOAD_SHED_LATENCY_MS', 2000))
+    app.config['LOAD_SHED_RETRY_AFTER'] = int(os.getenv('LOAD_SHED_RETRY_AFTER', 1))
     app.config['JWT_BLACKLIST_ENABLED'] = True
     app.config['JWT_BLACKLIST_TOKEN_CHECKS'] = ['access']
     
+    # Revoked (logged out) tokens: "sqlite" is shared by every worker on the host and
+    # survives restarts, "memory" is per process. Entries expire with the token.
+    app.config['JWT_REVOCATION_STORE'] = os.getenv('JWT_REVOCATION_STORE', 'sqlite')
+    app.config['JWT_REVOCATION_DB_PATH'] = os.getenv(
+        'JWT_REVOCATION_DB_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'revoked_tokens.db')
+    )
+    app.config['JWT_REVOCATION_SYNC_SECONDS'] = float(os.getenv('JWT_REVOCATION_SYNC_SECONDS', 1.0))
+    app.config['JWT_REVOCATION_BLOOM_CAPACITY'] = int(os.getenv('JWT_REVOCATION_BLOOM_CAPACITY', 100000))
+    
+    # Offline verification receipts (hex Ed25519 seed, or a key file generated on first use)
+    app.config['RECEIPT_SIGNING_KEY'] = os.getenv('RECEIPT_SIGNING_KEY')
+    app.config['RECEIPT_KEY_PATH'] = os.getenv(
+        'RECEIPT_KEY_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'receipt_signing.key')
+    )
+    
+    # QR codes: payload base URL and the lazily-filled render cache
+    app.config['QR_BASE_URL'] = os.getenv('QR_BASE_URL', 'http://localhost:3000')
+    app.config['QR_CACHE_DIR'] = os.getenv(
+        'QR_CACHE_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'qrcodes', 'cache')
+    )
+    app.config['QR_MEMORY_CACHE_SIZE'] = int(os.getenv('QR_MEMORY_CACHE_SIZE', 256))
+    app.config['QR_RENDER_WORKERS'] = int(os.getenv('QR_RENDER_WORKERS', 0))  # 0 = render on first request only
+    app.config['QR_RENDER_BATCH_SIZE'] = int(os.getenv('QR_RENDER_BATCH_SIZE', 32))
+    
+    # Bulk export
+    app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', 1000))  # Rows per database round trip
+    
+    # Analytics: seconds before the columnar snapshot behind /analytics/live is rebuilt
+    app.config['ANALYTICS_SNAPSHOT_MAX_AGE'] = int(os.getenv('ANALYTICS_SNAPSHOT_MAX_AGE', 60))
+    
     # Initialize extensions
     db.init_app(app)
+    init_read_routing(app)
     
     # Enhanced CORS configuration
     CORS(app, 
@@ -49,8 +181,24 @@ def create_app():
     
     # Create database tables
     with app.app_context():
-        db.create_all()
-        print("✅ Database tables created")
+        configure_engine(db.engine, app.config['DB_ENGINE_PROFILE'], app.config)
+        if REPLICA_BIND in db.engines:
+            configure_engine(db.engines[REPLICA_BIND], app.config['DB_ENGINE_PROFILE'], app.config)
+        if app.config['DB_AUTO_MIGRATE']:
+            upgrade_schema(db.engine)
+        else:
+            pending = pending_migrations(db.engine)
+            if pending:
+                print(f"⚠️  {len(pending)} pending schema migration(s); run: python migrate_database.py upgrade")
+        print(f"✅ Database schema at version {current_version(db.engine)}")
+        
+        # Full-text search index (SQLite FTS5 or Postgres tsvector)
+        from search_index import ensure_search_index
+        ensure_search_index()
+        
+        # Statistics rollups behind /stats and /dashboard
+        from stats_rollup import ensure_rollups
+        ensure_rollups()
         
         # Rebuild blockchain from database
         from certificates import rebuild_blockchain_from_database
@@ -63,6 +211,21 @@ def create_app():
             response = jsonify({"message": "OK"})
             return response
     
+    # Request metrics on /metrics (before the rate limiter, so 429 answers are counted too)
+    init_metrics(app)
+    
+    # Rate limiting and load shedding (after the preflight handler, so OPTIONS is never limited)
+    init_rate_limiting(app)
+    
+    # On-demand profiling (registers nothing unless PROFILING_ENABLED)
+    init_profiling(app)
+    
+    # Slow query log and per-request query budgets
+    init_query_monitor(app)
+    
+    # Liveness, readiness and admin-triggered deep health checks
+    init_health(app)
+    
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(cert_bp, url_prefix='/api')
@@ -125,36 +288,29 @@ def create_app():
             "status_code": 422
         }), 422
     
-    # Health check endpoint with live system info
+    # Health check endpoint: database ping plus the cached chain audit and counters
     @app.route('/api/health', methods=['GET'])
     def health_check():
         try:
-            from models import Certificate, User
-            
-            # Test database connection
-            db_status = True
-            try:
-                Certificate.query.count()
-            except:
-                db_status = False
-            
-            # Test blockchain
-            from certificates import blockchain
-            blockchain_status = blockchain.is_chain_valid()
+            ready, readiness = get_health_monitor().readiness()
+            db_status = readiness["database"] == "online"
+            blockchain_status = readiness["blockchain"]["status"]
+            counters = readiness["counters"]
             
             health_data = {
-                "status": "healthy" if db_status and blockchain_status else "degraded",
+                "status": "healthy" if ready and blockchain_status == "valid" else "degraded",
                 "timestamp": datetime.datetime.utcnow().isoformat(),
                 "version": "1.0.0",
                 "services": {
-                    "database": "online" if db_status else "offline",
-                    "blockchain": "valid" if blockchain_status else "invalid",
+                    "database": readiness["database"],
+                    "blockchain": blockchain_status,
                     "api": "online"
                 },
                 "metrics": {
-                    "total_certificates": Certificate.query.count() if db_status else 0,
-                    "total_users": User.query.count() if db_status else 0,
-                    "blockchain_blocks": len(blockchain.chain) if blockchain_status else 0
+                    "total_certificates": counters.get("total_certificates", 0) if db_status else 0,
+                    "total_users": counters.get("total_users", 0) if db_status else 0,
+                    "blockchain_blocks": counters.get("blockchain_blocks", 0),
+                    "age_seconds": counters["age_seconds"]
                 }
             }
             
@@ -191,7 +347,15 @@ def create_app():
                     "POST /add_certificate": "Add new certificate [Admin only]",
                     "GET /verify/<certificate_id>": "Basic certificate verification",
                     "GET /verify/live/<certificate_id>": "Live verification with blockchain details",
-                    "GET /certificates": "Get all certificates [Admin only]",
+                    "GET /verify/status/<certificate_id>": "Revocation status only (for offline receipts)",
+                    "GET /receipt/<certificate_id>": "Signed offline verification receipt",
+                    "GET /receipts/public_key": "Issuer public key for offline receipt verification",
+                    "GET /revocations": "Compressed revocation list snapshot (ids or bitmap)",
+                    "GET /revocations/delta?since=<height>": "Revocations since a block height",
+                    "GET /qr/jobs": "Background QR render queue summary [Admin only]",
+                    "GET /qr/jobs/<certificate_id>": "QR render status for a certificate [Admin only]",
+                    "GET /certificates": "List certificates, newest first, with cursor pagination [Admin only]",
+                    "GET /certificates/export": "Stream all certificates as NDJSON or CSV, optionally gzipped [Admin only]",
                     "GET /search": "Search certificates with filters"
                 },
                 "Blockchain": {
@@ -201,13 +365,18 @@ def create_app():
                 "Live Data & Analytics": {
                     "GET /dashboard": "Live dashboard data [Admin only]",
                     "GET /stats": "Live system statistics [Admin only]",
-                    "GET /analytics/live": "Real-time analytics [Admin only]",
+                    "POST /stats/rollups/rebuild": "Recompute the statistics rollups from the certificate table [Admin only]",
+                    "GET /analytics/live?window=180&granularity=week": "Issuance trends, distributions and rates [Admin only]",
                     "GET /notifications": "Live notifications and updates"
                 },
                 "System": {
-                    "GET /health": "Live health check with metrics",
+                    "GET /health": "Health summary with cached chain status and counters",
+                    "GET /health/live": "Liveness probe (process only, constant time)",
+                    "GET /health/ready": "Readiness probe: database ping, cached chain audit and counters with their ages",
+                    "POST /health/deep": "Start a full chain and consistency audit in the background [Admin only]",
+                    "GET /health/deep": "Latest deep check result [Admin only]",
                     "GET /docs": "API documentation",
-                    "GET /": "System status with live metrics"
+                    "GET /": "System status with cached metrics"
                 }
             },
             "authentication": "JWT Bearer token required for most endpoints",
@@ -229,17 +398,14 @@ def create_app():
         }
         return jsonify(docs), 200
     
-    # Root endpoint with live system status
+    # Root endpoint with system status (cached by the health monitor, no per-request counting)
     @app.route('/', methods=['GET'])
     def root():
         try:
-            from models import Certificate, User
             from certificates import blockchain
             
-            # Get live metrics
-            total_certs = Certificate.query.count()
-            total_users = User.query.count()
-            blockchain_health = blockchain.is_chain_valid()
+            _, readiness = get_health_monitor().readiness()
+            counters = readiness["counters"]
             
             return jsonify({
                 "message": "🎓 Blockchain Certificate Verification System API",
@@ -247,14 +413,17 @@ def create_app():
                 "status": "online",
                 "timestamp": datetime.datetime.utcnow().isoformat(),
                 "live_metrics": {
-                    "certificates": total_certs,
-                    "users": total_users,
+                    "certificates": counters.get("total_certificates", 0),
+                    "users": counters.get("total_users", 0),
                     "blockchain_blocks": len(blockchain.chain),
-                    "blockchain_healthy": blockchain_health
+                    "blockchain_healthy": readiness["blockchain"]["status"] != "invalid",
+                    "age_seconds": counters["age_seconds"]
                 },
                 "endpoints": {
                     "documentation": "/api/docs",
                     "health": "/api/health",
+                    "liveness": "/api/health/live",
+                    "readiness": "/api/health/ready",
                     "dashboard": "/api/dashboard",
                     "search": "/api/search"
                 }
@@ -271,8 +440,11 @@ def create_app():
     
     return app
 
-# Create the app instance
-app = create_app()
+# Create the app instance (for "python app.py" and WSGI servers, e.g. gunicorn app:app).
+# Process pool workers started with spawn (password hashing, QR rendering) re-import
+# this file as __mp_main__; they only need those modules, not a second app.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True)
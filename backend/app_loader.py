@@ -0,0 +1,48 @@
+import importlib.util
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def throwaway_settings(directory):
+    """Settings that put every file the app writes under directory"""
+    return {
+        "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'app.db')}",
+        "JWT_REVOCATION_DB_PATH": os.path.join(directory, "revoked_tokens.db"),
+        "RATE_LIMIT_DB_PATH": os.path.join(directory, "rate_limits.db"),
+        "RECEIPT_KEY_PATH": os.path.join(directory, "receipt.key"),
+        "QR_CACHE_DIR": os.path.join(directory, "qrcodes"),
+        "PROFILING_DIR": os.path.join(directory, "profiles")
+    }
+
+
+def load_app(directory=None, module_name="certificate_app", **settings):
+    """
+    Load the Flask app from app.py (the app/ package shadows a plain import)
+
+    Args:
+        directory (str): Put the database, token and rate-limit stores, receipt
+            key, QR cache and profiles here instead of instance/ and static/
+        module_name (str): Name of the loaded module; use a new one per app
+        **settings: Further environment settings, e.g. RATE_LIMIT_ENABLED="false"
+
+    The settings are only in os.environ while create_app reads them, so they
+    do not leak into anything loaded later in the same process.
+
+    Returns:
+        Flask: The application
+    """
+    overrides = {**(throwaway_settings(directory) if directory else {}), **settings}
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(BACKEND_DIR, "app.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return module.app
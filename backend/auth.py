@@ -1,16 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
-from models import User
-from database import db
+from models import ApiKey, User
+from database import db, read_only
+from token_store import get_revocation_list
+from passwords import HashingBusy
+from api_keys import API_KEY_HEADER, API_KEY_SCOPES, create_api_key, get_api_key_authenticator
 from utils import validate_certificate_data, create_error_response, create_success_response
 import datetime
 
 # Create authentication blueprint
 auth_bp = Blueprint('auth', __name__)
 
-# Simple in-memory blacklist for JWT tokens (use Redis in production)
-jwt_blacklist = set()
-
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -61,6 +61,10 @@ def register():
             201
         )
     
+    except HashingBusy as e:
+        db.session.rollback()
+        return _busy_response(e)
+    
     except Exception as e:
         db.session.rollback()
         return create_error_response(f"Registration failed: {str(e)}", 500)
@@ -94,6 +98,10 @@ def login():
         if not user or not user.check_password(password):
             return create_error_response("Invalid credentials", 401)
         
+        # check_password upgraded an outdated hash
+        if db.session.is_modified(user):
+            db.session.commit()
+        
         # Create JWT token with user info
         access_token = create_access_token(
             identity=user.username,  # Use username as identity string
@@ -113,6 +121,9 @@ def login():
             }
         }, "Login successful")
     
+    except HashingBusy as e:
+        return _busy_response(e)
+    
     except Exception as e:
         return create_error_response(f"Login failed: {str(e)}", 500)
 
@@ -123,8 +134,8 @@ def logout():
     Logout user by blacklisting the JWT token
     """
     try:
-        jti = get_jwt()["jti"]
-        jwt_blacklist.add(jti)
+        claims = get_jwt()
+        get_revocation_list().revoke(claims["jti"], claims["exp"])
         
         return create_success_response(None, "Logged out successfully")
     
@@ -132,6 +143,7 @@ def logout():
         return create_error_response(f"Logout failed: {str(e)}", 500)
 
 @auth_bp.route('/profile', methods=['GET'])
+@read_only
 @jwt_required()
 def get_profile():
     """
@@ -152,6 +164,11 @@ def get_profile():
     except Exception as e:
         return create_error_response(f"Failed to get profile: {str(e)}", 500)
 
+def _busy_response(error):
+    """503 with Retry-After when the password hashing pool is saturated"""
+    body, status_code = create_error_response("Server is busy, please retry shortly", 503)
+    return body, status_code, {"Retry-After": str(error.retry_after)}
+
 # Utility functions for role-based access control
 def admin_required(f):
     """Decorator to require Admin role"""
@@ -163,6 +180,32 @@ def admin_required(f):
     decorator.__name__ = f.__name__
     return decorator
 
+def jwt_or_api_key(scope):
+    """
+    Decorator accepting an API key with the given scope in place of a JWT
+
+    Requests with an X-API-Key header are authenticated from the key alone
+    (g.api_key is set); all others need a valid JWT as with @jwt_required().
+    """
+    def wrapper(f):
+        jwt_protected = jwt_required()(f)
+
+        def decorator(*args, **kwargs):
+            raw_key = request.headers.get(API_KEY_HEADER)
+            if raw_key is None:
+                return jwt_protected(*args, **kwargs)
+
+            api_key = get_api_key_authenticator().authenticate(raw_key)
+            if api_key is None:
+                return create_error_response("Invalid or revoked API key", 401)
+            if scope not in api_key.scopes:
+                return create_error_response(f"API key does not have the '{scope}' scope", 403)
+            g.api_key = api_key
+            return f(*args, **kwargs)
+        decorator.__name__ = f.__name__
+        return decorator
+    return wrapper
+
 def get_current_user():
     """Get current user identity from JWT"""
     username = get_jwt_identity()
@@ -176,5 +219,86 @@ def get_current_user():
 
 # Function to check if token is blacklisted
 def is_token_blacklisted(jti):
-    """Check if JWT token is blacklisted"""
-    return jti in jwt_blacklist
+    """Check if JWT token is blacklisted (revoked by a logout in any worker)"""
+    return get_revocation_list().is_revoked(jti)
+
+@auth_bp.route('/api_keys', methods=['POST'])
+@jwt_required()
+@admin_required
+def create_key():
+    """
+    Create an API key for a service client (Admin only)
+    
+    Request body:
+    {
+        "name": "string",
+        "scopes": ["verify", "search"],
+        "rate_limit": 600  (optional, requests per minute)
+    }
+    
+    The key is returned once and cannot be retrieved later.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return create_error_response("No data provided", 400)
+        
+        name = str(data.get('name', '')).strip()
+        scopes = data.get('scopes') or list(API_KEY_SCOPES)
+        rate_limit = data.get('rate_limit')
+        
+        if not name or len(name) > 80:
+            return create_error_response("Name must be 1-80 characters", 400)
+        
+        if not isinstance(scopes, list) or any(scope not in API_KEY_SCOPES for scope in scopes):
+            return create_error_response(f"Scopes must be a list of: {', '.join(API_KEY_SCOPES)}", 400)
+        
+        if rate_limit is not None and (not isinstance(rate_limit, int) or rate_limit < 1):
+            return create_error_response("rate_limit must be a positive integer (requests per minute)", 400)
+        
+        key, raw_key = create_api_key(name, sorted(set(scopes)), get_jwt_identity(), rate_limit)
+        db.session.commit()
+        
+        return create_success_response(
+            {"api_key": raw_key, "key": key.to_dict()},
+            "API key created; store it now, it will not be shown again",
+            201
+        )
+    
+    except Exception as e:
+        db.session.rollback()
+        return create_error_response(f"Failed to create API key: {str(e)}", 500)
+
+@auth_bp.route('/api_keys', methods=['GET'])
+@jwt_required()
+@admin_required
+def list_keys():
+    """List API keys (Admin only)"""
+    try:
+        keys = ApiKey.query.order_by(ApiKey.id.desc()).all()
+        return create_success_response({"keys": [key.to_dict() for key in keys]}, "API keys retrieved successfully")
+    
+    except Exception as e:
+        return create_error_response(f"Failed to list API keys: {str(e)}", 500)
+
+@auth_bp.route('/api_keys/<int:key_id>', methods=['DELETE'])
+@jwt_required()
+@admin_required
+def revoke_key(key_id):
+    """Revoke an API key (Admin only); other workers drop it within API_KEY_CACHE_TTL seconds"""
+    try:
+        key = db.session.get(ApiKey, key_id)
+        if not key:
+            return create_error_response("API key not found", 404)
+        
+        if not key.revoked_at:
+            key.revoked_at = datetime.datetime.utcnow().isoformat()
+            db.session.commit()
+        get_api_key_authenticator().invalidate(key.prefix)
+        
+        return create_success_response(key.to_dict(), "API key revoked successfully")
+    
+    except Exception as e:
+        db.session.rollback()
+        return create_error_response(f"Failed to revoke API key: {str(e)}", 500)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Blockchain Core Microbenchmarks
+Times Block.compute_hash, Blockchain.add_block, find_certificate,
+is_chain_valid, get_all_certificates and rebuild_blockchain_from_database
+at several chain sizes, against a temporary SQLite database
+
+Each measurement is the best of at least --repeat runs with the garbage
+collector paused. --json writes the results; --compare flags operations whose
+time per operation grew by more than --threshold against a stored result file.
+"""
+
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask
+from sqlalchemy import insert
+from blockchain import Blockchain
+from chain_store import persist_blocks
+from database import db
+from models import Certificate
+
+DEFAULT_SIZES = (1000, 10000, 100000)  # Add 1000000 with --sizes (several minutes and a few GB of memory)
+SEED_BATCH_SIZE = 10000
+
+def create_app(path):
+    """Create a Flask app backed by a temporary SQLite file"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{path}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def certificate_data(i):
+    return {
+        "certificate_id": f"BENCH_{i:08d}",
+        "student_name": f"Student {i}",
+        "degree": f"Degree {i % 25}",
+        "issue_date": "2024-03-01",
+        "issued_by": "admin"
+    }
+
+def best_of(repeat, function, min_seconds=0.5):
+    """
+    Best wall time of at least `repeat` calls, with garbage collection paused while timing
+
+    Short operations are repeated until min_seconds have been measured, so
+    the small chain sizes are not dominated by timer and scheduler noise.
+    """
+    best, spent, runs = float("inf"), 0.0, 0
+    while runs < repeat or (spent < min_seconds and runs < 1000):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+def build_chain(size):
+    chain = Blockchain()
+    for i in range(size):
+        chain.add_block(certificate_data(i))
+    return chain
+
+def seed_database(chain):
+    """Store the chain's certificates and blocks the way the API would"""
+    blocks = chain.chain
+    for start in range(0, len(blocks), SEED_BATCH_SIZE):
+        batch = blocks[start:start + SEED_BATCH_SIZE]
+        rows = [{
+            "certificate_id": block.certificate_data["certificate_id"],
+            "student_name": block.certificate_data["student_name"],
+            "degree": block.certificate_data["degree"],
+            "issue_date": datetime.date(2024, 3, 1),
+            "issued_at": datetime.datetime(2024, 3, 1),
+            "created_by": "admin",
+            "status": "active"
+        } for block in batch if block.index > 0]
+        if rows:
+            db.session.execute(insert(Certificate), rows)
+        persist_blocks(batch)
+        db.session.commit()
+
+def run_size(size, repeat, lookups):
+    """Measure every operation at one chain size; returns {operation: result}"""
+    results = {}
+
+    def record(operation, seconds, ops):
+        results[operation] = {"seconds": seconds, "ops": ops, "per_op_us": seconds / ops * 1e6}
+
+    built = [None]
+
+    def add_blocks():
+        built[0] = None  # Drop the previous run's chain first
+        built[0] = build_chain(size)
+
+    record("add_block", best_of(repeat, add_blocks), size)
+    chain = built.pop()
+
+    blocks = chain.chain[1:]
+    step = max(1, len(blocks) // min(len(blocks), 20000))
+    sample = blocks[::step]
+    record("compute_hash", best_of(repeat, lambda: [block.compute_hash() for block in sample]), len(sample))
+
+    rng = random.Random(size)
+    ids = [f"BENCH_{rng.randrange(size):08d}" for _ in range(lookups)]
+    record("find_certificate", best_of(repeat, lambda: [chain.find_certificate(cid) for cid in ids]), lookups)
+
+    assert chain.is_chain_valid()
+    record("is_chain_valid", best_of(repeat, chain.is_chain_valid), size)
+    record("get_all_certificates", best_of(repeat, chain.get_all_certificates), size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, "bench.db"))
+        with app.app_context():
+            db.create_all()
+            seed_database(chain)
+            del chain, blocks, sample
+
+            import certificates
+            with contextlib.redirect_stdout(io.StringIO()):
+                record("rebuild_from_database", best_of(repeat, certificates.rebuild_blockchain_from_database), size)
+            assert len(certificates.blockchain.chain) == size + 1
+            certificates.blockchain.load_blocks([])
+            db.session.remove()
+            db.engine.dispose()
+    return results
+
+def run(sizes, repeat, lookups, log=print):
+    results = {}
+    for size in sizes:
+        for operation, result in run_size(size, repeat, lookups).items():
+            key = f"{operation}/{size}"
+            results[key] = result
+            log(f"⛓️  {key:32s} {result['per_op_us']:10.3f} us/op  ({result['seconds'] * 1000:10.1f} ms total)")
+    return {
+        "meta": {
+            "created_at": datetime.datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "sizes": list(sizes),
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+def compare(current, baseline, threshold):
+    """
+    Compare time per operation against a baseline run
+
+    Returns:
+        list: Keys that got slower by more than threshold (a fraction)
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            print(f"➖ {key:32s} not in baseline")
+            continue
+        ratio = result["per_op_us"] / before["per_op_us"]
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{'⚠️ ' if regressed else '✅'} {key:32s} {before['per_op_us']:10.3f} -> {result['per_op_us']:10.3f} us/op  ({ratio:5.2f}x)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated chain sizes, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs per measurement (the best is kept)")
+    parser.add_argument("--lookups", type=int, default=50000, help="find_certificate calls per size")
+    parser.add_argument("--json", help="Write the results to this file (usable as a --compare baseline)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Slowdown that counts as a regression (0.25 = 25%% more time per operation)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    current = run(sizes, args.repeat, args.lookups)
+
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(current, results_file, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Database Engine Profile Benchmark
+Measures concurrent read/write throughput and lock errors for each engine profile
+
+SQLite profiles run against a fresh temporary file. Pass --postgres-url to
+include the postgres profile.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from database import configure_engine, engine_options
+
+SEED_ROWS = 5000
+
+def prepare(engine):
+    """Create and seed a table shaped like the certificate table"""
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS bench_certificate"))
+        connection.execute(text(
+            "CREATE TABLE bench_certificate (id INTEGER PRIMARY KEY, certificate_id VARCHAR(64) UNIQUE, "
+            "student_name VARCHAR(120), degree VARCHAR(120), status VARCHAR(20))"
+        ))
+        connection.execute(
+            text("INSERT INTO bench_certificate (id, certificate_id, student_name, degree, status) "
+                 "VALUES (:id, :cid, :name, :degree, 'active')"),
+            [{"id": i, "cid": f"SEED_{i:08d}", "name": f"Student {i}", "degree": f"Degree {i % 20}"}
+             for i in range(1, SEED_ROWS + 1)]
+        )
+
+def reader(engine, stop, counters):
+    while not stop.is_set():
+        try:
+            with engine.connect() as connection:
+                connection.execute(
+                    text("SELECT * FROM bench_certificate WHERE id = :id"), {"id": random.randint(1, SEED_ROWS)}
+                ).fetchall()
+                connection.execute(
+                    text("SELECT degree, count(*) FROM bench_certificate WHERE degree = :degree GROUP BY degree"),
+                    {"degree": f"Degree {random.randint(0, 19)}"}
+                ).fetchall()
+            counters["reads"] += 1
+        except OperationalError:
+            counters["errors"] += 1
+
+def writer(engine, stop, counters, worker):
+    sequence = 0
+    while not stop.is_set():
+        sequence += 1
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    text("INSERT INTO bench_certificate (certificate_id, student_name, degree, status) "
+                         "VALUES (:cid, 'Bench', 'Degree 1', 'active')"),
+                    {"cid": f"W{worker}_{sequence}_{time.time_ns()}"}
+                )
+                connection.execute(
+                    text("UPDATE bench_certificate SET status = 'revoked' WHERE id = :id"),
+                    {"id": random.randint(1, SEED_ROWS)}
+                )
+            counters["writes"] += 1
+        except OperationalError:
+            counters["errors"] += 1
+
+def run(uri, profile, readers, writers, duration):
+    """Hammer one engine for duration seconds and return per-second rates"""
+    engine = create_engine(uri, **engine_options(uri, profile, {}))
+    configure_engine(engine, profile, {})
+    prepare(engine)
+
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    stop = threading.Event()
+    threads = [threading.Thread(target=reader, args=(engine, stop, counters)) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(engine, stop, counters, i)) for i in range(writers)]
+
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {name: count / duration for name, count in counters.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--readers", type=int, default=8)
+    parser.add_argument("-w", "--writers", type=int, default=2)
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="Seconds per profile")
+    parser.add_argument("--postgres-url", help="Database URL for the postgres profile")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        targets = [
+            ("default", f"sqlite:///{os.path.join(directory, 'default.db')}"),
+            ("sqlite", f"sqlite:///{os.path.join(directory, 'tuned.db')}")
+        ]
+        if args.postgres_url:
+            targets += [("default", args.postgres_url), ("postgres", args.postgres_url)]
+
+        print(f"🧵 {args.readers} reader(s), {args.writers} writer(s), {args.duration:.0f}s per profile")
+        for profile, uri in targets:
+            rates = run(uri, profile, args.readers, args.writers, args.duration)
+            backend = uri.split(":", 1)[0]
+            print(f"⚙️  {profile:8s} ({backend:10s}) reads/s: {rates['reads']:8.1f}  "
+                  f"writes/s: {rates['writes']:7.1f}  errors/s: {rates['errors']:6.1f}")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Login Throughput Benchmark
+Hammers POST /api/auth/login from many threads while a probe thread times a
+cheap endpoint (GET /api/health), against a fresh temporary database
+
+Reports logins/s, login latency, 503 (backpressure) responses and how much
+the concurrent logins slow down everything else. --compare runs the same load
+with hashing on the request threads (PASSWORD_HASH_WORKERS=0) and in the pool.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app_loader import load_app
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run(threads, duration, users):
+    with tempfile.TemporaryDirectory() as directory:
+        app = load_app(directory, "bench_app", RATE_LIMIT_ENABLED="false")  # Measure hashing, not the login/register limits
+        client = app.test_client()
+        for i in range(users):
+            client.post('/api/auth/register', json={"username": f"bench{i}", "password": "bench-password", "role": "User"})
+
+        stop = threading.Event()
+        logins, busy, failures, probes = [], [0], [0], []
+        lock = threading.Lock()
+
+        def login_worker(worker):
+            local = app.test_client()
+            sequence = 0
+            while not stop.is_set():
+                sequence += 1
+                started = time.perf_counter()
+                response = local.post('/api/auth/login', json={
+                    "username": f"bench{(worker + sequence) % users}", "password": "bench-password"
+                })
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if response.status_code == 200:
+                        logins.append(elapsed)
+                    elif response.status_code == 503:
+                        busy[0] += 1
+                        time.sleep(float(response.headers.get("Retry-After", 1)) / 10)
+                    else:
+                        failures[0] += 1
+
+        def probe_worker():
+            local = app.test_client()
+            while not stop.is_set():
+                started = time.perf_counter()
+                local.get('/api/health')
+                probes.append(time.perf_counter() - started)
+                time.sleep(0.01)
+
+        workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+        workers.append(threading.Thread(target=probe_worker))
+        for worker in workers:
+            worker.start()
+        time.sleep(duration)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+        return {
+            "logins_per_second": len(logins) / duration,
+            "login_p50_ms": percentile(logins, 0.5) * 1000,
+            "login_p95_ms": percentile(logins, 0.95) * 1000,
+            "busy_per_second": busy[0] / duration,
+            "failures": failures[0],
+            "probe_p50_ms": (statistics.median(probes) if probes else 0) * 1000,
+            "probe_p95_ms": percentile(probes, 0.95) * 1000
+        }
+
+def report(label, result):
+    print(f"🔐 {label:24s} logins/s: {result['logins_per_second']:6.1f}  "
+          f"p50: {result['login_p50_ms']:7.1f}ms  p95: {result['login_p95_ms']:7.1f}ms  "
+          f"503/s: {result['busy_per_second']:6.1f}  health p95: {result['probe_p95_ms']:6.1f}ms"
+          + (f"  errors: {result['failures']}" if result['failures'] else ""))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-t", "--threads", type=int, default=16, help="Concurrent login threads")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("-u", "--users", type=int, default=20, help="Accounts to log in as")
+    parser.add_argument("--compare", action="store_true",
+                        help="Run with PASSWORD_HASH_WORKERS=0 and with the configured pool, one process each")
+    args = parser.parse_args()
+
+    if args.compare:
+        pool_workers = os.getenv("PASSWORD_HASH_WORKERS", "2")
+        for workers in ("0", pool_workers):
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "-t", str(args.threads), "-d", str(args.duration), "-u", str(args.users)],
+                env={**os.environ, "PASSWORD_HASH_WORKERS": workers},
+                check=True
+            )
+        sys.exit(0)
+
+    workers = os.getenv("PASSWORD_HASH_WORKERS", "2")
+    result = run(args.threads, args.duration, args.users)
+    report(f"{workers} hashing worker(s)" if workers != "0" else "inline (request thread)", result)
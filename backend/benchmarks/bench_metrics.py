@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Request Metrics Overhead Benchmark
+Times GET /api/health and GET /api/verify/simple/<id> through the Flask test
+client with METRICS_ENABLED=true and false (one process each), against a fresh
+temporary database, and the raw cost of recording one request's metrics
+
+The difference between the two runs is the per-request cost of the metrics
+middleware; rendering /metrics is timed separately.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app_loader import load_app
+
+def time_requests(client, path, requests):
+    client.get(path)  # Warm up
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return (time.perf_counter() - started) / requests
+
+def time_recording(iterations):
+    """Seconds to record one request's counter, histogram and in-flight gauge updates"""
+    from metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+    started = time.perf_counter()
+    for _ in range(iterations):
+        HTTP_IN_FLIGHT.inc()
+        HTTP_LATENCY.observe(0.004, "cert.verify_certificate_public")
+        HTTP_REQUESTS.inc("cert.verify_certificate_public", "GET", "200")
+        HTTP_IN_FLIGHT.dec()
+    return (time.perf_counter() - started) / iterations
+
+def run(requests):
+    with tempfile.TemporaryDirectory() as directory:
+        app = load_app(directory, "bench_app", RATE_LIMIT_ENABLED="false")  # Measure the metrics, not the limiter
+        client = app.test_client()
+        results = {
+            "health_us": time_requests(client, "/api/health", requests) * 1e6,
+            "verify_us": time_requests(client, "/api/verify/simple/BENCH-MISSING", requests) * 1e6
+        }
+        if app.config["METRICS_ENABLED"]:
+            results["record_us"] = time_recording(requests * 10) * 1e6
+            started = time.perf_counter()
+            body = client.get("/metrics").data
+            results["render_ms"] = (time.perf_counter() - started) * 1000
+            results["render_kb"] = len(body) / 1024
+        return results
+
+def report(label, result):
+    line = f"📈 {label:11s} /api/health: {result['health_us']:7.1f}us  /api/verify/simple: {result['verify_us']:7.1f}us"
+    if "record_us" in result:
+        line += (f"  record: {result['record_us']:5.2f}us  "
+                 f"/metrics: {result['render_ms']:.2f}ms ({result['render_kb']:.1f} KB)")
+    print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--compare", action="store_true",
+                        help="Run with METRICS_ENABLED=false and true, one process each")
+    args = parser.parse_args()
+
+    if args.compare:
+        for enabled in ("false", "true"):
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "-n", str(args.requests)],
+                env={**os.environ, "METRICS_ENABLED": enabled},
+                check=True
+            )
+        sys.exit(0)
+
+    enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    report("metrics on" if enabled else "metrics off", run(args.requests))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+QR Rendering Throughput Benchmark
+Measures images per second through the QR render process pool at 1, 4 and N workers
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qr_cache import DEFAULT_RENDER_PARAMS, cache_key, render_qr_batch
+
+# Roughly the size of a verification URL carrying a signed receipt
+PAYLOAD_PADDING = "x" * 400
+
+def build_work(count):
+    """Create render work items like the ones QRRenderQueue submits"""
+    work = []
+    for i in range(count):
+        payload = f"http://localhost:3000/verify/BENCH_{i:08d}#r=v1.{PAYLOAD_PADDING}"
+        work.append((cache_key(payload, DEFAULT_RENDER_PARAMS), payload, dict(DEFAULT_RENDER_PARAMS)))
+    return work
+
+def run(workers, work, batch_size):
+    """Render all work items with the given number of worker processes"""
+    batches = [work[i:i + batch_size] for i in range(0, len(work), batch_size)]
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # Warm up so process start-up is not counted
+        list(executor.map(render_qr_batch, [work[:1]] * workers))
+        
+        start = time.perf_counter()
+        rendered = sum(len(result) for result in executor.map(render_qr_batch, batches))
+        elapsed = time.perf_counter() - start
+    
+    return rendered / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--images", type=int, default=400)
+    parser.add_argument("-b", "--batch-size", type=int, default=32)
+    args = parser.parse_args()
+    
+    work = build_work(args.images)
+    
+    start = time.perf_counter()
+    render_qr_batch(work[:50])
+    inline_rate = 50 / (time.perf_counter() - start)
+    print(f"🧵 Inline (request thread): {inline_rate:8.1f} images/s")
+    
+    for workers in sorted({1, 4, os.cpu_count() or 1}):
+        rate = run(workers, work, args.batch_size)
+        print(f"⚙️  {workers:3d} worker(s):           {rate:8.1f} images/s")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Receipt Signing/Verification Benchmark
+Measures how many offline receipts can be issued and checked per second
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blockchain import Blockchain
+from receipt_verifier import verify_receipt
+from receipts import ReceiptSigner
+
+def run_benchmark(iterations):
+    """Sign and verify `iterations` receipts and print throughput"""
+    signer = ReceiptSigner(os.urandom(32))
+    chain = Blockchain()
+    
+    blocks = []
+    for i in range(iterations):
+        certificate_data = {
+            "certificate_id": f"BENCH_{i:08d}",
+            "student_name": "Benchmark Student",
+            "degree": "Bachelor of Science in Computer Science",
+            "issue_date": "2025-09-01",
+            "issued_by": "admin"
+        }
+        blocks.append((certificate_data, chain.add_block(certificate_data)))
+    
+    backend = "cryptography" if signer._native_key is not None else "pure-python"
+    print(f"🔑 Signing backend: {backend}")
+    
+    start = time.perf_counter()
+    receipts = [signer.issue_receipt(data, block) for data, block in blocks]
+    sign_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for receipt in receipts:
+        certificate, error = verify_receipt(receipt, signer.public_key)
+        if error:
+            raise RuntimeError(error)
+    verify_elapsed = time.perf_counter() - start
+    
+    average_size = sum(len(r) for r in receipts) / len(receipts)
+    
+    print(f"📏 Average receipt size: {average_size:.0f} chars")
+    print(f"✍️  Sign:   {iterations / sign_elapsed:10.1f} receipts/s ({sign_elapsed / iterations * 1000:.3f} ms each)")
+    print(f"✅ Verify: {iterations / verify_elapsed:10.1f} receipts/s ({verify_elapsed / iterations * 1000:.3f} ms each)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--iterations", type=int, default=500)
+    args = parser.parse_args()
+    run_benchmark(args.iterations)
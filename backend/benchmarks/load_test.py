@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+End-to-End HTTP Load Test
+Generates a seeded synthetic dataset (users, and certificates written through
+the models, the blockchain and the bulk import path), starts the app on a
+local port and replays a weighted mix of requests against it over real HTTP
+
+Closed loop (default): --concurrency clients each send their next request as
+soon as the previous one is answered. Open loop: --rate requests per second
+arrive on a fixed schedule whether or not earlier ones have finished, and
+latency is measured from the scheduled time, so queueing shows up in the
+percentiles. Reports throughput, p50/p95/p99 latency and error rates per
+operation. Everything runs offline against a temporary database.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app_loader import load_app
+
+DEFAULT_MIX = "verify_simple=60,verify_live=15,search=15,add_certificate=5,stats=5"
+
+FIRST_NAMES = ("Amina", "Bilal", "Chen", "Dana", "Elif", "Farah", "Gustavo", "Hana", "Ivan", "Junaid",
+               "Kiran", "Lena", "Mateo", "Noor", "Omar", "Priya", "Quinn", "Rosa", "Sami", "Tariq")
+LAST_NAMES = ("Ahmed", "Brown", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Khan",
+              "Lopez", "Malik", "Novak", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Usman", "Weber")
+DEGREES = ("BSc Computer Science", "BSc Physics", "BA Economics", "MSc Data Science", "MBA",
+           "BEng Electrical Engineering", "MA History", "PhD Chemistry", "BSc Mathematics", "LLB Law")
+
+def certificate_record(rng, i):
+    return {
+        "certificate_id": f"LOAD_{i:08d}",
+        "student_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "degree": rng.choice(DEGREES),
+        "issue_date": f"{rng.randint(2021, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "issued_by": "load_admin"
+    }
+
+def generate_dataset(app, users, certificates, seed, batch_size=5000):
+    """
+    Create users and certificates the way the application does
+
+    Certificates go through import_certificates.write_batch: chain blocks,
+    stored blocks, search index and statistics rollups included.
+
+    Returns:
+        list: The certificate IDs created
+    """
+    import certificates as certificate_routes
+    from database import db
+    from import_certificates import write_batch
+    from models import User
+
+    rng = random.Random(seed)
+    with app.app_context():
+        admin = User(username="load_admin", role="Admin")
+        admin.set_password("load-password")
+        db.session.add(admin)
+        for i in range(users):
+            user = User(username=f"load_user{i}", role="User")
+            user.set_password("load-password")
+            db.session.add(user)
+        db.session.commit()
+
+        ids, batch = [], []
+        for i in range(certificates):
+            record = certificate_record(rng, i)
+            batch.append(record)
+            ids.append(record["certificate_id"])
+            if len(batch) >= batch_size:
+                write_batch(batch, certificate_routes.blockchain)
+                batch = []
+        if batch:
+            write_batch(batch, certificate_routes.blockchain)
+    return ids
+
+def start_server(app):
+    """Serve the app on a free local port from a background thread; returns (server, port)"""
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # No access log line per request
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_port
+
+class Client:
+    """Keep-alive HTTP connection per thread"""
+
+    def __init__(self, port):
+        self.port = port
+        self._local = threading.local()
+
+    def request(self, method, path, token=None, body=None):
+        """Send one request; returns (status, response body bytes)"""
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = json.dumps(body) if body is not None else None
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+    def login(self, username):
+        status, body = self.request("POST", "/api/auth/login", body={"username": username, "password": "load-password"})
+        if status != 200:
+            raise RuntimeError(f"Login as {username} failed with {status}: {body[:200]!r}")
+        return json.loads(body)["data"]["access_token"]
+
+class Workload:
+    """Builds requests for each operation of the mix; expected statuses are not errors"""
+
+    EXPECTED = {
+        "verify_simple": {200, 404},
+        "verify_live": {200, 404},
+        "search": {200},
+        "add_certificate": {201},
+        "stats": {200}
+    }
+
+    def __init__(self, client, ids, admin_token, user_tokens, miss_rate, seed):
+        self.client = client
+        self.ids = ids
+        self.admin_token = admin_token
+        self.user_tokens = user_tokens
+        self.miss_rate = miss_rate
+        self.seed = seed
+        self._rng = threading.local()
+        self._streams = itertools.count()  # One seeded random stream per client thread
+        self._next_id = len(ids)
+        self._lock = threading.Lock()
+
+    def rng(self):
+        rng = getattr(self._rng, "rng", None)
+        if rng is None:
+            rng = self._rng.rng = random.Random(f"{self.seed}-{next(self._streams)}")
+        return rng
+
+    def certificate_id(self):
+        rng = self.rng()
+        if rng.random() < self.miss_rate:
+            return f"MISSING_{rng.randrange(10 ** 8):08d}"
+        return rng.choice(self.ids)
+
+    def run(self, operation):
+        """Send one request of the given operation; returns its status"""
+        rng = self.rng()
+        if operation == "verify_simple":
+            return self.client.request("GET", f"/api/verify/simple/{self.certificate_id()}")[0]
+        if operation == "verify_live":
+            return self.client.request("GET", f"/api/verify/live/{self.certificate_id()}",
+                                       token=rng.choice(self.user_tokens))[0]
+        if operation == "search":
+            return self.client.request("GET", f"/api/search?q={rng.choice(LAST_NAMES)}&per_page=20",
+                                       token=rng.choice(self.user_tokens))[0]
+        if operation == "add_certificate":
+            with self._lock:
+                index = self._next_id
+                self._next_id += 1
+            record = certificate_record(rng, index)
+            del record["issued_by"]
+            return self.client.request("POST", "/api/add_certificate", token=self.admin_token, body=record)[0]
+        if operation == "stats":
+            return self.client.request("GET", "/api/stats", token=self.admin_token)[0]
+        raise ValueError(f"Unknown operation: {operation}")
+
+def parse_mix(text):
+    """{operation: weight} from "operation=weight,operation=weight\""""
+    mix = {}
+    for item in text.split(","):
+        if item.strip():
+            operation, _, weight = item.partition("=")
+            operation = operation.strip()
+            if operation not in Workload.EXPECTED:
+                raise ValueError(f"Unknown operation in mix: {operation}")
+            mix[operation] = float(weight)
+    return mix
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # operation -> list of (latency seconds, status or None for a connection error)
+        self._lock = threading.Lock()
+
+    def add(self, operation, latency, status):
+        with self._lock:
+            self.samples.setdefault(operation, []).append((latency, status))
+
+def timed(workload, recorder, operation, scheduled=None):
+    started = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        status = workload.run(operation)
+    except Exception:
+        status = None
+    recorder.add(operation, time.perf_counter() - started, status)
+
+def run_closed_loop(workload, mix, concurrency, duration, seed):
+    recorder = Recorder()
+    operations, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    def client_loop(worker):
+        rng = random.Random(f"{seed}-mix-{worker}")
+        while time.perf_counter() < deadline:
+            timed(workload, recorder, rng.choices(operations, weights)[0])
+
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder
+
+def run_open_loop(workload, mix, rate, concurrency, duration, seed):
+    recorder = Recorder()
+    operations, weights = list(mix), list(mix.values())
+    rng = random.Random(f"{seed}-mix")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for k in range(int(rate * duration)):
+            scheduled = started + k / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(timed, workload, recorder, rng.choices(operations, weights)[0], scheduled)
+    return recorder
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(recorder, elapsed):
+    """Per-operation and overall throughput, latency percentiles and error rates"""
+    groups = {"all": []}
+    for operation, samples in sorted(recorder.samples.items()):
+        tagged = [(operation, latency, status) for latency, status in samples]
+        groups[operation] = tagged
+        groups["all"].extend(tagged)
+
+    summary = {}
+    for name, samples in groups.items():
+        latencies = [latency for _, latency, _ in samples]
+        errors = sum(1 for operation, _, status in samples if status not in Workload.EXPECTED[operation])
+        statuses = {}
+        for _, _, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        summary[name] = {
+            "requests": len(samples),
+            "throughput": len(samples) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "statuses": statuses
+        }
+    return summary
+
+def report(summary):
+    print(f"{'operation':16s} {'requests':>9s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errors':>7s}  statuses")
+    for operation, result in summary.items():
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(result["statuses"].items()))
+        print(f"{operation:16s} {result['requests']:9d} {result['throughput']:8.1f} {result['p50_ms']:8.1f} "
+              f"{result['p95_ms']:8.1f} {result['p99_ms']:8.1f} {result['error_rate']:7.2%}  {statuses}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20, help="Regular users to create (plus one admin)")
+    parser.add_argument("--certificates", type=int, default=10000, help="Certificates to create before the run")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the dataset and the request stream")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Clients (closed loop) or maximum in flight (open loop)")
+    parser.add_argument("--rate", type=float, help="Open loop: requests per second (default: closed loop)")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds of unrecorded load first")
+    parser.add_argument("--miss-rate", type=float, default=0.05, help="Share of verifications for unknown IDs")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the per-client rate limits on")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    with tempfile.TemporaryDirectory() as directory:
+        # Every simulated client shares 127.0.0.1, so the limits are off unless asked for
+        app = load_app(directory, "load_test_app", **({} if args.rate_limits else {"RATE_LIMIT_ENABLED": "false"}))
+        started = time.perf_counter()
+        ids = generate_dataset(app, args.users, args.certificates, args.seed)
+        print(f"🌱 Generated {args.users + 1} users and {len(ids)} certificates in {time.perf_counter() - started:.1f}s")
+
+        server, port = start_server(app)
+        client = Client(port)
+        admin_token = client.login("load_admin")
+        user_tokens = [client.login(f"load_user{i}") for i in range(args.users)] or [admin_token]
+        workload = Workload(client, ids, admin_token, user_tokens, args.miss_rate, args.seed)
+
+        def drive(duration):
+            if args.rate:
+                return run_open_loop(workload, mix, args.rate, args.concurrency, duration, args.seed)
+            return run_closed_loop(workload, mix, args.concurrency, duration, args.seed)
+
+        mode = f"open loop at {args.rate:g} req/s" if args.rate else f"closed loop with {args.concurrency} clients"
+        print(f"🚦 {mode} on 127.0.0.1:{port} for {args.duration:g}s (after {args.warmup:g}s warm-up)")
+        if args.warmup:
+            drive(args.warmup)
+        started = time.perf_counter()
+        recorder = drive(args.duration)
+        summary = summarize(recorder, time.perf_counter() - started)
+        server.shutdown()
+
+        report(summary)
+        if args.json:
+            with open(args.json, "w") as summary_file:
+                json.dump({"config": vars(args), "results": summary}, summary_file, indent=2)
+            print(f"💾 Summary written to {args.json}")
@@ -1,17 +1,20 @@
 import hashlib
 import datetime
 import json
+from metrics import BLOCK_APPEND_SECONDS, CHAIN_VALIDATION_SECONDS
+
+REVOKE_ACTION = "REVOKE_CERTIFICATE"
 
 class Block:
     """Represents a single block in the blockchain"""
     
-    def __init__(self, index, certificate_data, previous_hash):
-        """Initialize a new block"""
+    def __init__(self, index, certificate_data, previous_hash, timestamp=None, block_hash=None):
+        """Initialize a new block (timestamp and block_hash are given when loading a stored block)"""
         self.index = index
-        self.timestamp = datetime.datetime.utcnow().isoformat()
+        self.timestamp = timestamp or datetime.datetime.utcnow().isoformat()
         self.certificate_data = certificate_data
         self.previous_hash = previous_hash
-        self.hash = self.compute_hash()
+        self.hash = block_hash or self.compute_hash()
 
     def compute_hash(self):
         """Compute SHA-256 hash of the block"""
@@ -36,6 +39,8 @@ class Blockchain:
     def __init__(self):
         """Initialize blockchain with genesis block"""
         self.chain = []
+        self.certificate_index = {}  # certificate_id -> first block recording it
+        self.revocations = []  # REVOKE_CERTIFICATE blocks in chain order
         self.create_genesis_block()
 
     def create_genesis_block(self):
@@ -47,7 +52,7 @@ class Blockchain:
             "issue_date": datetime.datetime.utcnow().strftime("%Y-%m-%d")
         }
         genesis_block = Block(0, genesis_data, "0")
-        self.chain.append(genesis_block)
+        self._append(genesis_block)
 
     def get_latest_block(self):
         """Get the most recent block in the chain"""
@@ -55,13 +60,72 @@ class Blockchain:
 
     def add_block(self, certificate_data):
         """Add a new certificate block to the chain"""
-        previous_block = self.get_latest_block()
-        new_block = Block(len(self.chain), certificate_data, previous_block.hash)
-        self.chain.append(new_block)
+        with BLOCK_APPEND_SECONDS.time():
+            previous_block = self.get_latest_block()
+            new_block = Block(len(self.chain), certificate_data, previous_block.hash)
+            self._append(new_block)
         return new_block
 
+    def load_blocks(self, blocks):
+        """
+        Replace the chain with previously stored blocks
+
+        Args:
+            blocks: Iterable of Block in index order, starting with the genesis block
+
+        Returns:
+            int: Number of blocks loaded (the chain is left untouched when 0)
+        """
+        loaded = 0
+        for block in blocks:
+            if loaded == 0:
+                self.chain = []
+                self.certificate_index = {}
+                self.revocations = []
+            self._append(block)
+            loaded += 1
+        return loaded
+
+    def extend_blocks(self, blocks):
+        """
+        Append stored blocks that continue the chain (written by another worker)
+
+        Returns:
+            int: Number of blocks appended
+        """
+        appended = 0
+        for block in blocks:
+            self._append(block)
+            appended += 1
+        return appended
+
+    def discard_block(self, block):
+        """Remove a just-added block whose database transaction was rolled back"""
+        if not self.chain or self.chain[-1] is not block or block.index == 0:
+            return False
+        self.chain.pop()
+        certificate_id = block.certificate_data.get("certificate_id")
+        if self.certificate_index.get(certificate_id) is block:
+            del self.certificate_index[certificate_id]
+        if self.revocations and self.revocations[-1] is block:
+            self.revocations.pop()
+        return True
+
+    def _append(self, block):
+        """Append a block and keep the lookup indexes in sync"""
+        self.chain.append(block)
+        certificate_id = block.certificate_data.get("certificate_id")
+        if certificate_id is not None:
+            self.certificate_index.setdefault(certificate_id, block)
+        if block.certificate_data.get("action") == REVOKE_ACTION:
+            self.revocations.append(block)
+
     def is_chain_valid(self):
         """Validate the integrity of the blockchain"""
+        with CHAIN_VALIDATION_SECONDS.time():
+            return self._validate()
+
+    def _validate(self):
         for i in range(1, len(self.chain)):
             current_block = self.chain[i]
             previous_block = self.chain[i-1]
@@ -78,10 +142,7 @@ class Blockchain:
 
     def find_certificate(self, certificate_id):
         """Find a certificate by its ID in the blockchain"""
-        for block in self.chain:
-            if block.certificate_data.get("certificate_id") == certificate_id:
-                return block
-        return None
+        return self.certificate_index.get(certificate_id)
 
     def get_all_certificates(self):
         """Get all certificates from the blockchain (excluding genesis)"""
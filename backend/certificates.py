@@ -1,30 +1,68 @@
-from flask import Blueprint, request, jsonify, send_from_directory
+from flask import Blueprint, Response, request, jsonify, send_file, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from blockchain import Blockchain
-from models import Certificate, User
-from database import db
-from utils import generate_qr_code, validate_certificate_data, create_error_response, create_success_response
-from auth import admin_required, get_current_user
+from blockchain import Blockchain, REVOKE_ACTION
+from models import Certificate, User, QRRenderJob
+from database import db, read_only
+from utils import (
+    legacy_qr_code_paths, verification_url, qr_code_url, validate_certificate_data,
+    create_error_response, create_success_response
+)
+from auth import admin_required, get_current_user, jwt_or_api_key
+from receipts import get_receipt_signer
+from revocations import build_snapshot, build_delta
+from qr_cache import OUTPUT_FORMATS, get_qr_cache
+from qr_render_queue import get_qr_render_queue
+from search_index import apply_text_search, index_certificate, update_certificate_status
+from stats_rollup import rebuild_rollups, record_issue, record_revocation, rollup_summary
+from analytics import GRANULARITIES, get_analytics_engine
+from exports import EXPORT_FORMATS, gzip_chunks, iter_certificate_rows, iter_export
+from chain_store import (
+    append_blocks, find_stored_block, iter_stored_blocks, lock_chain, persist_blocks, refresh_chain, sync_chain
+)
+from metrics import CACHE_LOOKUPS, CHAIN_LENGTH
+from pagination import (
+    COUNT_MODES, apply_keyset, count_rows, decode_cursor, encode_cursor, fetch_page, filter_fingerprint, parse_limit,
+    parse_offset
+)
+import io
 import os
 import datetime
+import threading
+from collections import OrderedDict
 from sqlalchemy import func
 
 # Create certificates blueprint
 cert_bp = Blueprint('cert', __name__)
 
+# Certificate IDs listed by /debug/certificate
+DEBUG_ID_SAMPLE_SIZE = 50
+
+# Signed QR payloads by (block hash, signing key, base URL), so cached QR codes
+# are served without signing a receipt on every request
+QR_PAYLOAD_CACHE_SIZE = 4096
+_qr_payloads = OrderedDict()
+_qr_payloads_lock = threading.Lock()
+
 # Initialize blockchain instance
 blockchain = Blockchain()
+CHAIN_LENGTH.set_function(lambda: len(blockchain.chain))  # Follows the rebinding in init_blockchain
 
 def rebuild_blockchain_from_database():
-    """Rebuild blockchain from existing certificates in database"""
-    from models import Certificate
+    """
+    Load the persisted chain and append blocks for any certificates it is missing
     
-    # Get all certificates from database
-    certificates = Certificate.query.all()
+    Blocks are stored in the chain_block table, so hashes and timestamps (and
+    the receipts that reference them) survive restarts. Certificates written
+    before blocks were persisted, or by tools that bypass the API, are replayed
+    and their new blocks stored.
+    """
+    lock_chain()  # Workers starting together replay missing blocks one at a time
+    loaded = blockchain.load_blocks(iter_stored_blocks())
+    persisted = len(blockchain.chain) if loaded else 0
     
-    print(f"Rebuilding blockchain from {len(certificates)} certificates...")
+    print(f"Loaded {loaded} stored blocks, checking certificates for missing blocks...")
     
-    for cert in certificates:
+    for cert in Certificate.query.order_by(Certificate.id).yield_per(1000):
         # Check if certificate already exists in blockchain
         existing_block = blockchain.find_certificate(cert.certificate_id)
         if not existing_block:
@@ -33,14 +71,42 @@ def rebuild_blockchain_from_database():
                 "certificate_id": cert.certificate_id,
                 "student_name": cert.student_name,
                 "degree": cert.degree,
-                "issue_date": cert.issue_date,
+                "issue_date": cert.issue_date.isoformat(),
                 "issued_by": cert.created_by
             }
             blockchain.add_block(certificate_data)
             print(f"Added {cert.certificate_id} to blockchain")
     
+    # Replay revocations so the chain (and the revocation feed) reflects them
+    revoked_in_chain = {block.certificate_data["certificate_id"] for block in blockchain.revocations}
+    revoked_certs = sorted(
+        (cert for cert in Certificate.query.filter_by(status='revoked')
+         if cert.certificate_id not in revoked_in_chain),
+        key=lambda cert: cert.revoked_at or ""
+    )
+    for cert in revoked_certs:
+        blockchain.add_block(_revocation_data(cert))
+        print(f"Added revocation of {cert.certificate_id} to blockchain")
+    
+    # Store the genesis block (first run) and every replayed block
+    if len(blockchain.chain) > persisted:
+        persist_blocks(blockchain.chain[persisted:])
+    db.session.commit()
+    
     print(f"Blockchain rebuilt with {len(blockchain.chain)} blocks")
 
+def _revocation_data(cert, reason="Certificate revoked by administrator"):
+    """Build the REVOKE_CERTIFICATE block payload for a revoked certificate"""
+    return {
+        "action": REVOKE_ACTION,
+        "certificate_id": cert.certificate_id,
+        "original_student": cert.student_name,
+        "original_degree": cert.degree,
+        "revoked_by": cert.revoked_by,
+        "revoked_at": cert.revoked_at,
+        "reason": reason
+    }
+
 # Rebuild blockchain from database on startup
 def init_blockchain():
     """Initialize blockchain and rebuild from database"""
@@ -74,6 +140,7 @@ def add_certificate():
         "certificate_id": "string"
     }
     """
+    pending_block = None  # In-memory block not yet committed with its certificate
     try:
         data = request.get_json()
         
@@ -105,34 +172,46 @@ def add_certificate():
             "issued_by": current_user["username"]
         }
         
-        block = blockchain.add_block(certificate_data)
+        block = pending_block = append_blocks(blockchain, [certificate_data])[0]
+        
+        # Sign an offline verification receipt (embedded in the QR code)
+        receipt = get_receipt_signer().issue_receipt(certificate_data, block)
         
-        # Generate QR code
-        qr_path = generate_qr_code(data["certificate_id"])
+        # QR code is rendered lazily on first request to serve_qr_code
+        qr_path = qr_code_url(data["certificate_id"])
         
         # Save certificate to database
         cert = Certificate(
             certificate_id=data["certificate_id"],
             student_name=data["student_name"].strip(),
             degree=data["degree"].strip(),
-            issue_date=data["issue_date"],
+            issue_date=datetime.date.fromisoformat(data["issue_date"]),
             qr_code_path=qr_path,
             created_by=current_user["username"]
         )
         
         db.session.add(cert)
+        index_certificate(cert)
+        record_issue(cert)
         db.session.commit()
+        pending_block = None
+        
+        # Pre-render the QR code in the background (no-op when QR_RENDER_WORKERS=0)
+        enqueue_qr_renders([block], [receipt])
         
         response_data = {
             "block": block.to_dict(),
             "certificate": cert.to_dict(),
-            "qr_code_url": f"/static/qrcodes/{data['certificate_id']}.png"
+            "qr_code_url": qr_path,
+            "receipt": receipt
         }
         
         return create_success_response(response_data, "Certificate added successfully", 201)
     
     except Exception as e:
         db.session.rollback()
+        if pending_block is not None:
+            blockchain.discard_block(pending_block)
         return create_error_response(f"Failed to get analytics: {str(e)}", 500)
 
 @cert_bp.route('/debug/certificate/<certificate_id>', methods=['GET'])
@@ -146,11 +225,15 @@ def debug_certificate(certificate_id):
         cert_in_db = Certificate.query.filter_by(certificate_id=certificate_id).first()
         
         # Check blockchain
-        block_in_chain = blockchain.find_certificate(certificate_id)
+        block_in_chain = find_stored_block(blockchain, certificate_id) if cert_in_db else blockchain.find_certificate(certificate_id)
         
-        # Get all certificates for comparison
-        all_certs = Certificate.query.all()
-        all_cert_ids = [c.certificate_id for c in all_certs]
+        # A bounded sample of IDs for comparison (only the ID column, never every row)
+        total = db.session.query(func.count(Certificate.id)).scalar()
+        sample_ids = [cid for cid, in db.session.query(Certificate.certificate_id)
+                      .order_by(Certificate.id).limit(DEBUG_ID_SAMPLE_SIZE)]
+        matches = [cid for cid, in db.session.query(Certificate.certificate_id)
+                   .filter(func.lower(Certificate.certificate_id).contains(certificate_id.lower(), autoescape=True))
+                   .order_by(Certificate.id).limit(DEBUG_ID_SAMPLE_SIZE)]
         
         debug_info = {
             "searched_certificate_id": certificate_id,
@@ -158,9 +241,10 @@ def debug_certificate(certificate_id):
             "found_in_blockchain": bool(block_in_chain),
             "database_details": cert_in_db.to_dict() if cert_in_db else None,
             "blockchain_details": block_in_chain.to_dict() if block_in_chain else None,
-            "total_certificates_in_db": len(all_cert_ids),
-            "all_certificate_ids": all_cert_ids,
-            "certificate_id_matches": [cid for cid in all_cert_ids if certificate_id.lower() in cid.lower()],
+            "total_certificates_in_db": total,
+            "all_certificate_ids": sample_ids,
+            "all_certificate_ids_truncated": total > len(sample_ids),
+            "certificate_id_matches": matches,
             "blockchain_chain_length": len(blockchain.chain),
             "blockchain_valid": blockchain.is_chain_valid()
         }
@@ -171,7 +255,8 @@ def debug_certificate(certificate_id):
         return create_error_response(f"Debug failed: {str(e)}", 500)
 
 @cert_bp.route('/verify/<certificate_id>', methods=['GET'])
-@jwt_required()
+@read_only
+@jwt_or_api_key("verify")
 def verify_certificate(certificate_id):
     """
     Verify a certificate by ID (User and Admin)
@@ -184,6 +269,8 @@ def verify_certificate(certificate_id):
         
         # Find certificate in database
         cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
+        if cert and not block:
+            block = find_stored_block(blockchain, certificate_id)  # Issued by another worker or the importer
         
         if not block or not cert:
             return create_error_response("Certificate not found", 404)
@@ -198,9 +285,9 @@ def verify_certificate(certificate_id):
                 "certificate_id": cert.certificate_id,
                 "student_name": cert.student_name,
                 "degree": cert.degree,
-                "issue_date": cert.issue_date,
+                "issue_date": cert.issue_date.isoformat(),
                 "created_by": cert.created_by,
-                "qr_code_url": f"/static/qrcodes/{cert.certificate_id}.png"
+                "qr_code_url": qr_code_url(cert.certificate_id)
             },
             "blockchain_data": block.to_dict(),
             "verification_timestamp": block.timestamp
@@ -212,6 +299,7 @@ def verify_certificate(certificate_id):
         return create_error_response(f"Verification failed: {str(e)}", 500)
 
 @cert_bp.route('/verify/simple/<certificate_id>', methods=['GET'])
+@read_only
 def verify_certificate_public(certificate_id):
     """
     Public certificate verification (no auth required)
@@ -222,6 +310,8 @@ def verify_certificate_public(certificate_id):
         
         # Find certificate in database
         cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
+        if cert and not block:
+            block = find_stored_block(blockchain, certificate_id)  # Issued by another worker or the importer
         
         if not block or not cert:
             return jsonify({
@@ -235,7 +325,7 @@ def verify_certificate_public(certificate_id):
             "certificate_id": cert.certificate_id,
             "student_name": cert.student_name,
             "degree": cert.degree,
-            "issue_date": cert.issue_date,
+            "issue_date": cert.issue_date.isoformat(),
             "verification_timestamp": datetime.datetime.utcnow().isoformat(),
             "blockchain_verified": True
         }
@@ -249,25 +339,128 @@ def verify_certificate_public(certificate_id):
             "certificate_id": certificate_id
         }), 500
 
+@cert_bp.route('/verify/status/<certificate_id>', methods=['GET'])
+@read_only
+def get_certificate_status(certificate_id):
+    """
+    Revocation status lookup for offline receipt verifiers (no auth required)
+    
+    Receipts prove what was issued; this is the only part that needs the server.
+    """
+    try:
+        cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
+        
+        if not cert:
+            return jsonify({
+                "certificate_id": certificate_id,
+                "status": "unknown"
+            }), 404
+        
+        return jsonify({
+            "certificate_id": cert.certificate_id,
+            "status": cert.status,
+            "revoked_at": cert.revoked_at,
+            "checked_at": datetime.datetime.utcnow().isoformat()
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            "certificate_id": certificate_id,
+            "error": str(e)
+        }), 500
+
+@cert_bp.route('/receipt/<certificate_id>', methods=['GET'])
+@read_only
+def get_certificate_receipt(certificate_id):
+    """
+    Get the signed offline verification receipt for a certificate (no auth required)
+    
+    Receipts are deterministic, so this returns the same receipt that was
+    embedded in the QR code at issuance.
+    """
+    try:
+        block = blockchain.find_certificate(certificate_id)
+        cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
+        if cert and not block:
+            block = find_stored_block(blockchain, certificate_id)
+        
+        if not block or not cert:
+            return create_error_response("Certificate not found", 404)
+        
+        if cert.status == 'revoked':
+            return create_error_response("Certificate has been revoked", 410)
+        
+        signer = get_receipt_signer()
+        response_data = {
+            "certificate_id": certificate_id,
+            "receipt": signer.issue_receipt(block.certificate_data, block),
+            "issuer_key": signer.public_key_info()
+        }
+        
+        return create_success_response(response_data, "Receipt retrieved successfully")
+    
+    except Exception as e:
+        return create_error_response(f"Failed to retrieve receipt: {str(e)}", 500)
+
+@cert_bp.route('/receipts/public_key', methods=['GET'])
+def get_receipt_public_key():
+    """
+    Get the issuer public key used to sign receipts (no auth required)
+    """
+    try:
+        return create_success_response(get_receipt_signer().public_key_info(), "Issuer public key retrieved")
+    
+    except Exception as e:
+        return create_error_response(f"Failed to retrieve public key: {str(e)}", 500)
+
 @cert_bp.route('/certificates', methods=['GET'])
+@read_only
 @jwt_required()
 @admin_required
 def get_certificates():
     """
-    Get all certificates (Admin only)
+    List certificates, newest first, one page at a time (Admin only)
+    
+    Query parameters: limit (default 50, max 500), cursor (next_cursor of the
+    previous page) and count (exact, approx or none).
     """
     try:
-        certificates = Certificate.query.all()
+        cursor = request.args.get('cursor', '').strip()
+        count_mode = request.args.get('count', 'none' if cursor else 'approx').strip().lower()
+        
+        try:
+            limit = parse_limit(request.args.get('limit'), 50, 500)
+        except ValueError as e:
+            return create_error_response(str(e), 400)
+        
+        if count_mode not in COUNT_MODES:
+            return create_error_response(f"count must be one of: {', '.join(COUNT_MODES)}", 400)
+        
+        fingerprint = filter_fingerprint({"list": "certificates"})
+        try:
+            after = decode_cursor(cursor, fingerprint) if cursor else None
+            certificates_query = apply_keyset(Certificate.query, [(Certificate.id, True)], after)
+        except ValueError as e:
+            return create_error_response(str(e), 400)
+        
+        total_count, total_exact = count_rows(Certificate.query, count_mode, table=Certificate.__tablename__)
+        certificates, has_more = fetch_page(certificates_query, limit)
         
         cert_list = []
         for cert in certificates:
             cert_data = cert.to_dict()
-            cert_data["qr_code_url"] = f"/static/qrcodes/{cert.certificate_id}.png"
+            cert_data["qr_code_url"] = qr_code_url(cert.certificate_id)
             cert_list.append(cert_data)
         
         response_data = {
             "certificates": cert_list,
-            "total_count": len(cert_list)
+            "total_count": total_count,
+            "pagination": {
+                "total_count_exact": total_exact,
+                "limit": limit,
+                "has_more": has_more,
+                "next_cursor": encode_cursor([certificates[-1].id], fingerprint) if has_more else None
+            }
         }
         
         return create_success_response(response_data, "Certificates retrieved successfully")
@@ -275,6 +468,43 @@ def get_certificates():
     except Exception as e:
         return create_error_response(f"Failed to retrieve certificates: {str(e)}", 500)
 
+@cert_bp.route('/certificates/export', methods=['GET'])
+@read_only
+@jwt_required()
+@admin_required
+def export_certificates():
+    """
+    Stream every certificate as NDJSON or CSV (Admin only)
+    
+    Query parameters: format (ndjson or csv, default ndjson), status (active
+    or revoked) and gzip (true to compress the download). Rows are streamed
+    as they are read, so memory use does not grow with the table.
+    """
+    export_format = request.args.get('format', 'ndjson').strip().lower()
+    status = request.args.get('status', '').strip().lower() or None
+    compress = request.args.get('gzip', 'false').strip().lower() in ('1', 'true', 'yes')
+    
+    if export_format not in EXPORT_FORMATS:
+        return create_error_response(f"format must be one of: {', '.join(EXPORT_FORMATS)}", 400)
+    if status not in (None, 'active', 'revoked'):
+        return create_error_response("status must be 'active' or 'revoked'", 400)
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    chunks = iter_export(
+        iter_certificate_rows(db.session, blockchain, status, current_app.config['EXPORT_BATCH_SIZE']),
+        export_format
+    )
+    filename = f"certificates-{datetime.date.today().isoformat()}.{extension}"
+    if compress:
+        chunks = gzip_chunks(chunks)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+    
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @cert_bp.route('/delete_certificate/<certificate_id>', methods=['DELETE'])
 @jwt_required()
 @admin_required
@@ -285,6 +515,7 @@ def delete_certificate(certificate_id):
     Note: This marks the certificate as revoked in the database and blockchain
     rather than physically deleting it to maintain blockchain integrity.
     """
+    pending_block = None  # In-memory block not yet committed with the revocation
     try:
         # Find certificate in database
         cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
@@ -305,28 +536,18 @@ def delete_certificate(certificate_id):
         cert.revoked_at = datetime.datetime.utcnow().isoformat()
         
         # Add revocation record to blockchain
-        revocation_data = {
-            "action": "REVOKE_CERTIFICATE",
-            "certificate_id": certificate_id,
-            "original_student": cert.student_name,
-            "original_degree": cert.degree,
-            "revoked_by": current_user["username"],
-            "revoked_at": cert.revoked_at,
-            "reason": "Certificate revoked by administrator"
-        }
+        revocation_block = pending_block = append_blocks(blockchain, [_revocation_data(cert)])[0]
+        update_certificate_status(cert)
+        record_revocation(cert)
         
-        revocation_block = blockchain.add_block(revocation_data)
-        
-        # Remove QR code file if it exists
-        import os
-        qr_path = f"static/qrcodes/{certificate_id}.png"
-        if os.path.exists(qr_path):
-            try:
-                os.remove(qr_path)
-            except:
-                pass  # If file removal fails, continue
+        # Remove QR code renderings if they exist
+        try:
+            _remove_qr_code(certificate_id)
+        except OSError:
+            pass  # If file removal fails, continue
         
         db.session.commit()
+        pending_block = None
         
         response_data = {
             "revoked_certificate": cert.to_dict(),
@@ -338,8 +559,59 @@ def delete_certificate(certificate_id):
     
     except Exception as e:
         db.session.rollback()
+        if pending_block is not None:
+            blockchain.discard_block(pending_block)
         return create_error_response(f"Failed to revoke certificate: {str(e)}", 500)
 
+@cert_bp.route('/revocations', methods=['GET'])
+def get_revocation_snapshot():
+    """
+    Compressed snapshot of all revoked certificates (no auth required)
+    
+    Query parameters:
+        format: "ids" (default) or "bitmap" keyed by issuance block index
+    
+    Offline verifiers sync this once, then poll /revocations/delta.
+    """
+    try:
+        refresh_chain(blockchain)
+        snapshot = build_snapshot(blockchain, request.args.get('format', 'ids'))
+        etag = f'"crl-{snapshot["format"]}-{snapshot["latest_block_hash"][:16]}"'
+        
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304, {'ETag': etag}
+        
+        response = jsonify(snapshot)
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'public, max-age=30'
+        return response, 200
+    
+    except ValueError as e:
+        return create_error_response(str(e), 400)
+    except Exception as e:
+        return create_error_response(f"Failed to build revocation snapshot: {str(e)}", 500)
+
+@cert_bp.route('/revocations/delta', methods=['GET'])
+def get_revocation_delta():
+    """
+    Revocations recorded after a given block height (no auth required)
+    
+    Query parameters:
+        since: Block height returned by the verifier's last snapshot or delta
+    """
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return create_error_response("Query parameter 'since' (block height) is required", 400)
+        
+        refresh_chain(blockchain)
+        return jsonify(build_delta(blockchain, since)), 200
+    
+    except ValueError as e:
+        return create_error_response(str(e), 400)
+    except Exception as e:
+        return create_error_response(f"Failed to build revocation delta: {str(e)}", 500)
+
 @cert_bp.route('/chain', methods=['GET'])
 @jwt_required()
 @admin_required
@@ -348,6 +620,7 @@ def get_blockchain():
     Get entire blockchain (Admin only)
     """
     try:
+        refresh_chain(blockchain)
         chain_data = [block.to_dict() for block in blockchain.chain]
         summary = blockchain.get_chain_summary()
         
@@ -369,6 +642,7 @@ def validate_blockchain():
     Validate blockchain integrity (Admin only)
     """
     try:
+        refresh_chain(blockchain)
         is_valid = blockchain.is_chain_valid()
         summary = blockchain.get_chain_summary()
         
@@ -384,6 +658,7 @@ def validate_blockchain():
         return create_error_response(f"Validation failed: {str(e)}", 500)
 
 @cert_bp.route('/dashboard', methods=['GET'])
+@read_only
 @jwt_required()
 @admin_required
 def get_dashboard_data():
@@ -393,26 +668,17 @@ def get_dashboard_data():
     try:
         current_user = get_current_user()
         
-        # Quick metrics
-        total_certificates = Certificate.query.count()
+        # Quick metrics and top degree types from the statistics rollup
+        summary = rollup_summary(datetime.date.today(), top_degrees=3, months=0)
+        total_certificates = summary["total"]
+        today_certs = summary["today"]
+        top_degrees = summary["top_degrees"]
         total_users = User.query.count()
         blockchain_health = blockchain.is_chain_valid()
         
         # Recent activity (last 10 certificates)
         recent_certs = Certificate.query.order_by(Certificate.id.desc()).limit(10).all()
         
-        # Today's activity
-        today = datetime.date.today()
-        today_certs = Certificate.query.filter(
-            func.date(Certificate.issue_date) == today
-        ).count()
-        
-        # Top degree types
-        top_degrees = db.session.query(
-            Certificate.degree, 
-            func.count(Certificate.id).label('count')
-        ).group_by(Certificate.degree).order_by(func.count(Certificate.id).desc()).limit(3).all()
-        
         # System alerts
         alerts = []
         if not blockchain_health:
@@ -447,7 +713,7 @@ def get_dashboard_data():
                     "certificate_id": cert.certificate_id,
                     "student_name": cert.student_name,
                     "degree": cert.degree,
-                    "issue_date": cert.issue_date,
+                    "issue_date": cert.issue_date.isoformat(),
                     "created_by": cert.created_by,
                     "time_ago": _calculate_time_ago(cert.issue_date)
                 } for cert in recent_certs
@@ -457,7 +723,8 @@ def get_dashboard_data():
                 for degree, count in top_degrees
             ],
             "system_alerts": alerts,
-            "last_updated": datetime.datetime.utcnow().isoformat()
+            "last_updated": datetime.datetime.utcnow().isoformat(),
+            "statistics_as_of": summary["as_of"]
         }
         
         return create_success_response(response_data, "Dashboard data retrieved successfully")
@@ -466,7 +733,8 @@ def get_dashboard_data():
         return create_error_response(f"Failed to retrieve dashboard data: {str(e)}", 500)
 
 @cert_bp.route('/search', methods=['GET'])
-@jwt_required()
+@read_only
+@jwt_or_api_key("search")
 def search_certificates():
     """
     Search certificates with filters (User and Admin)
@@ -477,19 +745,43 @@ def search_certificates():
         degree_filter = request.args.get('degree', '').strip()
         date_from = request.args.get('date_from', '').strip()
         date_to = request.args.get('date_to', '').strip()
-        limit = min(int(request.args.get('limit', 20)), 100)  # Max 100 results
-        offset = int(request.args.get('offset', 0))
+        cursor = request.args.get('cursor', '').strip()
+        count_mode = request.args.get('count', 'none' if cursor else 'approx').strip().lower()
+        
+        try:
+            limit = parse_limit(request.args.get('limit'), 20, 100)  # Max 100 results
+            offset = parse_offset(request.args.get('offset'))  # Deprecated in favour of cursor
+        except ValueError as e:
+            return create_error_response(str(e), 400)
+        
+        if count_mode not in COUNT_MODES:
+            return create_error_response(f"count must be one of: {', '.join(COUNT_MODES)}", 400)
+        
+        # Cursors are only valid for the filters they were issued with
+        fingerprint = filter_fingerprint({
+            "q": query, "degree": degree_filter, "date_from": date_from, "date_to": date_to
+        })
+        try:
+            after = decode_cursor(cursor, fingerprint) if cursor else None
+        except ValueError as e:
+            return create_error_response(str(e), 400)
         
         # Build query
         certificates_query = Certificate.query
         
-        # Text search (student name or certificate ID)
+        # Text search (student name, certificate ID or degree), ranked when a
+        # full-text index is available
+        rank = None
         if query:
-            certificates_query = certificates_query.filter(
-                (Certificate.student_name.ilike(f'%{query}%')) |
-                (Certificate.certificate_id.ilike(f'%{query}%')) |
-                (Certificate.degree.ilike(f'%{query}%'))
-            )
+            searched = apply_text_search(certificates_query, query, Certificate)
+            if searched is not None:
+                certificates_query, rank = searched
+            else:
+                certificates_query = certificates_query.filter(
+                    (Certificate.student_name.ilike(f'%{query}%')) |
+                    (Certificate.certificate_id.ilike(f'%{query}%')) |
+                    (Certificate.degree.ilike(f'%{query}%'))
+                )
         
         # Degree filter
         if degree_filter:
@@ -498,27 +790,52 @@ def search_certificates():
             )
         
         # Date range filter
-        if date_from:
-            certificates_query = certificates_query.filter(
-                Certificate.issue_date >= date_from
-            )
-        
-        if date_to:
-            certificates_query = certificates_query.filter(
-                Certificate.issue_date <= date_to
-            )
-        
-        # Get total count
-        total_count = certificates_query.count()
-        
-        # Apply pagination
-        certificates = certificates_query.order_by(Certificate.id.desc()).offset(offset).limit(limit).all()
+        try:
+            if date_from:
+                certificates_query = certificates_query.filter(
+                    Certificate.issue_date >= datetime.date.fromisoformat(date_from)
+                )
+            
+            if date_to:
+                certificates_query = certificates_query.filter(
+                    Certificate.issue_date <= datetime.date.fromisoformat(date_to)
+                )
+        except ValueError:
+            return create_error_response("date_from and date_to must be in YYYY-MM-DD format", 400)
+        
+        # Total count (bounded unless count=exact, skipped on cursor pages by default)
+        total_count, total_exact = count_rows(certificates_query, count_mode)
+        
+        # Keyset pagination: relevance first when ranked, then newest first
+        sort_keys = [(Certificate.id, True)]
+        if rank is not None:
+            sort_keys.insert(0, (rank, False))
+            certificates_query = certificates_query.add_columns(rank)
+        try:
+            certificates_query = apply_keyset(certificates_query, sort_keys, after)
+        except ValueError as e:
+            return create_error_response(str(e), 400)
+        if offset and after is None:
+            certificates_query = certificates_query.offset(offset)
+        
+        rows, has_more = fetch_page(certificates_query, limit)
+        certificates = [row[0] for row in rows] if rank is not None else rows
+        
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            sort_values = [last[1], last[0].id] if rank is not None else [last.id]
+            next_cursor = encode_cursor(sort_values, fingerprint)
+        
+        # Certificates issued by another worker or the importer need its blocks first
+        if any(blockchain.find_certificate(cert.certificate_id) is None for cert in certificates):
+            sync_chain(blockchain)
         
         # Format results
         results = []
         for cert in certificates:
             cert_data = cert.to_dict()
-            cert_data["qr_code_url"] = f"/static/qrcodes/{cert.certificate_id}.png"
+            cert_data["qr_code_url"] = qr_code_url(cert.certificate_id)
             
             # Verify in blockchain
             block = blockchain.find_certificate(cert.certificate_id)
@@ -533,9 +850,11 @@ def search_certificates():
             "results": results,
             "pagination": {
                 "total_count": total_count,
+                "total_count_exact": total_exact,
                 "limit": limit,
                 "offset": offset,
-                "has_more": (offset + limit) < total_count
+                "has_more": has_more,
+                "next_cursor": next_cursor
             },
             "search_params": {
                 "query": query,
@@ -546,15 +865,20 @@ def search_certificates():
             "search_time": datetime.datetime.utcnow().isoformat()
         }
         
-        return create_success_response(response_data, f"Found {total_count} certificates")
+        return create_success_response(response_data, f"Found {_describe_count(total_count, total_exact, len(results))} certificates")
     
     except Exception as e:
         return create_error_response(f"Search failed: {str(e)}", 500)
 
-def _calculate_time_ago(issue_date_str):
+def _describe_count(total_count, exact, page_size):
+    """Human-readable result count for response messages"""
+    if total_count is None:
+        return str(page_size)
+    return str(total_count) if exact else f"{total_count}+"
+
+def _calculate_time_ago(issue_date):
     """Calculate human-readable time ago"""
     try:
-        issue_date = datetime.datetime.strptime(issue_date_str, "%Y-%m-%d").date()
         today = datetime.date.today()
         diff = today - issue_date
         
@@ -576,18 +900,162 @@ def _calculate_time_ago(issue_date_str):
     except:
         return "Unknown"
 
+def _qr_payload(block, receipt=None):
+    """
+    Verification URL (with signed receipt) encoded in a certificate's QR code
+    
+    Ed25519 signatures are deterministic, so a block's payload never changes.
+    Payloads are kept in a bounded LRU and a receipt is only signed on a miss
+    (or passed in by the caller that just issued it).
+    """
+    signer = get_receipt_signer()
+    base_url = current_app.config["QR_BASE_URL"]
+    key = (block.hash, signer.key_id, base_url)
+    with _qr_payloads_lock:
+        payload = _qr_payloads.get(key)
+        if payload is not None:
+            _qr_payloads.move_to_end(key)
+            CACHE_LOOKUPS.inc("qr_payload", "hit")
+            return payload
+    
+    CACHE_LOOKUPS.inc("qr_payload", "miss")
+    receipt = receipt or signer.issue_receipt(block.certificate_data, block)
+    payload = verification_url(block.certificate_data["certificate_id"], base_url, receipt)
+    with _qr_payloads_lock:
+        _qr_payloads[key] = payload
+        while len(_qr_payloads) > QR_PAYLOAD_CACHE_SIZE:
+            _qr_payloads.popitem(last=False)
+    return payload
+
+def enqueue_qr_renders(blocks, receipts=None):
+    """
+    Queue background QR renders for newly committed blocks (no-op when QR_RENDER_WORKERS=0)
+    
+    Args:
+        blocks (list): Certificate blocks whose transaction has been committed
+        receipts (list): Receipts already issued for the blocks, if any (saves signing them again)
+    """
+    render_queue = get_qr_render_queue()
+    if not render_queue.enabled or not blocks:
+        return
+    try:
+        receipts = receipts or [None] * len(blocks)
+        render_queue.enqueue([
+            (block.certificate_data["certificate_id"], _qr_payload(block, receipt))
+            for block, receipt in zip(blocks, receipts)
+        ])
+    except Exception as e:
+        print(f"Error queueing QR render: {str(e)}")
+
+def _remove_qr_code(certificate_id):
+    """Delete pre-rendered files (sharded or flat) and cached renderings of a certificate"""
+    for legacy_path in legacy_qr_code_paths(certificate_id):
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+    
+    block = blockchain.find_certificate(certificate_id)
+    if block:
+        get_qr_cache().discard(_qr_payload(block))
+
 @cert_bp.route('/static/qrcodes/<filename>')
 def serve_qr_code(filename):
     """
-    Serve QR code images
+    Serve QR code images, rendering them on first request
+    
+    <certificate_id>.png serves a PNG and <certificate_id>.svg an SVG.
+    
+    Query parameters (optional):
+        mode: "1bit" for a compact PNG with one pixel per module
+        box_size: Pixels per module (1-40, default 10)
+        border: Quiet zone in modules (0-10, default 4)
     """
     try:
-        return send_from_directory('static/qrcodes', filename)
+        certificate_id, extension = os.path.splitext(filename)
+        if extension == '.svg':
+            output_format = 'svg'
+        elif extension == '.png':
+            output_format = 'png1' if request.args.get('mode') == '1bit' else 'png'
+        else:
+            return create_error_response("QR code not found", 404)
+        
+        params = {}
+        if 'box_size' in request.args:
+            params['box_size'] = min(max(request.args.get('box_size', type=int) or 10, 1), 40)
+        if 'border' in request.args:
+            params['border'] = min(max(request.args.get('border', type=int) or 0, 0), 10)
+        
+        # Certificates issued before lazy rendering have a pre-rendered file
+        if output_format == 'png' and not params:
+            for legacy_path in legacy_qr_code_paths(certificate_id):
+                if os.path.exists(legacy_path):
+                    return send_file(legacy_path, mimetype='image/png')
+        
+        block = blockchain.find_certificate(certificate_id)
+        cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
+        if cert and not block:
+            block = find_stored_block(blockchain, certificate_id)
+        if not block or not cert or cert.status == 'revoked':
+            return create_error_response("QR code not found", 404)
+        
+        image, key = get_qr_cache().get_image(_qr_payload(block), output_format, **params)
+        
+        return send_file(
+            io.BytesIO(image),
+            mimetype=OUTPUT_FORMATS[output_format][1],
+            etag=f"{key}.{output_format}",
+            max_age=3600
+        )
     except FileNotFoundError:
         return create_error_response("QR code not found", 404)
 
-@cert_bp.route('/verify/live/<certificate_id>', methods=['GET'])
+@cert_bp.route('/qr/jobs', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_qr_render_status():
+    """
+    Summary of background QR render jobs (Admin only)
+    """
+    try:
+        render_queue = get_qr_render_queue()
+        response_data = {
+            "workers": render_queue.workers,
+            "jobs": render_queue.status_counts()
+        }
+        
+        return create_success_response(response_data, "QR render status retrieved")
+    
+    except Exception as e:
+        return create_error_response(f"Failed to get QR render status: {str(e)}", 500)
+
+@cert_bp.route('/qr/jobs/<certificate_id>', methods=['GET'])
 @jwt_required()
+@admin_required
+def get_qr_render_job(certificate_id):
+    """
+    Render status of a certificate's QR code (Admin only)
+    
+    Status is "done", "queued" or "failed" for queued renders, and "lazy" when
+    the image will be rendered on its first request.
+    """
+    try:
+        job = QRRenderJob.query.filter_by(certificate_id=certificate_id).order_by(QRRenderJob.id.desc()).first()
+        
+        if job:
+            response_data = job.to_dict()
+        else:
+            if not Certificate.query.filter_by(certificate_id=certificate_id).first():
+                return create_error_response("Certificate not found", 404)
+            response_data = {"certificate_id": certificate_id, "status": "lazy"}
+        
+        response_data["qr_code_url"] = qr_code_url(certificate_id)
+        return create_success_response(response_data, "QR render job retrieved")
+    
+    except Exception as e:
+        return create_error_response(f"Failed to get QR render job: {str(e)}", 500)
+
+@cert_bp.route('/verify/live/<certificate_id>', methods=['GET'])
+@read_only
+@jwt_or_api_key("verify")
 def live_verify_certificate(certificate_id):
     """
     Live certificate verification with detailed blockchain info
@@ -598,6 +1066,8 @@ def live_verify_certificate(certificate_id):
         
         # Find certificate in database
         cert = Certificate.query.filter_by(certificate_id=certificate_id).first()
+        if cert and not block:
+            block = find_stored_block(blockchain, certificate_id)  # Issued by another worker or the importer
         
         verification_result = {
             "certificate_id": certificate_id,
@@ -628,9 +1098,9 @@ def live_verify_certificate(certificate_id):
                 "certificate_id": cert.certificate_id,
                 "student_name": cert.student_name,
                 "degree": cert.degree,
-                "issue_date": cert.issue_date,
+                "issue_date": cert.issue_date.isoformat(),
                 "issued_by": cert.created_by,
-                "qr_code_url": f"/static/qrcodes/{cert.certificate_id}.png"
+                "qr_code_url": qr_code_url(cert.certificate_id)
             },
             "blockchain_info": {
                 "block_index": block.index,
@@ -654,6 +1124,7 @@ def live_verify_certificate(certificate_id):
         return create_error_response(f"Verification failed: {str(e)}", 500)
 
 @cert_bp.route('/notifications', methods=['GET'])
+@read_only
 @jwt_required()
 def get_live_notifications():
     """
@@ -671,7 +1142,7 @@ def get_live_notifications():
                 "type": "certificate_added",
                 "title": "New Certificate Issued",
                 "message": f"Certificate {cert.certificate_id} issued to {cert.student_name}",
-                "timestamp": cert.issue_date,
+                "timestamp": cert.issue_date.isoformat(),
                 "data": {
                     "certificate_id": cert.certificate_id,
                     "student_name": cert.student_name,
@@ -703,6 +1174,7 @@ def get_live_notifications():
         return create_error_response(f"Failed to get notifications: {str(e)}", 500)
 
 @cert_bp.route('/stats', methods=['GET'])
+@read_only
 @jwt_required()
 @admin_required
 def get_stats():
@@ -710,19 +1182,21 @@ def get_stats():
     Get live system statistics (Admin only)
     """
     try:
-        # Certificate statistics
-        total_certificates = Certificate.query.count()
-        today = datetime.date.today()
-        certificates_today = Certificate.query.filter(
-            func.date(Certificate.issue_date) == today
-        ).count()
-        
-        # User statistics
-        total_users = User.query.count()
-        admin_users = User.query.filter_by(role='Admin').count()
-        regular_users = User.query.filter_by(role='User').count()
-        
-        # Blockchain statistics
+        # Certificate statistics from the rollup table (a few indexed reads)
+        summary = rollup_summary(datetime.date.today(), top_degrees=5, months=6)
+        total_certificates = summary["total"]
+        certificates_today = summary["today"]
+        degree_stats = summary["top_degrees"]
+        monthly_stats = summary["monthly_trends"]
+        
+        # User statistics (one grouped query on the role index)
+        users_per_role = dict(db.session.query(User.role, func.count(User.id)).group_by(User.role).all())
+        total_users = sum(users_per_role.values())
+        admin_users = users_per_role.get('Admin', 0)
+        regular_users = users_per_role.get('User', 0)
+        
+        # Blockchain statistics (with the blocks other workers stored)
+        refresh_chain(blockchain)
         total_blocks = len(blockchain.chain)
         is_chain_valid = blockchain.is_chain_valid()
         latest_block = blockchain.get_latest_block()
@@ -730,28 +1204,11 @@ def get_stats():
         # Recent certificates (last 5)
         recent_certificates = Certificate.query.order_by(Certificate.id.desc()).limit(5).all()
         
-        # Certificate distribution by degree (top 5)
-        degree_stats = db.session.query(
-            Certificate.degree, 
-            func.count(Certificate.id).label('count')
-        ).group_by(Certificate.degree).order_by(func.count(Certificate.id).desc()).limit(5).all()
-        
-        # Monthly certificate trends (last 6 months)
-        monthly_stats = []
-        for i in range(6):
-            month_start = datetime.date.today().replace(day=1) - datetime.timedelta(days=i*30)
-            month_count = Certificate.query.filter(
-                func.date(Certificate.issue_date) >= month_start,
-                func.date(Certificate.issue_date) < month_start + datetime.timedelta(days=30)
-            ).count()
-            monthly_stats.append({
-                "month": month_start.strftime("%Y-%m"),
-                "count": month_count
-            })
-        
         response_data = {
             "overview": {
                 "total_certificates": total_certificates,
+                "active_certificates": summary["by_status"].get('active', 0),
+                "revoked_certificates": summary["by_status"].get('revoked', 0),
                 "certificates_today": certificates_today,
                 "total_users": total_users,
                 "admin_users": admin_users,
@@ -772,7 +1229,7 @@ def get_stats():
                         "certificate_id": cert.certificate_id,
                         "student_name": cert.student_name,
                         "degree": cert.degree,
-                        "issue_date": cert.issue_date,
+                        "issue_date": cert.issue_date.isoformat(),
                         "created_by": cert.created_by,
                         "qr_code_available": bool(cert.qr_code_path)
                     } for cert in recent_certificates
@@ -783,7 +1240,8 @@ def get_stats():
                     {"degree": degree, "count": count} 
                     for degree, count in degree_stats
                 ],
-                "monthly_trends": monthly_stats[::-1]  # Reverse to show oldest first
+                "monthly_trends": monthly_stats,  # Oldest first
+                "as_of": summary["as_of"]
             },
             "system_health": {
                 "database_connected": True,
@@ -797,3 +1255,55 @@ def get_stats():
     
     except Exception as e:
         return create_error_response(f"Failed to retrieve statistics: {str(e)}", 500)
+
+@cert_bp.route('/analytics/live', methods=['GET'])
+@read_only
+@jwt_required()
+@admin_required
+def get_live_analytics():
+    """
+    Issuance trends, distributions and rates from the in-memory analytics snapshot (Admin only)
+    
+    Query parameters: window (days, default 180), granularity (day, week or
+    month, default week), top (entries per distribution, default 10) and
+    refresh (true to rebuild the snapshot now).
+    """
+    try:
+        window_days = int(request.args.get('window', 180))
+        top = int(request.args.get('top', 10))
+    except ValueError:
+        return create_error_response("window and top must be integers", 400)
+    
+    granularity = request.args.get('granularity', 'week').strip().lower()
+    refresh = request.args.get('refresh', 'false').strip().lower() in ('1', 'true', 'yes')
+    
+    if not 1 <= window_days <= 3660:
+        return create_error_response("window must be between 1 and 3660 days", 400)
+    if granularity not in GRANULARITIES:
+        return create_error_response(f"granularity must be one of: {', '.join(GRANULARITIES)}", 400)
+    top = max(1, min(top, 50))
+    
+    try:
+        report = get_analytics_engine().report(db.session, window_days, granularity, top, refresh=refresh)
+        return create_success_response(report, "Live analytics retrieved successfully")
+    
+    except Exception as e:
+        return create_error_response(f"Failed to get analytics: {str(e)}", 500)
+
+@cert_bp.route('/stats/rollups/rebuild', methods=['POST'])
+@jwt_required()
+@admin_required
+def rebuild_stats_rollups():
+    """
+    Recompute the statistics rollup table from the certificate table (Admin only)
+    """
+    try:
+        buckets = rebuild_rollups()
+        return create_success_response({
+            "buckets": buckets,
+            "rebuilt_at": datetime.datetime.utcnow().isoformat()
+        }, "Statistics rollups rebuilt successfully")
+    
+    except Exception as e:
+        db.session.rollback()
+        return create_error_response(f"Failed to rebuild statistics rollups: {str(e)}", 500)
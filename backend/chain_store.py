@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func, insert, text
+from blockchain import Block
+from database import db
+from models import ChainBlock
+
+# Serializes changes to this worker's in-memory chain between its request threads
+_chain_mutex = threading.RLock()
+_last_refresh = 0.0
+
+
+def block_row(block):
+    """Column values of the chain_block row for a block"""
+    return {
+        "block_index": block.index,
+        "timestamp": block.timestamp,
+        "certificate_id": block.certificate_data.get("certificate_id"),
+        "action": block.certificate_data.get("action"),
+        "data": json.dumps(block.certificate_data, sort_keys=True),
+        "previous_hash": block.previous_hash,
+        "hash": block.hash
+    }
+
+
+def persist_blocks(blocks):
+    """
+    Store new blocks in the caller's transaction with a single executemany
+
+    Args:
+        blocks (list): Blocks appended to the in-memory chain
+    """
+    if blocks:
+        db.session.execute(insert(ChainBlock), [block_row(block) for block in blocks])
+
+
+def lock_chain():
+    """
+    Hold the chain_block write lock until the caller's transaction ends
+
+    Serializes appends across workers and threads. The tail read after
+    taking the lock is the one the next block follows. SQLite takes its
+    database write lock and Postgres a self-conflicting table lock; readers
+    are not blocked.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        db.session.execute(text("UPDATE chain_block SET block_index = block_index WHERE 0 = 1"))
+    elif dialect == "postgresql":
+        db.session.execute(text("LOCK TABLE chain_block IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def sync_chain(blockchain):
+    """
+    Load the blocks other workers stored since this worker's chain was loaded
+
+    Each worker keeps its own in-memory chain over the shared table. If the
+    stored blocks do not continue this chain, it is reloaded from the table.
+
+    Returns:
+        int: Number of blocks appended or reloaded
+    """
+    global _last_refresh
+    with _chain_mutex:
+        _last_refresh = time.monotonic()
+        last_index = db.session.query(func.max(ChainBlock.block_index)).scalar()
+        if last_index is None or last_index < len(blockchain.chain):
+            return 0
+        new_blocks = list(iter_stored_blocks(start=len(blockchain.chain)))
+        if not new_blocks:
+            return 0
+        if new_blocks[0].previous_hash == blockchain.get_latest_block().hash:
+            return blockchain.extend_blocks(new_blocks)
+        return blockchain.load_blocks(iter_stored_blocks())
+
+
+def refresh_chain(blockchain):
+    """
+    sync_chain for endpoints that read the whole chain, at most every CHAIN_SYNC_SECONDS
+
+    Returns:
+        int: Number of blocks appended or reloaded
+    """
+    if time.monotonic() - _last_refresh < current_app.config.get("CHAIN_SYNC_SECONDS", 1.0):
+        return 0
+    return sync_chain(blockchain)
+
+
+def find_stored_block(blockchain, certificate_id):
+    """
+    A certificate's block, loading the blocks other workers stored if this chain lacks it
+
+    Call it once the certificate's row is known to exist, so unknown IDs never
+    cost a query; blocks written by another worker or import_certificates.py
+    are then verifiable here too.
+    """
+    block = blockchain.find_certificate(certificate_id)
+    if block is None and sync_chain(blockchain):
+        block = blockchain.find_certificate(certificate_id)
+    return block
+
+
+def append_blocks(blockchain, certificate_data):
+    """
+    Append one block per certificate_data entry after the stored tail and stage their rows
+
+    Takes the chain lock (see lock_chain) and catches up with other workers
+    first, so two workers never store the same block_index. The blocks are
+    written in the caller's transaction; on rollback the caller discards
+    them with Blockchain.discard_block.
+
+    Args:
+        blockchain: The application's Blockchain instance
+        certificate_data (list): Block payloads in chain order
+
+    Returns:
+        list: The new blocks
+    """
+    lock_chain()
+    with _chain_mutex:
+        sync_chain(blockchain)
+        blocks = [blockchain.add_block(data) for data in certificate_data]
+    try:
+        persist_blocks(blocks)
+    except Exception:
+        for block in reversed(blocks):
+            blockchain.discard_block(block)
+        raise
+    return blocks
+
+
+def stored_block_count():
+    """Number of persisted blocks"""
+    return db.session.query(func.count(ChainBlock.block_index)).scalar()
+
+
+def iter_stored_blocks(batch_size=5000, start=0):
+    """
+    Stream persisted blocks in chain order, from block index start
+
+    The stored hash is kept as-is rather than recomputed, so is_chain_valid
+    still detects rows that were edited in the database.
+    """
+    query = db.session.query(
+        ChainBlock.block_index,
+        ChainBlock.timestamp,
+        ChainBlock.data,
+        ChainBlock.previous_hash,
+        ChainBlock.hash
+    ).filter(ChainBlock.block_index >= start).order_by(ChainBlock.block_index).yield_per(batch_size)
+
+    for block_index, timestamp, data, previous_hash, block_hash in query:
+        yield Block(block_index, json.loads(data), previous_hash, timestamp=timestamp, block_hash=block_hash)
@@ -1,3 +1,204 @@
+import threading
+import time
+from flask import g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 
-db = SQLAlchemy()
+# Bind key of the optional read replica (SQLALCHEMY_BINDS)
+REPLICA_BIND = "replica"
+
+# Set after a write; while it is in the future the client reads from the primary
+STICKY_COOKIE = "db_primary_until"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends queries from read-only endpoints to the read replica
+
+    Everything else - writes, flushes, requests that already wrote, clients
+    that wrote recently and code running outside a request - uses the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None and _use_replica():
+                g.db_route = "replica"
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+# username -> monotonic-clock deadline, for API clients that do not keep cookies
+_recent_writers = {}
+_recent_writers_lock = threading.Lock()
+
+
+def read_only(f):
+    """Decorator marking an endpoint whose queries may be served by the read replica"""
+    def decorator(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+    decorator.__name__ = f.__name__
+    return decorator
+
+
+def _request_identity():
+    """JWT identity of the current request, if one was verified"""
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _is_sticky():
+    """Whether the client wrote recently enough that it must read its own writes"""
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+
+    identity = _request_identity()
+    if identity is None:
+        return False
+    with _recent_writers_lock:
+        deadline = _recent_writers.get(identity)
+    return deadline is not None and deadline > time.monotonic()
+
+
+def _use_replica():
+    if not has_request_context() or not g.get("db_read_only") or g.get("db_wrote"):
+        return False
+    if "db_sticky" not in g:
+        g.db_sticky = _is_sticky()
+    return not g.db_sticky
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def init_read_routing(app):
+    """
+    Register read-your-writes stickiness for the read replica
+
+    After a request that wrote, the client gets a short-lived cookie (and its
+    JWT identity is remembered in-process) so its next reads go to the primary
+    until the replica has had time to catch up.
+    """
+    sticky_seconds = app.config.get('READ_REPLICA_STICKY_SECONDS', 5)
+
+    @app.after_request
+    def route_reads_after_writes(response):
+        if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return response
+
+        if g.get("db_wrote"):
+            response.set_cookie(
+                STICKY_COOKIE, str(int(time.time() + sticky_seconds) + 1),
+                max_age=sticky_seconds + 1, httponly=True, samesite='Lax'
+            )
+            identity = _request_identity()
+            if identity is not None:
+                with _recent_writers_lock:
+                    _recent_writers[identity] = time.monotonic() + sticky_seconds
+                    if len(_recent_writers) > 10000:
+                        now = time.monotonic()
+                        for name in [name for name, deadline in _recent_writers.items() if deadline <= now]:
+                            del _recent_writers[name]
+
+        if g.get("db_read_only"):
+            response.headers['X-DB-Route'] = g.get("db_route", "primary")
+        return response
+
+
+# "auto" picks the tuned profile matching the database URL; "default" leaves
+# SQLAlchemy's engine untouched
+ENGINE_PROFILES = ("auto", "default", "sqlite", "postgres")
+
+
+def resolve_engine_profile(database_uri, profile="auto"):
+    """
+    Pick the engine profile for a database URL
+
+    Returns:
+        str: "default", "sqlite" or "postgres"
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database engine profile: {profile}")
+    if profile != "auto":
+        return profile
+    if database_uri.startswith("sqlite"):
+        return "sqlite"
+    if database_uri.startswith(("postgresql", "postgres")):
+        return "postgres"
+    return "default"
+
+
+def sqlite_pragmas(config):
+    """PRAGMA statements applied to every new SQLite connection by the sqlite profile"""
+    return [
+        "PRAGMA journal_mode=WAL",  # Readers no longer block behind the writer
+        f"PRAGMA synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",  # fsync at checkpoints only (safe with WAL)
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",  # Wait for locks instead of failing
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+        f"PRAGMA cache_size=-{int(config.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))}",  # Negative = KiB
+        "PRAGMA temp_store=MEMORY"
+    ]
+
+
+def engine_options(database_uri, profile, config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for an engine profile
+
+    Args:
+        database_uri (str): SQLALCHEMY_DATABASE_URI
+        profile (str): One of ENGINE_PROFILES
+        config: Mapping with the optional SQLITE_* / DB_POOL_* settings
+
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    profile = resolve_engine_profile(database_uri, profile)
+
+    if profile == "sqlite":
+        return {
+            # The driver waits this long for a lock before raising "database is locked"
+            "connect_args": {"timeout": int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000}
+        }
+
+    if profile == "postgres":
+        return {
+            "pool_size": int(config.get('DB_POOL_SIZE', 10)),
+            "max_overflow": int(config.get('DB_MAX_OVERFLOW', 20)),
+            "pool_timeout": int(config.get('DB_POOL_TIMEOUT', 30)),
+            "pool_recycle": int(config.get('DB_POOL_RECYCLE', 1800)),  # Drop connections before server-side idle timeouts
+            "pool_pre_ping": True  # Replace connections killed by failovers or restarts
+        }
+
+    return {}
+
+
+def configure_engine(engine, profile, config):
+    """
+    Attach connect-time tuning to an engine (SQLite pragmas)
+
+    Must run before the engine opens its first connection.
+    """
+    if resolve_engine_profile(str(engine.url), profile) != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import zlib
+from models import Certificate
+
+# Columns of an export row, in CSV column order
+EXPORT_FIELDS = [
+    "certificate_id",
+    "student_name",
+    "degree",
+    "issue_date",
+    "issued_at",
+    "created_by",
+    "status",
+    "revoked_by",
+    "revoked_at",
+    "block_index",
+    "block_hash"
+]
+
+# Export format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv")
+}
+
+_COLUMNS = [
+    Certificate.id,
+    Certificate.certificate_id,
+    Certificate.student_name,
+    Certificate.degree,
+    Certificate.issue_date,
+    Certificate.issued_at,
+    Certificate.created_by,
+    Certificate.status,
+    Certificate.revoked_by,
+    Certificate.revoked_at
+]
+
+
+def iter_certificate_rows(session, blockchain, status=None, batch_size=1000):
+    """
+    Stream certificates as plain dicts with their issuance block
+
+    Rows are read through a server-side cursor (yield_per) as column tuples,
+    so neither the result set nor ORM objects are held in memory. Block data
+    comes from the chain's certificate index instead of a chain scan per row.
+
+    Args:
+        session: Database session
+        blockchain: Blockchain instance
+        status (str): Optional status filter ("active" or "revoked")
+        batch_size (int): Rows fetched per round trip
+
+    Yields:
+        dict: One export row (see EXPORT_FIELDS)
+    """
+    query = session.query(*_COLUMNS)
+    if status:
+        query = query.filter(Certificate.status == status)
+    query = query.order_by(Certificate.id).yield_per(batch_size)
+
+    for row in query:
+        block = blockchain.certificate_index.get(row.certificate_id)
+        yield {
+            "certificate_id": row.certificate_id,
+            "student_name": row.student_name,
+            "degree": row.degree,
+            "issue_date": row.issue_date.isoformat(),
+            "issued_at": row.issued_at.isoformat() if row.issued_at else None,
+            "created_by": row.created_by,
+            "status": row.status,
+            "revoked_by": row.revoked_by,
+            "revoked_at": row.revoked_at,
+            "block_index": block.index if block else None,
+            "block_hash": block.hash if block else None
+        }
+
+
+def iter_export(rows, export_format, rows_per_chunk=500):
+    """
+    Serialize rows to NDJSON or CSV, yielding a few hundred rows per chunk
+
+    Args:
+        rows: Iterable of export row dicts
+        export_format (str): "ndjson" or "csv"
+        rows_per_chunk (int): Rows serialized into each yielded chunk
+
+    Yields:
+        bytes: Encoded output
+    """
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+
+    pending = 0
+    for row in rows:
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, separators=(",", ":")))
+            buffer.write("\n")
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member, incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
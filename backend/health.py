@@ -0,0 +1,228 @@
+import datetime
+import os
+import threading
+import time
+from flask import current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, text
+from auth import admin_required
+from database import db
+from utils import create_error_response, create_success_response
+
+
+def ping_database():
+    """Whether the database answers a trivial query"""
+    try:
+        db.session.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        db.session.rollback()
+        return False
+
+
+def deep_check():
+    """
+    Full consistency check: database, chain integrity, stored blocks and rollups
+
+    Costs a full chain validation and several counts, so it runs in the
+    background (see HealthMonitor), never on a probe request.
+
+    Returns:
+        dict: passed, per-check results and the counters gathered on the way
+    """
+    from certificates import blockchain
+    from chain_store import stored_block_count, sync_chain
+    from models import Certificate, CertificateRollup, User
+
+    started = time.perf_counter()
+    checks = {"database": {"ok": ping_database()}}
+    if checks["database"]["ok"]:
+        sync_chain(blockchain)  # This worker's chain may lag behind the blocks other workers stored
+    counters = {"blockchain_blocks": len(blockchain.chain)}
+
+    checks["chain"] = {"ok": blockchain.is_chain_valid(), "blocks": counters["blockchain_blocks"]}
+
+    if checks["database"]["ok"]:
+        counters["total_certificates"] = Certificate.query.count()
+        counters["total_users"] = User.query.count()
+        stored = stored_block_count()
+        checks["stored_blocks"] = {
+            "ok": stored == counters["blockchain_blocks"],
+            "stored": stored,
+            "in_memory": counters["blockchain_blocks"]
+        }
+        rolled_up = int(db.session.query(func.coalesce(func.sum(CertificateRollup.certificate_count), 0)).scalar())
+        checks["rollups"] = {
+            "ok": rolled_up == counters["total_certificates"],
+            "rollup_total": rolled_up,
+            "certificates": counters["total_certificates"]
+        }
+
+    return {
+        "passed": all(check["ok"] for check in checks.values()),
+        "checks": checks,
+        "counters": counters,
+        "finished_at": time.time(),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+
+class HealthMonitor:
+    """
+    Caches the result of the deep check for cheap liveness/readiness probes
+
+    Probes never do the expensive work: readiness reports the last deep
+    check's chain status and counters with their ages, and starts a new
+    check in a background thread once the last one is older than max_age.
+    A check that raised says nothing about the chain, so it is reported as
+    "error" rather than "invalid" and retried after retry_after seconds.
+    """
+
+    def __init__(self, app, max_age=300, retry_after=30):
+        self.app = app
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.started_at = time.time()
+        self.last_check = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_deep_check(self):
+        """Start a deep check in the background; False if one is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(target=self._run, name="health-deep-check", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        with self.app.app_context():
+            try:
+                result = deep_check()
+            except Exception as e:
+                result = {"passed": False, "error": str(e), "checks": {}, "counters": {},
+                          "finished_at": time.time(), "duration_ms": None}
+            finally:
+                db.session.remove()
+        self.last_check = result
+
+    def describe_last_check(self, now=None):
+        """The last deep check with timestamps made readable, or None"""
+        check = self.last_check
+        if check is None:
+            return None
+        now = now or time.time()
+        return {
+            **check,
+            "finished_at": datetime.datetime.utcfromtimestamp(check["finished_at"]).isoformat(),
+            "age_seconds": round(now - check["finished_at"], 1)
+        }
+
+    def liveness(self):
+        """Process-only status: no database, no locks"""
+        return {
+            "status": "alive",
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1)
+        }
+
+    def readiness(self):
+        """
+        Database ping plus the cached chain audit and counters
+
+        Returns:
+            tuple: (ready, details)
+        """
+        now = time.time()
+        check = self.last_check
+        refresh_after = self.retry_after if check is not None and "error" in check else self.max_age
+        if (check is None or now - check["finished_at"] > refresh_after) and not self.running:
+            self.start_deep_check()
+
+        database_ok = ping_database()
+        if check is None:
+            chain = {"status": "pending", "age_seconds": None}
+        elif "error" in check:
+            chain = {"status": "error", "error": check["error"], "age_seconds": round(now - check["finished_at"], 1)}
+        else:
+            chain_ok = check["checks"].get("chain", {}).get("ok", False)
+            chain = {"status": "valid" if chain_ok else "invalid", "age_seconds": round(now - check["finished_at"], 1)}
+
+        ready = database_ok and chain["status"] != "invalid"
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "database": "online" if database_ok else "offline",
+            "blockchain": chain,
+            "counters": {
+                **(check["counters"] if check else {}),
+                "age_seconds": chain["age_seconds"]
+            },
+            "deep_check_running": self.running
+        }
+
+
+def get_health_monitor():
+    """Get the application's health monitor, creating it on first use"""
+    monitor = current_app.extensions.get("health_monitor")
+    if monitor is None:
+        monitor = HealthMonitor(
+            current_app._get_current_object(),
+            current_app.config.get("HEALTH_CHECK_MAX_AGE", 300),
+            current_app.config.get("HEALTH_CHECK_RETRY_SECONDS", 30)
+        )
+        current_app.extensions["health_monitor"] = monitor
+    return monitor
+
+
+def init_health(app):
+    """
+    Register the liveness, readiness and deep check endpoints
+
+    /api/health/live never touches the database; /api/health/ready pings it
+    once and reports cached results. Only an admin's POST /api/health/deep
+    (or a stale cache, past HEALTH_CHECK_MAX_AGE, or HEALTH_CHECK_RETRY_SECONDS
+    after a check that failed to run) runs the full check.
+    """
+    app.extensions["health_monitor"] = HealthMonitor(
+        app, app.config.get('HEALTH_CHECK_MAX_AGE', 300), app.config.get('HEALTH_CHECK_RETRY_SECONDS', 30)
+    )
+
+    @app.route('/api/health/live', methods=['GET'])
+    def health_live():
+        return create_success_response(get_health_monitor().liveness(), "Process is alive")
+
+    @app.route('/api/health/ready', methods=['GET'])
+    def health_ready():
+        ready, details = get_health_monitor().readiness()
+        if not ready:
+            response, _ = create_error_response("Service not ready", 503)
+            response["data"] = details
+            return response, 503
+        return create_success_response(details, "Service is ready")
+
+    @app.route('/api/health/deep', methods=['POST'])
+    @jwt_required()
+    @admin_required
+    def start_deep_health_check():
+        monitor = get_health_monitor()
+        started = monitor.start_deep_check()
+        return create_success_response(
+            {"started": started, "running": True, "last_check": monitor.describe_last_check()},
+            "Deep health check started" if started else "Deep health check already running",
+            202
+        )
+
+    @app.route('/api/health/deep', methods=['GET'])
+    @jwt_required()
+    @admin_required
+    def get_deep_health_check():
+        monitor = get_health_monitor()
+        return create_success_response(
+            {"running": monitor.running, "last_check": monitor.describe_last_check()},
+            "Deep health check result"
+        )
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Bulk Certificate Import Script
+Streams certificates from a CSV or NDJSON file (optionally gzip-compressed)
+into the database and the blockchain in batches.
+
+Each batch is validated with the same rules as POST /add_certificate, then
+written in one transaction: certificate rows and chain blocks with one
+executemany each, plus the search index and statistics rollups. A failed
+batch is rolled back and its blocks are removed from the chain. With
+QR_RENDER_WORKERS > 0, committed batches queue their QR renders too.
+
+Blocks are appended under the chain lock, so the API server can keep
+running. Its workers load the imported blocks from the chain_block table
+the first time one of the new certificates is looked up.
+
+Usage:
+    python import_certificates.py certificates.csv [--batch-size 5000] [--issued-by admin]
+
+Columns: certificate_id, student_name, degree, issue_date (YYYY-MM-DD) and
+optionally issued_by.
+"""
+
+import argparse
+import csv
+import datetime
+import gzip
+import json
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_loader import load_app
+
+FIELDS = ("certificate_id", "student_name", "degree", "issue_date")
+
+def detect_format(path):
+    """csv or ndjson, from the file extension (a trailing .gz is ignored)"""
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path}; use --format csv or --format ndjson")
+
+def iter_records(path, file_format):
+    """
+    Stream (line_number, record) pairs from the input file
+
+    Unparseable NDJSON lines are yielded with a None record so they are
+    counted as invalid instead of aborting the import.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as handle:
+        if file_format == "csv":
+            for line_number, record in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, record
+            return
+
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+
+def normalize(record, default_issuer):
+    """Trim the certificate fields the way POST /add_certificate does"""
+    data = {field: str(record.get(field) or "").strip() for field in FIELDS}
+    data["issued_by"] = str(record.get("issued_by") or "").strip() or default_issuer
+    return data
+
+def write_batch(batch, blockchain):
+    """
+    Write one batch of validated certificates in a single transaction
+
+    Args:
+        batch (list): Normalized certificate dicts
+        blockchain: The application's Blockchain instance
+
+    Returns:
+        int: Number of certificates written
+    """
+    from sqlalchemy import insert
+    from certificates import enqueue_qr_renders
+    from chain_store import append_blocks
+    from database import db
+    from models import Certificate
+    from search_index import index_certificate_ids
+    from stats_rollup import record_issues
+    from utils import qr_code_url
+
+    issued_at = datetime.datetime.utcnow()
+    blocks = []
+    try:
+        blocks = append_blocks(blockchain, [{
+            "certificate_id": data["certificate_id"],
+            "student_name": data["student_name"],
+            "degree": data["degree"],
+            "issue_date": data["issue_date"],
+            "issued_by": data["issued_by"]
+        } for data in batch])
+        rows = []
+        for data in batch:
+            rows.append({
+                "certificate_id": data["certificate_id"],
+                "student_name": data["student_name"],
+                "degree": data["degree"],
+                "issue_date": datetime.date.fromisoformat(data["issue_date"]),
+                "issued_at": issued_at,
+                "qr_code_path": qr_code_url(data["certificate_id"]),
+                "created_by": data["issued_by"],
+                "status": "active"
+            })
+
+        db.session.execute(insert(Certificate), rows)
+        index_certificate_ids([row["certificate_id"] for row in rows])
+        record_issues(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for block in reversed(blocks):
+            blockchain.discard_block(block)
+        raise
+
+    # Pre-render the QR codes in the background (no-op when QR_RENDER_WORKERS=0)
+    enqueue_qr_renders(blocks)
+    return len(rows)
+
+def import_certificates(path, file_format, batch_size, default_issuer, strict=False, max_errors_shown=20):
+    """
+    Import every valid, new certificate from path
+
+    Returns:
+        dict: Counts of imported, invalid and duplicate rows plus the elapsed time
+    """
+    import certificates
+    from database import db
+    from models import Certificate
+    from utils import validate_certificate_data
+
+    blockchain = certificates.blockchain
+    counts = {"imported": 0, "invalid": 0, "duplicate": 0}
+    started = time.perf_counter()
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        # The chain indexes every certificate, but check the table too in case
+        # rows were written without blocks since startup
+        ids = [data["certificate_id"] for data in batch]
+        existing = {row[0] for row in db.session.query(Certificate.certificate_id)
+                    .filter(Certificate.certificate_id.in_(ids))}
+        fresh = [data for data in batch if data["certificate_id"] not in existing]
+        counts["duplicate"] += len(batch) - len(fresh)
+
+        if fresh:
+            counts["imported"] += write_batch(fresh, blockchain)
+        batch.clear()
+
+        elapsed = time.perf_counter() - started
+        print(f"📦 {counts['imported']:,} imported ({counts['imported'] / elapsed:,.0f} rows/s), "
+              f"{counts['invalid']:,} invalid, {counts['duplicate']:,} duplicate")
+
+    pending_ids = set()
+    for line_number, record in iter_records(path, file_format):
+        if record is None:
+            is_valid, error_message = False, "Unreadable record"
+        else:
+            data = normalize(record, default_issuer)
+            is_valid, error_message = validate_certificate_data(data)
+            if is_valid and len(data["issued_by"]) > 80:
+                is_valid, error_message = False, "issued_by must be at most 80 characters"
+
+        if not is_valid:
+            counts["invalid"] += 1
+            if strict:
+                raise ValueError(f"Line {line_number}: {error_message}")
+            if counts["invalid"] <= max_errors_shown:
+                print(f"⚠️  Line {line_number}: {error_message}")
+            continue
+
+        # Repeated within this file, or already on the chain
+        if data["certificate_id"] in pending_ids or blockchain.find_certificate(data["certificate_id"]):
+            counts["duplicate"] += 1
+            continue
+
+        batch.append(data)
+        pending_ids.add(data["certificate_id"])
+        if len(batch) >= batch_size:
+            flush()
+            pending_ids.clear()
+
+    flush()
+    counts["elapsed"] = time.perf_counter() - started
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import certificates from CSV or NDJSON")
+    parser.add_argument("path", help="Input file (.csv, .ndjson or .jsonl, optionally .gz)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Certificates per transaction")
+    parser.add_argument("--issued-by", default="admin", help="Issuer recorded for rows without an issued_by column")
+    parser.add_argument("--strict", action="store_true", help="Stop at the first invalid row instead of skipping it")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"❌ File not found: {args.path}")
+        sys.exit(1)
+    if args.batch_size < 1:
+        print("❌ --batch-size must be at least 1")
+        sys.exit(1)
+
+    try:
+        file_format = args.format or detect_format(args.path)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    app = load_app()
+    with app.app_context():
+        print(f"🚀 Importing {args.path} ({file_format}, batches of {args.batch_size:,})...")
+        try:
+            counts = import_certificates(args.path, file_format, args.batch_size, args.issued_by, args.strict)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        from qr_render_queue import get_qr_render_queue
+        render_queue = get_qr_render_queue()
+        if render_queue.enabled:
+            print("🖼️  Waiting for the queued QR renders...")
+            render_queue.wait()
+
+    rate = counts["imported"] / counts["elapsed"] if counts["elapsed"] else 0
+    print(f"✅ Imported {counts['imported']:,} certificates in {counts['elapsed']:.1f}s ({rate:,.0f} rows/s)")
+    if counts["invalid"] or counts["duplicate"]:
+        print(f"⏭️  Skipped {counts['invalid']:,} invalid and {counts['duplicate']:,} duplicate rows")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ sys.path.append('.')
 
 from models import db, User, Certificate
 from app import create_app
+from migrations import downgrade, upgrade
 
 def init_database():
     """Initialize database with correct schema"""
@@ -24,10 +25,10 @@ def init_database():
         
         # Drop all tables and recreate them
         print("🔄 Dropping existing tables...")
-        db.drop_all()
+        downgrade(db.engine, 0)
         
         print("🏗️  Creating tables with new schema...")
-        db.create_all()
+        upgrade(db.engine)
         
         # Verify table structure
         from sqlalchemy import text
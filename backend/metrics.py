@@ -0,0 +1,207 @@
+import bisect
+import threading
+import time
+from flask import Response, g, request
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, label_names=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}  # label values -> value
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def samples(self):
+        """(suffix, label names, label values, value) for every series"""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self.label_names, labels, value) for labels, value in items]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination"""
+
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a function at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, label_names=(), registry=None):
+        super().__init__(name, documentation, label_names, registry)
+        self._function = None
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function):
+        """Read the (unlabelled) value from function() on each scrape"""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            return [("", (), (), self._function())]
+        return super().samples()
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets, plus their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, label_names, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels):
+        """Context manager observing the seconds its block takes"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        samples = []
+        bounds = self.buckets + (float("inf"),)
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                samples.append(("_bucket", self.label_names, labels, cumulative, f'le="{_format_value(bound)}"'))
+            samples.append(("_sum", self.label_names, labels, total))
+            samples.append(("_count", self.label_names, labels, cumulative))
+        return samples
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Registry:
+    """The metrics of one process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample in metric.samples():
+                suffix, names, values, value = sample[:4]
+                extra = sample[4] if len(sample) > 4 else ""
+                lines.append(f"{metric.name}{suffix}{_format_labels(names, values, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP, per blueprint endpoint ("cert.search_certificates"); unmatched URLs count as "none"
+HTTP_REQUESTS = Counter("http_requests_total", "Requests by endpoint, method and status", ("endpoint", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Request latency by endpoint", ("endpoint",))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled by this process")
+
+# Blockchain and caches
+CHAIN_LENGTH = Gauge("blockchain_length", "Blocks in the in-memory chain, genesis included")
+BLOCK_APPEND_SECONDS = Histogram("blockchain_append_seconds", "Time to hash and append one block")
+CHAIN_VALIDATION_SECONDS = Histogram("blockchain_validation_seconds", "Time to validate the whole chain")
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit, miss, ...)", ("cache", "result"))
+QR_RENDER_SECONDS = Histogram("qr_render_seconds", "Time to render one QR image on a cache miss", ("format",))
+
+
+def init_metrics(app):
+    """
+    Record per-endpoint request metrics and serve them on /metrics
+
+    Metrics are per process: with several workers, scrape each one (or run
+    the app under one multi-threaded process). Disabled with METRICS_ENABLED=false.
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            endpoint = request.endpoint or "none"
+            HTTP_LATENCY.observe(time.perf_counter() - started, endpoint)
+            HTTP_REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        return response
+
+    @app.teardown_request
+    def finish_request(exception=None):
+        if g.pop("metrics_started", None) is not None:
+            HTTP_IN_FLIGHT.dec()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -1,124 +1,75 @@
 #!/usr/bin/env python3
 """
 Database Migration Script
-Adds new columns to existing Certificate table for revocation functionality
+Applies the versioned schema migrations in migrations/versions. Run it at
+deploy time, before starting the new version of the app.
+
+Usage:
+    python migrate_database.py [status|upgrade|downgrade] [version] [--database-url URL]
+
+    status            Show applied and pending migrations
+    upgrade [N]       Apply pending migrations (up to version N)
+    downgrade N       Revert migrations newer than version N (0 = everything)
+
+The database defaults to DATABASE_URL, like the app.
 """
 
-import sqlite3
+import argparse
 import os
-from datetime import datetime
+import sys
 
-def migrate_database():
-    """Add new columns to the certificate table"""
-    db_path = os.path.join('instance', 'certificates.db')
-    
-    if not os.path.exists(db_path):
-        print("❌ Database file not found. Please run the application first to create the database.")
-        return False
-    
-    print(f"🔄 Migrating database: {db_path}")
-    
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check if columns already exist
-        cursor.execute("PRAGMA table_info(certificate)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        print(f"📋 Current columns: {columns}")
-        
-        migrations_needed = []
-        
-        # Check and add status column
-        if 'status' not in columns:
-            migrations_needed.append(
-                "ALTER TABLE certificate ADD COLUMN status VARCHAR(20) DEFAULT 'active'"
-            )
-            print("➕ Will add 'status' column")
-        
-        # Check and add revoked_by column
-        if 'revoked_by' not in columns:
-            migrations_needed.append(
-                "ALTER TABLE certificate ADD COLUMN revoked_by INTEGER"
-            )
-            print("➕ Will add 'revoked_by' column")
-        
-        # Check and add revoked_at column
-        if 'revoked_at' not in columns:
-            migrations_needed.append(
-                "ALTER TABLE certificate ADD COLUMN revoked_at DATETIME"
-            )
-            print("➕ Will add 'revoked_at' column")
-        
-        if not migrations_needed:
-            print("✅ Database is already up to date!")
-            conn.close()
-            return True
-        
-        # Execute migrations
-        for migration in migrations_needed:
-            print(f"🔄 Executing: {migration}")
-            cursor.execute(migration)
-        
-        # Update all existing certificates to have active status
-        cursor.execute("UPDATE certificate SET status = 'active' WHERE status IS NULL")
-        rows_updated = cursor.rowcount
-        print(f"📝 Updated {rows_updated} existing certificates to 'active' status")
-        
-        conn.commit()
-        conn.close()
-        
-        print("✅ Database migration completed successfully!")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Migration failed: {str(e)}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
-        return False
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def verify_migration():
-    """Verify that the migration was successful"""
-    db_path = os.path.join('instance', 'certificates.db')
-    
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check table structure
-        cursor.execute("PRAGMA table_info(certificate)")
-        columns = cursor.fetchall()
-        
-        print("\n📊 Final table structure:")
-        for col in columns:
-            print(f"  - {col[1]} ({col[2]})")
-        
-        # Check data
-        cursor.execute("SELECT COUNT(*) FROM certificate")
-        total_certs = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM certificate WHERE status = 'active'")
-        active_certs = cursor.fetchone()[0]
-        
-        print(f"\n📈 Certificate statistics:")
-        print(f"  - Total certificates: {total_certs}")
-        print(f"  - Active certificates: {active_certs}")
-        
-        conn.close()
-        return True
-        
-    except Exception as e:
-        print(f"❌ Verification failed: {str(e)}")
-        return False
+from sqlalchemy import create_engine
+from database import configure_engine, engine_options
+from migrations import current_version, discover, downgrade, pending_migrations, upgrade
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'app.db')
+
+def database_engine(database_url):
+    """Engine with the same tuning profile the app uses"""
+    profile = os.getenv('DB_ENGINE_PROFILE', 'auto')
+    engine = create_engine(database_url, **engine_options(database_url, profile, {}))
+    configure_engine(engine, profile, {})
+    return engine
+
+def show_status(engine):
+    version = current_version(engine)
+    pending = {module.VERSION for module in pending_migrations(engine)}
+    print(f"📋 Schema version: {version}")
+    for module in discover():
+        marker = "⏳" if module.VERSION in pending else "✅"
+        print(f"  {marker} {module.VERSION:04d} {module.DESCRIPTION}")
 
 if __name__ == "__main__":
-    print("🚀 Starting database migration...")
-    print("=" * 50)
-    
-    if migrate_database():
-        verify_migration()
-        print("\n🎉 Migration process completed!")
-    else:
-        print("\n💥 Migration process failed!")
+    parser = argparse.ArgumentParser(description="Apply or revert versioned schema migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["status", "upgrade", "downgrade"])
+    parser.add_argument("version", nargs="?", type=int, help="Target version")
+    parser.add_argument("--database-url", default=os.getenv('DATABASE_URL', f'sqlite:///{DEFAULT_DB_PATH}'))
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per committed batch in backfills")
+    args = parser.parse_args()
+
+    if args.command == "downgrade" and args.version is None:
+        print("❌ downgrade needs a target version (0 reverts everything)")
+        sys.exit(1)
+
+    if args.database_url.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(os.path.abspath(args.database_url[len("sqlite:///"):])), exist_ok=True)
+
+    engine = database_engine(args.database_url)
+    try:
+        if args.command == "status":
+            show_status(engine)
+        elif args.command == "upgrade":
+            print("🚀 Starting database migration...")
+            applied = upgrade(engine, args.version, args.batch_size)
+            print(f"✅ Applied {len(applied)} migration(s); schema version {current_version(engine)}")
+        else:
+            reverted = downgrade(engine, args.version)
+            print(f"✅ Reverted {len(reverted)} migration(s); schema version {current_version(engine)}")
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
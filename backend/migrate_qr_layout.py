@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+QR Storage Migration Script
+Moves flat static/qrcodes/<certificate_id>.png files (and flat QR cache
+entries) into the hash-prefix sharded layout: <root>/ab/cd/<name>.<ext>
+"""
+
+import argparse
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from qr_cache import OUTPUT_FORMATS, sharded_path
+from utils import QR_CODE_DIR
+
+def migrate_directory(root, dry_run=False):
+    """Move every flat image file in root into its shard directory"""
+    if not os.path.isdir(root):
+        print(f"⏭️  Skipping missing directory: {root}")
+        return 0
+    
+    extensions = sorted((ext for ext, _ in OUTPUT_FORMATS.values()), key=len, reverse=True)
+    moved = 0
+    
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            
+            extension = next((ext for ext in extensions if entry.name.endswith(f".{ext}")), None)
+            if extension is None:
+                continue
+            
+            name = entry.name[:-(len(extension) + 1)]
+            target = sharded_path(root, name, extension)
+            
+            if dry_run:
+                print(f"  🔎 {entry.name} -> {os.path.relpath(target, root)}")
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(entry.path, target)
+            moved += 1
+    
+    return moved
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qr-dir", default=QR_CODE_DIR, help="Pre-rendered QR code directory")
+    parser.add_argument("--cache-dir", default=os.getenv("QR_CACHE_DIR", os.path.join(QR_CODE_DIR, "cache")),
+                        help="Content-addressed QR cache directory")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the files that would move")
+    args = parser.parse_args()
+    
+    print("🚀 Migrating QR codes to the sharded layout...")
+    print("=" * 50)
+    
+    for root in (args.qr_dir, args.cache_dir):
+        print(f"🔄 {root}")
+        moved = migrate_directory(root, args.dry_run)
+        action = "Would move" if args.dry_run else "Moved"
+        print(f"📝 {action} {moved} files")
+    
+    print("\n🎉 QR migration completed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Versioned schema migrations
+
+Each module in migrations/versions named m<NNNN>_<name>.py defines VERSION,
+DESCRIPTION, upgrade(op) and downgrade(op), where op is an Operations
+instance. A migration runs in one transaction unless it sets
+TRANSACTIONAL = False, in which case it may commit between batches
+(op.backfill) to avoid holding long locks on big tables. Applied versions are
+recorded in the schema_migrations table.
+"""
+
+import datetime
+import importlib
+import pkgutil
+from contextlib import contextmanager
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from migrations.operations import Operations
+
+# Arbitrary key for the Postgres advisory lock taken while migrating
+MIGRATION_LOCK_KEY = 804212
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", String(30), nullable=False)
+)
+
+
+def discover():
+    """
+    Load the migration modules in version order
+
+    Raises:
+        ValueError: If two modules share a version or a version is skipped
+    """
+    from migrations import versions
+
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+        if info.name.startswith("m")
+    ]
+    modules.sort(key=lambda module: module.VERSION)
+
+    for expected, module in enumerate(modules, start=1):
+        if module.VERSION != expected:
+            raise ValueError(f"Migration {module.__name__} has version {module.VERSION}, expected {expected}")
+    return modules
+
+
+def head_version():
+    """Version of the newest migration"""
+    return len(discover())
+
+
+def applied_versions(connection):
+    """Set of versions recorded in schema_migrations"""
+    if not inspect(connection).has_table(schema_migrations.name):
+        return set()
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def current_version(engine):
+    """Highest applied version (0 for an unmigrated database)"""
+    with engine.connect() as connection:
+        return max(applied_versions(connection), default=0)
+
+
+def pending_migrations(engine):
+    """Migration modules not yet applied, in the order upgrade() would run them"""
+    with engine.connect() as connection:
+        applied = applied_versions(connection)
+    return [module for module in discover() if module.VERSION not in applied]
+
+
+@contextmanager
+def _migration_lock(engine):
+    """Serialize concurrent migration runs (Postgres; SQLite has a single writer anyway)"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+
+
+def _record(connection, module):
+    connection.execute(schema_migrations.insert().values(
+        version=module.VERSION,
+        description=module.DESCRIPTION,
+        applied_at=datetime.datetime.utcnow().isoformat()
+    ))
+
+
+def _apply(engine, module, batch_size, log):
+    """Run one upgrade; returns False if another process applied it first"""
+    transactional = getattr(module, "TRANSACTIONAL", True)
+    with engine.connect() as connection:
+        op = Operations(connection, transactional, batch_size, log)
+        if transactional:
+            # Claiming the version first makes a concurrent run fail here, before any
+            # DDL, and opens the transaction the DDL then joins (SQLite)
+            try:
+                _record(connection, module)
+            except IntegrityError:
+                connection.rollback()
+                return False
+            module.upgrade(op)
+            connection.commit()
+            return True
+
+        # Non-transactional migrations are idempotent, so a rerun after a crash resumes them
+        module.upgrade(op)
+        connection.commit()
+        if module.VERSION not in applied_versions(connection):
+            _record(connection, module)
+        connection.commit()
+        return True
+
+
+def upgrade(engine, target=None, batch_size=5000, log=print):
+    """
+    Apply pending migrations up to target (default: the newest)
+
+    Args:
+        engine: SQLAlchemy engine of the database to migrate
+        target (int): Last version to apply
+        batch_size (int): Rows per committed batch in backfills
+        log (callable): Progress output
+
+    Returns:
+        list: Versions applied by this call
+    """
+    schema_migrations.create(engine, checkfirst=True)
+    applied = []
+    with _migration_lock(engine):
+        for module in pending_migrations(engine):
+            if target is not None and module.VERSION > target:
+                break
+            log(f"⬆️  {module.VERSION:04d} {module.DESCRIPTION}")
+            if _apply(engine, module, batch_size, log):
+                applied.append(module.VERSION)
+    return applied
+
+
+def downgrade(engine, target, log=print):
+    """
+    Revert applied migrations newer than target, newest first
+
+    Returns:
+        list: Versions reverted by this call
+    """
+    reverted = []
+    with _migration_lock(engine):
+        with engine.connect() as connection:
+            applied = applied_versions(connection)
+        for module in reversed(discover()):
+            if module.VERSION <= target or module.VERSION not in applied:
+                continue
+            log(f"⬇️  {module.VERSION:04d} {module.DESCRIPTION}")
+            with engine.connect() as connection:
+                op = Operations(connection, getattr(module, "TRANSACTIONAL", True), log=log)
+                # Deleting the record first opens the transaction the DDL then joins (SQLite)
+                connection.execute(schema_migrations.delete().where(schema_migrations.c.version == module.VERSION))
+                module.downgrade(op)
+                connection.commit()
+            reverted.append(module.VERSION)
+    return reverted
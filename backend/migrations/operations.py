@@ -0,0 +1,182 @@
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+
+class Operations:
+    """
+    Schema operations available to a migration's upgrade() and downgrade()
+
+    Every operation is idempotent (creating something that exists or dropping
+    something that is missing is a no-op), so a migration can run against a
+    database that was created with db.create_all() or the old hand-rolled
+    migration script.
+    """
+
+    def __init__(self, connection, transactional=True, batch_size=5000, log=print):
+        self.connection = connection
+        self.transactional = transactional
+        self.batch_size = batch_size
+        self.log = log
+
+    @property
+    def dialect(self):
+        """"sqlite", "postgresql", ..."""
+        return self.connection.dialect.name
+
+    def quote(self, name):
+        """A table, column or index name as an identifier (reserved words such as user are quoted)"""
+        return self.connection.dialect.identifier_preparer.quote(name)
+
+    def execute(self, statement, **params):
+        return self.connection.execute(text(statement), params)
+
+    def commit(self):
+        """Commit the work so far (only in migrations with TRANSACTIONAL = False)"""
+        if not self.transactional:
+            self.connection.commit()
+
+    def has_table(self, table):
+        return inspect(self.connection).has_table(table)
+
+    def columns(self, table):
+        """Reflected columns of a table by name (empty if the table is missing)"""
+        if not self.has_table(table):
+            return {}
+        return {column["name"]: column for column in inspect(self.connection).get_columns(table)}
+
+    def column_type(self, table, column):
+        """Declared type of a column as this database spells it, e.g. VARCHAR(80)"""
+        return self.columns(table)[column]["type"].compile(dialect=self.connection.dialect)
+
+    def create_table(self, table):
+        """Create a sqlalchemy Table (defined in the migration, not taken from models.py)"""
+        if not self.has_table(table.name):
+            self.log(f"  ➕ Creating table {table.name}")
+            table.create(self.connection)
+
+    def drop_table(self, table):
+        if self.has_table(table):
+            self.log(f"  ➖ Dropping table {table}")
+            self.execute(f"DROP TABLE {self.quote(table)}")
+
+    def add_column(self, table, column):
+        """Add a sqlalchemy Column; NOT NULL columns need a server_default"""
+        if column.name not in self.columns(table):
+            ddl = CreateColumn(column).compile(dialect=self.connection.dialect)
+            self.log(f"  ➕ Adding column {table}.{column.name}")
+            self.execute(f"ALTER TABLE {self.quote(table)} ADD COLUMN {ddl}")
+
+    def drop_column(self, table, column):
+        """Drop a column (drop its indexes first; needs SQLite 3.35+)"""
+        if column in self.columns(table):
+            self.log(f"  ➖ Dropping column {table}.{column}")
+            self.execute(f"ALTER TABLE {self.quote(table)} DROP COLUMN {self.quote(column)}")
+
+    def create_index(self, name, table, columns, unique=False):
+        """
+        Create an index if it is missing
+
+        In a non-transactional migration on Postgres the index is built
+        CONCURRENTLY, so writes to the table are not blocked meanwhile.
+        """
+        keyword = "UNIQUE INDEX" if unique else "INDEX"
+        target = f"{self.quote(name)} ON {self.quote(table)} ({', '.join(self.quote(column) for column in columns)})"
+        if self.dialect == "postgresql" and not self.transactional:
+            self.commit()
+            autocommit = self.connection.execution_options(isolation_level="AUTOCOMMIT")
+            autocommit.execute(text(f"CREATE {keyword} CONCURRENTLY IF NOT EXISTS {target}"))
+            return
+        self.execute(f"CREATE {keyword} IF NOT EXISTS {target}")
+
+    def drop_index(self, name):
+        self.execute(f"DROP INDEX IF EXISTS {self.quote(name)}")
+
+    def backfill(self, table, assignments, where):
+        """
+        UPDATE rows matching where in batches of batch_size
+
+        Args:
+            table (str): Table with an integer id primary key
+            assignments (str): SET clause, e.g. "status = 'active'"
+            where (str): Rows still needing the update; must stop matching once updated
+
+        Returns:
+            int: Rows updated
+
+        In a non-transactional migration every batch is committed on its own,
+        so other writers only ever wait for one batch.
+        """
+        updated = 0
+        quoted = self.quote(table)
+        while True:
+            result = self.execute(
+                f"UPDATE {quoted} SET {assignments} "
+                f"WHERE id IN (SELECT id FROM {quoted} WHERE {where} LIMIT :batch_size)",
+                batch_size=self.batch_size
+            )
+            self.commit()
+            if result.rowcount <= 0:
+                break
+            updated += result.rowcount
+            self.log(f"  📝 Backfilled {updated} {table} rows")
+        return updated
+
+    def alter_columns(self, table, changes):
+        """
+        Change column types and/or nullability
+
+        Args:
+            table (str): Table name
+            changes (dict): column -> {"type": TypeEngine, "nullable": bool,
+                "using": SQL expression converting the old value (Postgres)}
+
+        SQLite cannot alter columns, so the table is rebuilt: created under a
+        temporary name, copied in one INSERT ... SELECT, swapped in and given
+        its indexes back. Columns that already match are left alone; when
+        nothing differs the table is not touched.
+        """
+        current = self.columns(table)
+        dialect = self.connection.dialect
+        pending = {}
+        for column, change in changes.items():
+            if column not in current:
+                continue
+            reflected = current[column]
+            if "type" in change and change["type"].compile(dialect=dialect) != reflected["type"].compile(dialect=dialect):
+                pending[column] = change
+            elif "nullable" in change and change["nullable"] != reflected["nullable"]:
+                pending[column] = change
+        if not pending:
+            return
+
+        self.log(f"  🔧 Altering {table}: {', '.join(pending)}")
+        if self.dialect == "postgresql":
+            for column, change in pending.items():
+                alter = f"ALTER TABLE {self.quote(table)} ALTER COLUMN {self.quote(column)}"
+                if "type" in change:
+                    using = f" USING {change['using']}" if change.get("using") else ""
+                    self.execute(f"{alter} TYPE {change['type'].compile(dialect=dialect)}{using}")
+                if "nullable" in change:
+                    self.execute(f"{alter} {'DROP' if change['nullable'] else 'SET'} NOT NULL")
+            return
+
+        self._rebuild_table(table, pending)
+
+    def _rebuild_table(self, table, pending):
+        old = Table(table, MetaData(), autoload_with=self.connection)
+        temporary = old.to_metadata(MetaData(), name=f"_{table}_rebuild")
+        temporary.indexes.clear()
+        for column, change in pending.items():
+            if "type" in change:
+                temporary.c[column].type = change["type"]
+            if "nullable" in change:
+                temporary.c[column].nullable = change["nullable"]
+
+        self.execute(f"DROP TABLE IF EXISTS {self.quote(temporary.name)}")
+        temporary.create(self.connection)
+        names = ", ".join(self.quote(column.name) for column in old.columns)
+        self.execute(f"INSERT INTO {self.quote(temporary.name)} ({names}) SELECT {names} FROM {self.quote(table)}")
+        self.execute(f"DROP TABLE {self.quote(table)}")
+        self.execute(f"ALTER TABLE {self.quote(temporary.name)} RENAME TO {self.quote(table)}")
+        for index in old.indexes:
+            index.create(self.connection)
@@ -0,0 +1,51 @@
+"""
+Baseline: the user and certificate tables as originally shipped
+
+Databases created before versioned migrations already have these tables;
+the revocation columns are added if they predate those too.
+"""
+
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+VERSION = 1
+DESCRIPTION = "Baseline user and certificate tables"
+
+metadata = MetaData()
+
+user = Table(
+    "user", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(80), unique=True, nullable=False),
+    Column("password_hash", String(128), nullable=False),
+    Column("role", String(10), nullable=False)
+)
+
+certificate = Table(
+    "certificate", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("certificate_id", String(64), unique=True, nullable=False),
+    Column("student_name", String(120), nullable=False),
+    Column("degree", String(120), nullable=False),
+    Column("issue_date", String(20), nullable=False),
+    Column("qr_code_path", String(256), nullable=True),
+    Column("created_by", String(80), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("revoked_by", String(80), nullable=True),
+    Column("revoked_at", String(30), nullable=True)
+)
+
+
+def upgrade(op):
+    op.create_table(user)
+    op.create_table(certificate)
+
+    # Pre-revocation databases
+    op.add_column("certificate", Column("status", String(20), nullable=False, server_default="active"))
+    op.add_column("certificate", Column("revoked_by", String(80), nullable=True))
+    op.add_column("certificate", Column("revoked_at", String(30), nullable=True))
+    op.execute("UPDATE certificate SET status = 'active' WHERE status IS NULL")
+
+
+def downgrade(op):
+    op.drop_table("certificate")
+    op.drop_table("user")
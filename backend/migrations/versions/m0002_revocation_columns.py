@@ -0,0 +1,25 @@
+"""
+Fix the revocation column types
+
+The old migrate_database.py added revoked_by as INTEGER and revoked_at as
+DATETIME, while the model stores a username and an ISO timestamp string. It
+also left status nullable.
+"""
+
+from sqlalchemy import String
+
+VERSION = 2
+DESCRIPTION = "Fix revocation column types and status nullability"
+
+
+def upgrade(op):
+    op.alter_columns("certificate", {
+        "revoked_by": {"type": String(80), "using": "CAST(revoked_by AS VARCHAR(80))"},
+        "revoked_at": {"type": String(30), "using": "CAST(revoked_at AS VARCHAR(30))"},
+        "status": {"nullable": False}
+    })
+
+
+def downgrade(op):
+    # The legacy schema was never intended, so there is nothing to restore
+    pass
@@ -0,0 +1,63 @@
+"""
+Typed issue dates, the issued_at timestamp and the secondary indexes
+
+issued_at is backfilled in committed batches so writers are never locked out
+for a full-table update. Index builds are CONCURRENTLY on Postgres.
+"""
+
+from sqlalchemy import Column, Date, DateTime, String
+
+VERSION = 3
+DESCRIPTION = "Typed issue_date, issued_at and secondary indexes"
+TRANSACTIONAL = False
+
+# Secondary indexes declared on models.Certificate / models.User
+INDEXES = [
+    ("ix_certificate_issue_date", "certificate", ["issue_date"]),
+    ("ix_certificate_status_issue_date", "certificate", ["status", "issue_date"]),
+    ("ix_certificate_degree", "certificate", ["degree"]),
+    ("ix_certificate_created_by_issued_at", "certificate", ["created_by", "issued_at"]),
+    ("ix_user_role", "user", ["role"])
+]
+
+
+def upgrade(op):
+    op.add_column("certificate", Column("issued_at", DateTime, nullable=True))
+    op.commit()
+
+    if op.dialect == "postgresql":
+        day = "substr(CAST(issue_date AS TEXT), 1, 10)"
+        op.backfill("certificate", f"issued_at = CAST({day} AS TIMESTAMP)", "issued_at IS NULL")
+    else:
+        # SQLAlchemy's Date/DateTime types read ISO strings, so only the
+        # representation needs normalizing (e.g. "2025-09-01 00:00:00" -> "2025-09-01")
+        day = "substr(issue_date, 1, 10)"
+        op.backfill(
+            "certificate",
+            f"issue_date = {day}, issued_at = {day} || ' 00:00:00.000000'",
+            "issued_at IS NULL"
+        )
+
+    op.alter_columns("certificate", {
+        "issue_date": {"type": Date(), "using": f"CAST({day} AS DATE)"},
+        "issued_at": {"nullable": False}
+    })
+    op.commit()
+
+    for name, table, columns in INDEXES:
+        op.log(f"  🔄 Creating index {name}")
+        op.create_index(name, table, columns)
+
+    # Refresh planner statistics so the new indexes get picked
+    op.execute("ANALYZE")
+    op.commit()
+
+
+def downgrade(op):
+    for name, _, _ in INDEXES:
+        op.drop_index(name)
+    op.drop_column("certificate", "issued_at")
+    op.alter_columns("certificate", {
+        "issue_date": {"type": String(20), "using": "CAST(issue_date AS VARCHAR(20))"}
+    })
+    op.commit()
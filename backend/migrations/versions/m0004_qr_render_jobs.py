@@ -0,0 +1,26 @@
+"""Background QR render jobs (qr_render_queue.py)"""
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table
+
+VERSION = 4
+DESCRIPTION = "QR render job table"
+
+qr_render_job = Table(
+    "qr_render_job", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("certificate_id", String(64), nullable=False),
+    Column("cache_key", String(64), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("error", String(256), nullable=True),
+    Column("created_at", String(30), nullable=False),
+    Column("finished_at", String(30), nullable=True),
+    Index("ix_qr_render_job_certificate_id", "certificate_id")
+)
+
+
+def upgrade(op):
+    op.create_table(qr_render_job)
+
+
+def downgrade(op):
+    op.drop_table("qr_render_job")
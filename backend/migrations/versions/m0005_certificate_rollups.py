@@ -0,0 +1,31 @@
+"""
+Statistics rollups behind /stats and /dashboard (stats_rollup.py)
+
+The table is filled by ensure_rollups() at startup.
+"""
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, MetaData, String, Table, UniqueConstraint
+
+VERSION = 5
+DESCRIPTION = "Certificate rollup table"
+
+certificate_rollup = Table(
+    "certificate_rollup", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("day", Date, nullable=False),
+    Column("degree", String(120), nullable=False),
+    Column("issuer", String(80), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("certificate_count", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    UniqueConstraint("day", "degree", "issuer", "status", name="uq_certificate_rollup_key"),
+    Index("ix_certificate_rollup_day", "day")
+)
+
+
+def upgrade(op):
+    op.create_table(certificate_rollup)
+
+
+def downgrade(op):
+    op.drop_table("certificate_rollup")
@@ -0,0 +1,31 @@
+"""
+Persisted blockchain blocks (chain_store.py)
+
+Existing certificates get their blocks on the next startup, when
+rebuild_blockchain_from_database() replays the ones the table is missing.
+"""
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, Text
+
+VERSION = 6
+DESCRIPTION = "Chain block table"
+
+chain_block = Table(
+    "chain_block", MetaData(),
+    Column("block_index", Integer, primary_key=True, autoincrement=False),
+    Column("timestamp", String(30), nullable=False),
+    Column("certificate_id", String(64), nullable=True),
+    Column("action", String(40), nullable=True),
+    Column("data", Text, nullable=False),
+    Column("previous_hash", String(64), nullable=False),
+    Column("hash", String(64), nullable=False, unique=True),
+    Index("ix_chain_block_certificate_id", "certificate_id")
+)
+
+
+def upgrade(op):
+    op.create_table(chain_block)
+
+
+def downgrade(op):
+    op.drop_table("chain_block")
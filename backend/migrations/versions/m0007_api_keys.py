@@ -0,0 +1,27 @@
+"""Scoped API keys for service clients (api_keys.py)"""
+
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+VERSION = 7
+DESCRIPTION = "API key table"
+
+api_key = Table(
+    "api_key", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("prefix", String(16), unique=True, nullable=False),
+    Column("key_hash", String(64), nullable=False),
+    Column("name", String(80), nullable=False),
+    Column("scopes", String(200), nullable=False),
+    Column("rate_limit", Integer, nullable=True),
+    Column("created_by", String(80), nullable=False),
+    Column("created_at", String(30), nullable=False),
+    Column("revoked_at", String(30), nullable=True)
+)
+
+
+def upgrade(op):
+    op.create_table(api_key)
+
+
+def downgrade(op):
+    op.drop_table("api_key")
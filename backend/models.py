@@ -1,20 +1,30 @@
+import datetime
 from database import db
-from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(db.Model):
     """User model for authentication with role-based access"""
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    role = db.Column(db.String(10), nullable=False)  # 'Admin' or 'User'
+    role = db.Column(db.String(10), nullable=False, index=True)  # 'Admin' or 'User'
 
     def set_password(self, password):
-        """Hash and set the user's password"""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set the user's password (in the hashing pool; may raise HashingBusy)"""
+        from passwords import get_password_hasher
+        self.password_hash = get_password_hasher().hash(password)
 
     def check_password(self, password):
-        """Verify the user's password"""
-        return check_password_hash(self.password_hash, password)
+        """
+        Verify the user's password (in the hashing pool; may raise HashingBusy)
+
+        If the stored hash used an outdated algorithm or cost, password_hash is
+        replaced with a fresh one; commit the session to keep it.
+        """
+        from passwords import get_password_hasher
+        matches, new_hash = get_password_hasher().verify(password, self.password_hash)
+        if new_hash:
+            self.password_hash = new_hash
+        return matches
 
     def to_dict(self):
         """Convert user object to dictionary"""
@@ -26,11 +36,23 @@ class User(db.Model):
 
 class Certificate(db.Model):
     """Certificate model for storing certificate metadata"""
+    __table_args__ = (
+        # "today" / monthly counts in /stats and /dashboard, date range in /search
+        db.Index('ix_certificate_issue_date', 'issue_date'),
+        # active vs revoked counts per day
+        db.Index('ix_certificate_status_issue_date', 'status', 'issue_date'),
+        # degree filter and degree distribution (covering for GROUP BY degree)
+        db.Index('ix_certificate_degree', 'degree'),
+        # certificates per issuer, most recent first
+        db.Index('ix_certificate_created_by_issued_at', 'created_by', 'issued_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     certificate_id = db.Column(db.String(64), unique=True, nullable=False)
     student_name = db.Column(db.String(120), nullable=False)
     degree = db.Column(db.String(120), nullable=False)
-    issue_date = db.Column(db.String(20), nullable=False)
+    issue_date = db.Column(db.Date, nullable=False)
+    issued_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)  # When it was recorded
     qr_code_path = db.Column(db.String(256), nullable=True)
     created_by = db.Column(db.String(80), nullable=False)  # Admin who created it
     status = db.Column(db.String(20), nullable=False, default='active')  # 'active' or 'revoked'
@@ -44,10 +66,86 @@ class Certificate(db.Model):
             'certificate_id': self.certificate_id,
             'student_name': self.student_name,
             'degree': self.degree,
-            'issue_date': self.issue_date,
+            'issue_date': self.issue_date.isoformat(),
+            'issued_at': self.issued_at.isoformat() if self.issued_at else None,
             'qr_code_path': self.qr_code_path,
             'created_by': self.created_by,
             'status': self.status,
             'revoked_by': self.revoked_by,
             'revoked_at': self.revoked_at
         }
+
+class QRRenderJob(db.Model):
+    """Background QR rendering job (see qr_render_queue.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    certificate_id = db.Column(db.String(64), nullable=False, index=True)
+    cache_key = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'done' or 'failed'
+    error = db.Column(db.String(256), nullable=True)
+    created_at = db.Column(db.String(30), nullable=False)
+    finished_at = db.Column(db.String(30), nullable=True)
+
+    def to_dict(self):
+        """Convert render job to dictionary"""
+        return {
+            'id': self.id,
+            'certificate_id': self.certificate_id,
+            'cache_key': self.cache_key,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+class CertificateRollup(db.Model):
+    """Certificate counts per day, degree, issuer and status (see stats_rollup.py)"""
+    __table_args__ = (
+        db.UniqueConstraint('day', 'degree', 'issuer', 'status', name='uq_certificate_rollup_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)  # Certificate issue_date
+    degree = db.Column(db.String(120), nullable=False)
+    issuer = db.Column(db.String(80), nullable=False)  # Certificate created_by
+    status = db.Column(db.String(20), nullable=False)
+    certificate_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+class ChainBlock(db.Model):
+    """Persisted blockchain block, so hashes and timestamps survive restarts (see chain_store.py)"""
+    __tablename__ = 'chain_block'
+
+    block_index = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    timestamp = db.Column(db.String(30), nullable=False)
+    certificate_id = db.Column(db.String(64), nullable=True, index=True)
+    action = db.Column(db.String(40), nullable=True)  # e.g. REVOKE_CERTIFICATE, None for issuance
+    data = db.Column(db.Text, nullable=False)  # certificate_data as canonical JSON
+    previous_hash = db.Column(db.String(64), nullable=False)
+    hash = db.Column(db.String(64), nullable=False, unique=True)
+
+class ApiKey(db.Model):
+    """Scoped key for service clients; only a hash of the secret is stored (see api_keys.py)"""
+    __tablename__ = 'api_key'
+
+    id = db.Column(db.Integer, primary_key=True)
+    prefix = db.Column(db.String(16), unique=True, nullable=False)  # Public part, used for lookup
+    key_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the full key
+    name = db.Column(db.String(80), nullable=False)
+    scopes = db.Column(db.String(200), nullable=False)  # Comma-separated, e.g. "verify,search"
+    rate_limit = db.Column(db.Integer, nullable=True)  # Requests per minute, None = route default
+    created_by = db.Column(db.String(80), nullable=False)
+    created_at = db.Column(db.String(30), nullable=False)
+    revoked_at = db.Column(db.String(30), nullable=True)
+
+    def to_dict(self):
+        """Convert API key to dictionary (never includes the secret)"""
+        return {
+            'id': self.id,
+            'prefix': self.prefix,
+            'name': self.name,
+            'scopes': self.scopes.split(','),
+            'rate_limit': self.rate_limit,
+            'created_by': self.created_by,
+            'created_at': self.created_at,
+            'revoked_at': self.revoked_at
+        }
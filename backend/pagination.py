@@ -0,0 +1,168 @@
+import hashlib
+import json
+from sqlalchemy import and_, func, or_, text
+from database import db
+from receipt_verifier import b64url_decode, b64url_encode
+
+# Bounded counts stop after this many rows and report a lower bound
+APPROXIMATE_COUNT_LIMIT = 1000
+
+COUNT_MODES = ("exact", "approx", "none")
+
+
+def filter_fingerprint(params):
+    """Short hash of the filters a cursor was issued for, so it cannot be replayed against others"""
+    material = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(values, fingerprint):
+    """
+    Build an opaque cursor pointing just after a row
+
+    Args:
+        values (list): Sort key values of the last row returned
+        fingerprint (str): filter_fingerprint of the request
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps({"k": values, "f": fingerprint}, separators=(",", ":"))
+    return b64url_encode(payload.encode("utf-8"))
+
+
+def decode_cursor(token, fingerprint):
+    """
+    Read a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the token is malformed or was issued for different filters
+    """
+    try:
+        payload = json.loads(b64url_decode(token))
+        values = payload["k"]
+        issued_for = payload["f"]
+    except (ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+    if issued_for != fingerprint or not isinstance(values, list):
+        raise ValueError("Cursor does not match the current search parameters")
+    return values
+
+
+def apply_keyset(query, sort_keys, after=None):
+    """
+    Order a query by sort_keys and start it just after a cursor position
+
+    Args:
+        query: SQLAlchemy query
+        sort_keys (list): (column, descending) pairs; the last one must be unique (e.g. the id)
+        after (list): Sort key values decoded from a cursor, or None for the first page
+
+    Returns:
+        Query: Ordered (and filtered) query
+    """
+    if after is not None:
+        if len(after) != len(sort_keys):
+            raise ValueError("Invalid cursor")
+        # (a, b) after (x, y)  <=>  a beyond x OR (a = x AND b beyond y)
+        clauses = []
+        for position, (column, descending) in enumerate(sort_keys):
+            ties = [sort_keys[i][0] == after[i] for i in range(position)]
+            beyond = column < after[position] if descending else column > after[position]
+            clauses.append(and_(*ties, beyond))
+        query = query.filter(or_(*clauses))
+
+    return query.order_by(*[column.desc() if descending else column.asc() for column, descending in sort_keys])
+
+
+def parse_limit(value, default, maximum):
+    """
+    Page size from a limit query parameter, clamped to 1..maximum
+
+    Raises:
+        ValueError: If the value is not an integer
+    """
+    if value is None or not value.strip():
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    return max(1, min(limit, maximum))
+
+
+def parse_offset(value):
+    """
+    Row offset from an offset query parameter (0 when missing)
+
+    Raises:
+        ValueError: If the value is not an integer or is negative
+    """
+    if value is None or not value.strip():
+        return 0
+    try:
+        offset = int(value)
+    except ValueError:
+        raise ValueError("offset must be an integer")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    return offset
+
+
+def fetch_page(query, limit):
+    """
+    Fetch one page plus a look-ahead row
+
+    Returns:
+        tuple: (rows, has_more)
+    """
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def count_rows(query, mode="exact", table=None):
+    """
+    Count the rows of a query
+
+    Args:
+        query: SQLAlchemy query (ordering is ignored)
+        mode (str): "exact", "approx" or "none"
+        table (str): Table name when the query is unfiltered, enabling a
+            statistics-based estimate once the bounded count overflows
+
+    Returns:
+        tuple: (count, is_exact) - count is None in "none" mode
+    """
+    if mode == "none":
+        return None, False
+
+    query = query.order_by(None)
+    if mode == "exact":
+        return query.count(), True
+
+    bounded = db.session.query(func.count()).select_from(
+        query.limit(APPROXIMATE_COUNT_LIMIT + 1).subquery()
+    ).scalar()
+    if bounded <= APPROXIMATE_COUNT_LIMIT:
+        return bounded, True
+
+    if table is not None:
+        estimate = _estimate_table_rows(table)
+        if estimate:
+            return max(estimate, bounded), False
+    return APPROXIMATE_COUNT_LIMIT, False
+
+
+def _estimate_table_rows(table):
+    """Row estimate without a table scan (planner statistics or max rowid)"""
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        estimate = db.session.execute(
+            text("SELECT reltuples FROM pg_class WHERE relname = :table"), {"table": table}
+        ).scalar()
+        return int(estimate) if estimate and estimate > 0 else None
+    if dialect == "sqlite":
+        # Rows are never deleted (revocation only updates them), so max(rowid) tracks the count
+        return db.session.execute(text(f'SELECT max(rowid) FROM "{table}"')).scalar()
+    return None
@@ -0,0 +1,154 @@
+import atexit
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import bcrypt
+except ImportError:  # bcrypt is optional; pbkdf2 needs only the standard library
+    bcrypt = None
+
+HASH_ALGORITHMS = ("pbkdf2", "bcrypt")
+
+# Cost per algorithm: PBKDF2-SHA256 iterations, bcrypt log2 rounds
+DEFAULT_COSTS = {"pbkdf2": 260000, "bcrypt": 12}
+
+
+class HashingBusy(Exception):
+    """Raised when every hashing slot is taken; the caller should answer 503"""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing is at capacity")
+        self.retry_after = retry_after
+
+
+def hash_password(password, algorithm, cost):
+    """Hash a password with the given algorithm and cost (runs in a pool worker)"""
+    if algorithm == "bcrypt":
+        if bcrypt is None:
+            raise ValueError("bcrypt is not installed")
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=cost)).decode()
+    return generate_password_hash(password, method=f"pbkdf2:sha256:{cost}", salt_length=16)
+
+
+def hash_parameters(stored_hash):
+    """
+    Algorithm and cost a stored hash was made with
+
+    Returns:
+        tuple: (algorithm, cost); cost is None when it cannot be read
+    """
+    if stored_hash.startswith(("$2a$", "$2b$", "$2y$")):
+        return "bcrypt", int(stored_hash.split("$")[2])
+    method = stored_hash.split("$", 1)[0]
+    if method.startswith("pbkdf2:sha256"):
+        parts = method.split(":")
+        # werkzeug omits the iteration count when it used its default
+        return "pbkdf2", int(parts[2]) if len(parts) > 2 else 260000
+    return method, None
+
+
+def verify_password(password, stored_hash, algorithm, cost):
+    """
+    Check a password and rehash it if the stored parameters are outdated (runs in a pool worker)
+
+    Returns:
+        tuple: (matches, new_hash) - new_hash is None unless a rehash was needed
+    """
+    if stored_hash.startswith(("$2a$", "$2b$", "$2y$")):
+        if bcrypt is None:
+            raise ValueError("bcrypt is not installed")
+        matches = bcrypt.checkpw(password.encode(), stored_hash.encode())
+    else:
+        matches = check_password_hash(stored_hash, password)
+
+    if matches and hash_parameters(stored_hash) != (algorithm, cost):
+        return True, hash_password(password, algorithm, cost)
+    return matches, None
+
+
+class PasswordHasher:
+    """
+    Runs password hashing in a bounded process pool
+
+    Hashes are CPU-bound for hundreds of milliseconds, so they are kept off
+    request threads. At most max_pending hashes are queued or running; a
+    request that cannot get a slot within wait_seconds gets HashingBusy (503
+    with Retry-After) instead of joining an ever-growing queue.
+    """
+
+    def __init__(self, algorithm="pbkdf2", cost=None, workers=2, max_pending=None, wait_seconds=0.5):
+        """Initialize the hasher; the process pool is started on first use (workers=0 hashes inline)"""
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+        if algorithm == "bcrypt" and bcrypt is None:
+            raise ValueError("PASSWORD_HASH_ALGORITHM=bcrypt needs the bcrypt package")
+        self.algorithm = algorithm
+        self.cost = cost or DEFAULT_COSTS[algorithm]
+        self.workers = workers
+        self.max_pending = max_pending or max(1, workers) * 4
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._average_seconds = 0.25  # Moving average of one hash, for Retry-After
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn avoids forking a threaded server process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self._executor.shutdown, wait=False)
+            return self._executor
+
+    def retry_after(self):
+        """Seconds until a full queue has likely drained"""
+        return max(1, math.ceil(self._average_seconds * self.max_pending / max(1, self.workers)))
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise HashingBusy(self.retry_after())
+        started = time.perf_counter()
+        try:
+            if self.workers == 0:
+                return function(*args)
+            return self._get_executor().submit(function, *args).result()
+        finally:
+            self._slots.release()
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * (time.perf_counter() - started)
+
+    def hash(self, password):
+        """Hash a new password with the configured algorithm and cost"""
+        return self._run(hash_password, password, self.algorithm, self.cost)
+
+    def verify(self, password, stored_hash):
+        """
+        Check a password against a stored hash
+
+        Returns:
+            tuple: (matches, new_hash) - new_hash replaces stored_hash when its
+                algorithm or cost differs from the configured ones
+        """
+        return self._run(verify_password, password, stored_hash, self.algorithm, self.cost)
+
+
+def get_password_hasher():
+    """Get the application's password hasher, creating it on first use"""
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        hasher = PasswordHasher(
+            current_app.config.get("PASSWORD_HASH_ALGORITHM", "pbkdf2"),
+            current_app.config.get("PASSWORD_HASH_COST"),
+            current_app.config.get("PASSWORD_HASH_WORKERS", 2),
+            current_app.config.get("PASSWORD_HASH_MAX_PENDING"),
+            current_app.config.get("PASSWORD_HASH_WAIT_SECONDS", 0.5)
+        )
+        current_app.extensions["password_hasher"] = hasher
+    return hasher
@@ -0,0 +1,253 @@
+import cProfile
+import datetime
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from flask import g, request, send_file
+from flask_jwt_extended import get_jwt, jwt_required, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from auth import admin_required
+from utils import create_error_response, create_success_response
+
+# Request header an admin sends to have that request profiled
+PROFILE_HEADER = "X-Profile"
+
+# Response header naming the stored profile
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+# The request being profiled on this thread, if any (read by the SQLAlchemy hooks)
+_active = threading.local()
+
+# cProfile allows one active profiler per process from Python 3.12, so requests are profiled one at a time
+_profiler_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = getattr(_active, "profile", None)
+    if profile is not None:
+        context._profile_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = getattr(_active, "profile", None)
+    started = getattr(context, "_profile_query_started", None)
+    if profile is not None and started is not None:
+        profile.record_query(statement, time.perf_counter() - started)
+
+
+class RequestProfile:
+    """cProfile run and SQL statement timings for one request"""
+
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.profiler = cProfile.Profile()
+        self.queries = {}  # statement -> [count, total seconds, slowest seconds]
+        self.query_count = 0
+        self.started = None
+
+    def record_query(self, statement, seconds):
+        self.query_count += 1
+        entry = self.queries.setdefault(statement, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    def start(self):
+        _active.profile = self
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        _active.profile = None
+        return time.perf_counter() - self.started
+
+    def summary(self, profile_id, seconds, status_code, top):
+        """JSON-ready summary: request, SQL statements by total time and functions by cumulative time"""
+        stats = pstats.Stats(self.profiler)
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+        queries = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "id": profile_id,
+            "created_at": datetime.datetime.utcnow().isoformat(),
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status_code": status_code,
+            "trigger": self.trigger,
+            "duration_ms": round(seconds * 1000, 3),
+            "query_count": self.query_count,
+            "query_ms": round(sum(entry[1] for entry in self.queries.values()) * 1000, 3),
+            "queries": [
+                {
+                    "statement": statement,
+                    "count": count,
+                    "total_ms": round(total * 1000, 3),
+                    "max_ms": round(slowest * 1000, 3)
+                }
+                for statement, (count, total, slowest) in queries
+            ],
+            "functions": [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "own_ms": round(own * 1000, 3),
+                    "cumulative_ms": round(cumulative * 1000, 3)
+                }
+                for (filename, line, name), (_, calls, own, cumulative, _) in functions
+            ]
+        }
+
+
+class ProfileStore:
+    """Profiles on disk: <id>.json summary and <id>.prof (pstats) per request, newest max_profiles kept"""
+
+    def __init__(self, directory, max_profiles=100):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, profile, summary):
+        profile_id = summary["id"]
+        profile.profiler.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as summary_file:
+            json.dump(summary, summary_file)
+        self._prune()
+
+    def _prune(self):
+        for profile_id in self.ids()[self.max_profiles:]:
+            for extension in ("json", "prof"):
+                try:
+                    os.remove(os.path.join(self.directory, f"{profile_id}.{extension}"))
+                except FileNotFoundError:
+                    pass
+
+    def ids(self):
+        """Stored profile IDs, newest first (IDs start with their UTC timestamp)"""
+        names = [name[:-5] for name in os.listdir(self.directory) if name.endswith(".json")]
+        return sorted((name for name in names if _PROFILE_ID.match(name)), reverse=True)
+
+    def summary(self, profile_id):
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.json")) as summary_file:
+                return json.load(summary_file)
+        except FileNotFoundError:
+            return None
+
+    def stats_path(self, profile_id):
+        path = os.path.join(self.directory, f"{profile_id}.prof")
+        return path if _PROFILE_ID.match(profile_id) and os.path.exists(path) else None
+
+
+def new_profile_id():
+    return f"{datetime.datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def _admin_requested():
+    """Whether the request asks to be profiled and carries a valid admin JWT"""
+    if request.headers.get(PROFILE_HEADER) != "1":
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt().get("role") == "Admin"
+    except Exception:
+        return False  # The view reports bad tokens itself
+
+
+def init_profiling(app):
+    """
+    Register the on-demand request profiler
+
+    Off unless PROFILING_ENABLED is set; then nothing is registered at all.
+    When on, a request is profiled if an admin sends "X-Profile: 1" or it is
+    picked at PROFILING_SAMPLE_RATE. Profiles are listed under /api/profiles.
+    """
+    if not app.config.get('PROFILING_ENABLED', False):
+        return
+
+    sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+    top = app.config.get('PROFILING_TOP_ENTRIES', 30)
+    store = ProfileStore(app.config['PROFILING_DIR'], app.config.get('PROFILING_MAX_STORED', 100))
+    app.extensions["profile_store"] = store
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        if _admin_requested():
+            trigger = "header"
+        elif sample_rate and random.random() < sample_rate:
+            trigger = "sample"
+        else:
+            return None
+        if not _profiler_lock.acquire(blocking=False):
+            return None  # Another request is being profiled
+        profile = g.request_profile = RequestProfile(trigger)
+        profile.start()
+        return None
+
+    @app.after_request
+    def save_profile(response):
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return response
+        try:
+            seconds = profile.stop()
+            profile_id = new_profile_id()
+            store.save(profile, profile.summary(profile_id, seconds, response.status_code, top))
+            response.headers[PROFILE_ID_HEADER] = profile_id
+        finally:
+            _profiler_lock.release()
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exception=None):
+        profile = g.pop("request_profile", None)
+        if profile is not None:  # after_request did not run
+            profile.stop()
+            _profiler_lock.release()
+
+    @app.route('/api/profiles', methods=['GET'])
+    @jwt_required()
+    @admin_required
+    def list_profiles():
+        profiles = []
+        for profile_id in store.ids():
+            summary = store.summary(profile_id)
+            if summary is not None:
+                profiles.append({key: summary[key] for key in (
+                    "id", "created_at", "method", "path", "endpoint", "status_code",
+                    "trigger", "duration_ms", "query_count", "query_ms"
+                )})
+        return create_success_response({"profiles": profiles}, "Stored request profiles")
+
+    @app.route('/api/profiles/<profile_id>', methods=['GET'])
+    @jwt_required()
+    @admin_required
+    def get_profile(profile_id):
+        summary = store.summary(profile_id)
+        if summary is None:
+            return create_error_response("Profile not found", 404)
+        return create_success_response(summary, "Request profile")
+
+    @app.route('/api/profiles/<profile_id>/pstats', methods=['GET'])
+    @jwt_required()
+    @admin_required
+    def download_profile(profile_id):
+        path = store.stats_path(profile_id)
+        if path is None:
+            return create_error_response("Profile not found", 404)
+        return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                         download_name=f"{profile_id}.prof")
@@ -0,0 +1,223 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+import qrcode
+from flask import current_app
+from metrics import CACHE_LOOKUPS, QR_RENDER_SECONDS
+
+ERROR_CORRECTION_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H
+}
+
+DEFAULT_RENDER_PARAMS = {
+    "box_size": 10,
+    "border": 4,
+    "error_correction": "L"
+}
+
+# Output format -> (file extension, mimetype). "png1" is one pixel per module,
+# meant to be scaled up by the client with nearest-neighbour sampling.
+OUTPUT_FORMATS = {
+    "png": ("png", "image/png"),
+    "png1": ("1bit.png", "image/png"),
+    "svg": ("svg", "image/svg+xml")
+}
+
+
+def _build_qr(data, box_size, border, error_correction):
+    # version=None lets qrcode pick the smallest symbol that fits the payload
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=ERROR_CORRECTION_LEVELS[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+
+def _matrix_to_svg(matrix):
+    """Compact SVG: one path with a run-length segment per horizontal run of dark modules"""
+    size = len(matrix)
+    segments = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if row[x]:
+                start = x
+                while x < size and row[x]:
+                    x += 1
+                segments.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(segments)}"/></svg>'
+    ).encode("utf-8")
+
+
+def render_qr(data, output_format="png", box_size=10, border=4, error_correction="L"):
+    """
+    Render a QR code image
+
+    Args:
+        data (str): Payload to encode (usually the verification URL)
+        output_format (str): "png", "png1" (compact 1-bit, 1px per module) or "svg"
+        box_size (int): Pixels per module (ignored by png1 and svg)
+        border (int): Quiet zone width in modules
+        error_correction (str): One of L, M, Q, H
+
+    Returns:
+        bytes: Encoded image
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported QR output format: {output_format}")
+
+    qr = _build_qr(data, 1 if output_format == "png1" else box_size, border, error_correction)
+
+    if output_format == "svg":
+        return _matrix_to_svg(qr.get_matrix())
+
+    buffer = io.BytesIO()
+    image = qr.make_image(fill_color="black", back_color="white").get_image()
+    image.save(buffer, format="PNG", optimize=output_format == "png1")
+    return buffer.getvalue()
+
+
+def sharded_path(root, name, extension):
+    """
+    Location of a file in the hash-prefix sharded layout
+
+    Files are spread over 65536 directories (root/ab/cd/name.ext) using the
+    SHA-256 of the name, so no single directory grows with the table.
+    """
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+    return os.path.join(root, digest[:2], digest[2:4], f"{name}.{extension}")
+
+
+def render_qr_batch(items):
+    """
+    Render several QR codes (runs inside QR render worker processes)
+
+    Args:
+        items (list): (cache_key, data, params) tuples
+
+    Returns:
+        list: (cache_key, png_bytes) tuples
+    """
+    return [(key, render_qr(data, **params)) for key, data, params in items]
+
+
+def cache_key(data, params):
+    """Content address of a rendering: hash of the payload and render parameters"""
+    material = data + "|" + "|".join(f"{name}={params[name]}" for name in sorted(params))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class QRCodeCache:
+    """Content-addressed QR image cache: in-memory LRU in front of a sharded directory"""
+
+    def __init__(self, directory, memory_items=256):
+        """Initialize the cache, creating the directory if needed"""
+        self.directory = directory
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "renders": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key, output_format="png"):
+        """On-disk location of a cached rendering"""
+        return sharded_path(self.directory, key, OUTPUT_FORMATS[output_format][0])
+
+    def has(self, key, output_format="png"):
+        """Check whether a rendering is already cached"""
+        return (key, output_format) in self._memory or os.path.exists(self.path_for(key, output_format))
+
+    def _remember(self, memory_key, image):
+        with self._lock:
+            self._memory[memory_key] = image
+            self._memory.move_to_end(memory_key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get_image(self, data, output_format="png", **params):
+        """
+        Get an image for a payload, rendering it only on first request
+
+        The cache key covers the payload and render parameters; the output
+        format is part of the file name.
+
+        Returns:
+            tuple: (image_bytes, cache_key)
+        """
+        params = {**DEFAULT_RENDER_PARAMS, **params}
+        key = cache_key(data, params)
+        memory_key = (key, output_format)
+
+        with self._lock:
+            image = self._memory.get(memory_key)
+            if image is not None:
+                self._memory.move_to_end(memory_key)
+                self.stats["memory_hits"] += 1
+                CACHE_LOOKUPS.inc("qr", "memory_hit")
+                return image, key
+
+        path = self.path_for(key, output_format)
+        if os.path.exists(path):
+            with open(path, "rb") as image_file:
+                image = image_file.read()
+            self.stats["disk_hits"] += 1
+            CACHE_LOOKUPS.inc("qr", "disk_hit")
+        else:
+            with QR_RENDER_SECONDS.time(output_format):
+                image = render_qr(data, output_format, **params)
+            self.store(key, image, output_format)
+            self.stats["renders"] += 1
+            CACHE_LOOKUPS.inc("qr", "miss")
+
+        self._remember(memory_key, image)
+        return image, key
+
+    def get_png(self, data, **params):
+        """Get PNG bytes for a payload (see get_image)"""
+        return self.get_image(data, "png", **params)
+
+    def store(self, key, image, output_format="png"):
+        """Write a rendering to disk atomically"""
+        path = self.path_for(key, output_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as image_file:
+            image_file.write(image)
+        os.replace(temp_path, path)
+
+    def discard(self, data, **params):
+        """Drop every output format of a rendering from memory and disk (e.g. after revocation)"""
+        key = cache_key(data, {**DEFAULT_RENDER_PARAMS, **params})
+        for output_format in OUTPUT_FORMATS:
+            with self._lock:
+                self._memory.pop((key, output_format), None)
+            try:
+                os.remove(self.path_for(key, output_format))
+            except FileNotFoundError:
+                pass
+
+
+def get_qr_cache():
+    """Get the application's QR cache, creating it on first use"""
+    cache = current_app.extensions.get("qr_cache")
+    if cache is None:
+        cache = QRCodeCache(
+            current_app.config["QR_CACHE_DIR"],
+            current_app.config.get("QR_MEMORY_CACHE_SIZE", 256)
+        )
+        current_app.extensions["qr_cache"] = cache
+    return cache
@@ -0,0 +1,126 @@
+import atexit
+import datetime
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from database import db
+from models import QRRenderJob
+from qr_cache import DEFAULT_RENDER_PARAMS, cache_key, get_qr_cache, render_qr_batch
+
+
+class QRRenderQueue:
+    """
+    Pre-renders QR codes in a process pool so request threads never encode images
+
+    Jobs are recorded in the QRRenderJob table. Rendering is only a cache
+    warm-up: serve_qr_code still renders on demand if a job has not finished.
+    """
+
+    def __init__(self, app, workers, batch_size=32):
+        """Initialize the queue; the process pool is started on first use"""
+        self.app = app
+        self.workers = workers
+        self.batch_size = batch_size
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn avoids forking a threaded server process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self._executor.shutdown, wait=False)
+            return self._executor
+
+    def enqueue(self, items):
+        """
+        Queue QR renders for newly issued certificates
+
+        Args:
+            items (list): (certificate_id, qr_payload) tuples
+
+        Returns:
+            list: Created QRRenderJob rows (empty when the pool is disabled)
+        """
+        if not self.enabled or not items:
+            return []
+
+        cache = get_qr_cache()
+        now = datetime.datetime.utcnow().isoformat()
+        jobs = []
+        work = []
+        for certificate_id, payload in items:
+            key = cache_key(payload, DEFAULT_RENDER_PARAMS)
+            already_cached = cache.has(key)
+            jobs.append(QRRenderJob(
+                certificate_id=certificate_id,
+                cache_key=key,
+                status='done' if already_cached else 'queued',
+                created_at=now,
+                finished_at=now if already_cached else None
+            ))
+            if not already_cached:
+                work.append((key, payload, dict(DEFAULT_RENDER_PARAMS)))
+
+        db.session.add_all(jobs)
+        db.session.commit()
+
+        executor = self._get_executor()
+        for start in range(0, len(work), self.batch_size):
+            batch = work[start:start + self.batch_size]
+            future = executor.submit(render_qr_batch, batch)
+            future.add_done_callback(
+                lambda done, keys=[key for key, _, _ in batch]: self._on_batch_done(done, keys)
+            )
+        return jobs
+
+    def wait(self):
+        """Wait for every queued render to be stored, then stop the pool (for scripts that exit next)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _on_batch_done(self, future, keys):
+        """Store rendered images and mark their jobs finished"""
+        with self.app.app_context():
+            now = datetime.datetime.utcnow().isoformat()
+            try:
+                cache = get_qr_cache()
+                for key, png in future.result():
+                    cache.store(key, png)
+                values = {"status": "done", "finished_at": now}
+            except Exception as e:
+                values = {"status": "failed", "finished_at": now, "error": str(e)[:256]}
+
+            QRRenderJob.query.filter(
+                QRRenderJob.cache_key.in_(keys),
+                QRRenderJob.status == 'queued'
+            ).update(values, synchronize_session=False)
+            db.session.commit()
+
+    def status_counts(self):
+        """Number of jobs per status"""
+        rows = db.session.query(QRRenderJob.status, db.func.count(QRRenderJob.id)).group_by(QRRenderJob.status).all()
+        return {status: count for status, count in rows}
+
+
+def get_qr_render_queue():
+    """Get the application's QR render queue, creating it on first use"""
+    queue = current_app.extensions.get("qr_render_queue")
+    if queue is None:
+        queue = QRRenderQueue(
+            current_app._get_current_object(),
+            current_app.config.get("QR_RENDER_WORKERS", 0),
+            current_app.config.get("QR_RENDER_BATCH_SIZE", 32)
+        )
+        current_app.extensions["qr_render_queue"] = queue
+    return queue
@@ -0,0 +1,158 @@
+import functools
+import logging
+import re
+import threading
+import time
+from flask import request
+from sqlalchemy import event
+from database import db
+
+logger = logging.getLogger("query_monitor")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_MARKER = r"(?:\?|%s|%\(\w+\)s|\$\d+)"
+_MARKER_LIST = re.compile(rf"\(\s*{_MARKER}(?:\s*,\s*{_MARKER})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statement counts of the request being handled on this thread, if any
+_current = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised after a request that broke its query budget when QUERY_BUDGET_ASSERT is set (tests)"""
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(statement):
+    """SQL with literals and IN lists replaced by ?, on one line, for grouping and logging"""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _MARKER_LIST.sub("(?...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def parse_query_budgets(text):
+    """Per-endpoint query budgets from "endpoint=count;endpoint=count\""""
+    budgets = {}
+    for item in (text or "").split(";"):
+        if item.strip():
+            endpoint, _, count = item.partition("=")
+            budgets[endpoint.strip()] = int(count)
+    return budgets
+
+
+class RequestQueries:
+    """Statements a request ran: raw SQL -> [count, total seconds]"""
+
+    def __init__(self):
+        self.statements = {}
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, statement, seconds):
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        self.count += 1
+        self.seconds += seconds
+
+    def repeated(self):
+        """(normalized SQL, count) of the most repeated statement shape"""
+        shapes = {}
+        for statement, (count, _) in self.statements.items():
+            shape = normalize_sql(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return max(shapes.items(), key=lambda item: item[1], default=(None, 0))
+
+
+class QueryMonitor:
+    """
+    Slow query log and per-request query budgets via SQLAlchemy cursor events
+
+    Every query over slow_query_ms is logged with its normalized SQL and the
+    endpoint that ran it. A request is flagged when it runs more queries than
+    its endpoint's budget, or one statement shape more than repeat_threshold
+    times (the usual N+1 pattern of one query per row).
+    """
+
+    def __init__(self, slow_query_ms=100, default_budget=20, budgets=None, repeat_threshold=10, assert_budgets=False):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.default_budget = default_budget
+        self.budgets = budgets or {}
+        self.repeat_threshold = repeat_threshold
+        self.assert_budgets = assert_budgets
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_monitor_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._query_monitor_started
+        queries = getattr(_current, "queries", None)
+        if queries is not None:
+            queries.record(statement, seconds)
+        if seconds >= self.slow_query_seconds:
+            endpoint = request.endpoint if queries is not None else "-"
+            logger.warning("🐢 Slow query (%.1fms) in %s: %s", seconds * 1000, endpoint, normalize_sql(statement))
+
+    def start_request(self):
+        _current.queries = RequestQueries()
+
+    def finish_request(self):
+        """Stop counting and check the request's budget; returns its RequestQueries"""
+        queries = getattr(_current, "queries", None)
+        _current.queries = None
+        if queries is None or request.endpoint is None:
+            return queries
+
+        budget = self.budgets.get(request.endpoint, self.default_budget)
+        shape, repeats = queries.repeated()
+        if queries.count > budget or repeats > self.repeat_threshold:
+            message = (f"{request.endpoint} ran {queries.count} queries (budget {budget}, "
+                       f"{queries.seconds * 1000:.1f}ms); {repeats}x {shape}")
+            if self.assert_budgets:
+                raise QueryBudgetExceeded(message)
+            logger.warning("⚠️  Query budget: %s", message)
+        return queries
+
+
+def init_query_monitor(app):
+    """
+    Attach the query monitor to the application's engines
+
+    QUERY_BUDGETS overrides QUERY_BUDGET_DEFAULT per endpoint; with
+    QUERY_BUDGET_ASSERT a request over budget raises QueryBudgetExceeded.
+    """
+    if not app.config.get('QUERY_MONITOR_ENABLED', True):
+        return
+
+    monitor = QueryMonitor(
+        app.config.get('SLOW_QUERY_MS', 100),
+        app.config.get('QUERY_BUDGET_DEFAULT', 20),
+        parse_query_budgets(app.config.get('QUERY_BUDGETS')),
+        app.config.get('QUERY_REPEAT_THRESHOLD', 10),
+        app.config.get('QUERY_BUDGET_ASSERT', False)
+    )
+    app.extensions["query_monitor"] = monitor
+    with app.app_context():
+        for engine in db.engines.values():
+            monitor.attach(engine)
+
+    @app.before_request
+    def count_queries():
+        monitor.start_request()
+
+    @app.after_request
+    def check_query_budget(response):
+        monitor.finish_request()
+        return response
+
+    @app.teardown_request
+    def stop_counting(exception=None):
+        _current.queries = None
@@ -0,0 +1,221 @@
+import collections
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import g, request
+from api_keys import API_KEY_HEADER, get_api_key_authenticator
+from utils import create_error_response
+
+UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600}
+
+# Per-endpoint limits for each client (IP address or API key); "N/unit" or "N/unit:burst".
+# Endpoints without a rule are neither limited nor shed.
+DEFAULT_RATE_LIMITS = {
+    "cert.verify_certificate_public": "120/minute:30",
+    "auth.login": "10/minute:10",
+    "auth.register": "5/minute:5"
+}
+
+RateLimitRule = collections.namedtuple("RateLimitRule", ["rate", "burst"])  # tokens per second, bucket size
+
+
+def parse_rule(text):
+    """Parse "120/minute" or "120/minute:30" into a RateLimitRule"""
+    limit, _, burst = text.strip().partition(":")
+    count, _, unit = limit.partition("/")
+    count = int(count)
+    if count < 1 or unit not in UNIT_SECONDS:
+        raise ValueError(f"Invalid rate limit: {text}")
+    return RateLimitRule(count / UNIT_SECONDS[unit], int(burst) if burst else count)
+
+
+def parse_rate_limits(text, defaults=DEFAULT_RATE_LIMITS):
+    """
+    Per-endpoint rules: the defaults overridden by "endpoint=rule;endpoint=rule"
+
+    An empty rule ("auth.register=") removes the endpoint's limit.
+    """
+    rules = dict(defaults)
+    for item in (text or "").split(";"):
+        if item.strip():
+            endpoint, _, rule = item.partition("=")
+            rules[endpoint.strip()] = rule.strip()
+    return {endpoint: parse_rule(rule) for endpoint, rule in rules.items() if rule}
+
+
+def _take(tokens, updated_at, now, rule):
+    """Refill a bucket and take one token: (allowed, tokens left, seconds until one is available)"""
+    tokens = min(rule.burst, tokens + (now - updated_at) * rule.rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rule.rate
+
+
+class MemoryBucketStore:
+    """Token buckets for this process, least recently used evicted beyond max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = collections.OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, rule, now=None):
+        now = now or time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (rule.burst, now))
+            allowed, tokens, retry_after = _take(tokens, updated_at, now, rule)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a small SQLite file shared by every worker on the host
+
+    Stands in for a shared store such as Redis; each check is one short
+    write transaction.
+    """
+
+    def __init__(self, path, idle_seconds=3600):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self._local = threading.local()
+        self._checks = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # Losing a few buckets in a crash is harmless
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, rule, now=None):
+        now = now or time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated_at FROM rate_bucket WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (rule.burst, now)
+            allowed, tokens, retry_after = _take(tokens, updated_at, now, rule)
+            connection.execute("INSERT OR REPLACE INTO rate_bucket (key, tokens, updated_at) VALUES (?, ?, ?)",
+                               (key, tokens, now))
+            self._checks += 1
+            if self._checks % 10000 == 0:
+                connection.execute("DELETE FROM rate_bucket WHERE updated_at < ?", (now - self.idle_seconds,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+
+class LoadShedder:
+    """
+    Tracks in-flight requests and a moving average of response time
+
+    When either crosses its threshold, rate-limited (public) endpoints are
+    refused with 429 so the worker keeps capacity for everything else.
+    """
+
+    def __init__(self, max_in_flight=0, max_latency_ms=0):
+        self.max_in_flight = max_in_flight
+        self.max_latency = max_latency_ms / 1000
+        self.in_flight = 0
+        self.average_latency = 0.0
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, seconds):
+        with self._lock:
+            self.in_flight -= 1
+            self.average_latency = 0.9 * self.average_latency + 0.1 * seconds
+
+    def overloaded(self):
+        if self.max_in_flight and self.in_flight > self.max_in_flight:
+            return True
+        return bool(self.max_latency) and self.average_latency > self.max_latency
+
+
+def create_bucket_store(config):
+    """Build the bucket store selected by RATE_LIMIT_STORE"""
+    backend = config.get("RATE_LIMIT_STORE", "memory")
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "sqlite":
+        return SQLiteBucketStore(config["RATE_LIMIT_DB_PATH"])
+    raise ValueError(f"Unknown rate limit store: {backend}")
+
+
+def _client_key():
+    """Rate limit key and per-key rule: the API key if a valid one is presented, else the client IP"""
+    raw_key = request.headers.get(API_KEY_HEADER)
+    if raw_key:
+        api_key = get_api_key_authenticator().authenticate(raw_key)
+        if api_key is not None:
+            rule = parse_rule(f"{api_key.rate_limit}/minute") if api_key.rate_limit else None
+            return f"key:{api_key.prefix}", rule
+    return f"ip:{request.remote_addr}", None
+
+
+def _too_many_requests(message, retry_after):
+    body, status_code = create_error_response(message, 429)
+    return body, status_code, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+def init_rate_limiting(app):
+    """
+    Register token-bucket rate limiting and load shedding
+
+    Endpoints with a rule in RATE_LIMITS get a bucket per client (API key or
+    IP). API keys with their own rate_limit use it on every endpoint instead.
+    """
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return
+
+    rules = parse_rate_limits(app.config.get('RATE_LIMITS'))
+    store = create_bucket_store(app.config)
+    shedder = LoadShedder(app.config.get('LOAD_SHED_MAX_IN_FLIGHT', 0), app.config.get('LOAD_SHED_LATENCY_MS', 0))
+    shed_retry_after = app.config.get('LOAD_SHED_RETRY_AFTER', 1)
+    app.extensions["rate_limit"] = {"rules": rules, "store": store, "shedder": shedder}
+
+    @app.before_request
+    def limit_request():
+        g.request_started = time.perf_counter()
+        shedder.started()
+        if request.method == "OPTIONS":
+            return None
+
+        rule = rules.get(request.endpoint)
+        key_rule = None
+        if rule is not None or request.headers.get(API_KEY_HEADER):
+            client, key_rule = _client_key()
+            rule = key_rule or rule
+        if rule is None:
+            return None
+
+        if shedder.overloaded():
+            return _too_many_requests("Server is overloaded, please retry shortly", shed_retry_after)
+
+        allowed, retry_after = store.take(f"{client}:{'*' if key_rule else request.endpoint}", rule)
+        if not allowed:
+            return _too_many_requests("Rate limit exceeded", retry_after)
+        return None
+
+    @app.teardown_request
+    def track_request(exception=None):
+        started = g.pop("request_started", None)
+        if started is not None:
+            shedder.finished(time.perf_counter() - started)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Offline Certificate Receipt Verifier
+
+Checks signed verification receipts issued by the API without contacting
+the server. This module only depends on the Python standard library so it
+can be copied as-is into kiosks, mobile backends or partner systems.
+
+Usage:
+    python receipt_verifier.py <receipt> <issuer_public_key_hex>
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import sys
+
+RECEIPT_VERSION = "v1"
+
+# Long field names for the compact keys used inside the signed payload
+RECEIPT_FIELDS = {
+    "cid": "certificate_id",
+    "sn": "student_name",
+    "dg": "degree",
+    "dt": "issue_date",
+    "ib": "issued_by",
+    "bi": "block_index",
+    "bh": "block_hash",
+    "kid": "key_id"
+}
+
+# --- Ed25519 (RFC 8032) -----------------------------------------------------
+
+_P = 2 ** 255 - 19
+_L = 2 ** 252 + 27742317777372353535851937790883648493
+_D = -121665 * pow(121666, _P - 2, _P) % _P
+_SQRT_M1 = pow(2, (_P - 1) // 4, _P)
+
+
+def _point_add(p1, p2):
+    """Add two points in extended twisted Edwards coordinates"""
+    a = (p1[1] - p1[0]) * (p2[1] - p2[0]) % _P
+    b = (p1[1] + p1[0]) * (p2[1] + p2[0]) % _P
+    c = 2 * p1[3] * p2[3] * _D % _P
+    d = 2 * p1[2] * p2[2] % _P
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return (e * f, g * h, f * g, e * h)
+
+
+def _point_mul(scalar, point):
+    """Multiply a point by a scalar using double-and-add"""
+    result = (0, 1, 1, 0)
+    while scalar > 0:
+        if scalar & 1:
+            result = _point_add(result, point)
+        point = _point_add(point, point)
+        scalar >>= 1
+    return result
+
+
+def _point_equal(p1, p2):
+    """Compare two points in projective coordinates"""
+    if (p1[0] * p2[2] - p2[0] * p1[2]) % _P != 0:
+        return False
+    return (p1[1] * p2[2] - p2[1] * p1[2]) % _P == 0
+
+
+def _recover_x(y, sign):
+    """Recover the x coordinate of a point from y and the sign bit"""
+    if y >= _P:
+        return None
+    x2 = (y * y - 1) * pow(_D * y * y + 1, _P - 2, _P)
+    if x2 == 0:
+        return None if sign else 0
+    x = pow(x2, (_P + 3) // 8, _P)
+    if (x * x - x2) % _P != 0:
+        x = x * _SQRT_M1 % _P
+    if (x * x - x2) % _P != 0:
+        return None
+    if (x & 1) != sign:
+        x = _P - x
+    return x
+
+
+_G_Y = 4 * pow(5, _P - 2, _P) % _P
+_G_X = _recover_x(_G_Y, 0)
+_G = (_G_X, _G_Y, 1, _G_X * _G_Y % _P)
+
+
+def _point_compress(point):
+    """Encode a point as 32 bytes"""
+    z_inv = pow(point[2], _P - 2, _P)
+    x = point[0] * z_inv % _P
+    y = point[1] * z_inv % _P
+    return int.to_bytes(y | ((x & 1) << 255), 32, "little")
+
+
+def _point_decompress(data):
+    """Decode 32 bytes into a point, or None if the encoding is invalid"""
+    if len(data) != 32:
+        return None
+    y = int.from_bytes(data, "little")
+    sign = y >> 255
+    y &= (1 << 255) - 1
+    x = _recover_x(y, sign)
+    if x is None:
+        return None
+    return (x, y, 1, x * y % _P)
+
+
+def _sha512_mod_l(data):
+    return int.from_bytes(hashlib.sha512(data).digest(), "little") % _L
+
+
+def _expand_secret(secret):
+    digest = hashlib.sha512(secret).digest()
+    scalar = int.from_bytes(digest[:32], "little")
+    scalar &= (1 << 254) - 8
+    scalar |= (1 << 254)
+    return scalar, digest[32:]
+
+
+def ed25519_public_key(secret):
+    """Derive the 32-byte public key from a 32-byte secret seed"""
+    scalar, _ = _expand_secret(secret)
+    return _point_compress(_point_mul(scalar, _G))
+
+
+def ed25519_sign(secret, message, public=None):
+    """Sign a message with a 32-byte secret seed (pass public to skip re-deriving it)"""
+    scalar, prefix = _expand_secret(secret)
+    if public is None:
+        public = _point_compress(_point_mul(scalar, _G))
+    r = _sha512_mod_l(prefix + message)
+    r_bytes = _point_compress(_point_mul(r, _G))
+    h = _sha512_mod_l(r_bytes + public + message)
+    s = (r + h * scalar) % _L
+    return r_bytes + int.to_bytes(s, 32, "little")
+
+
+def ed25519_verify(public, message, signature):
+    """Verify an Ed25519 signature"""
+    if len(public) != 32 or len(signature) != 64:
+        return False
+    a_point = _point_decompress(public)
+    if a_point is None:
+        return False
+    r_bytes = signature[:32]
+    r_point = _point_decompress(r_bytes)
+    if r_point is None:
+        return False
+    s = int.from_bytes(signature[32:], "little")
+    if s >= _L:
+        return False
+    h = _sha512_mod_l(r_bytes + public + message)
+    return _point_equal(_point_mul(s, _G), _point_add(r_point, _point_mul(h, a_point)))
+
+# --- Receipts -----------------------------------------------------------------
+
+
+def b64url_encode(data):
+    """Base64url encode without padding"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(text):
+    """Base64url decode, restoring any stripped padding"""
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def key_id_for(public_key):
+    """Short identifier of an issuer public key"""
+    return hashlib.sha256(public_key).hexdigest()[:16]
+
+
+def decode_receipt(receipt):
+    """
+    Split a receipt into its parts without checking the signature
+
+    Args:
+        receipt (str): Compact receipt string ("v1.<payload>.<signature>")
+
+    Returns:
+        tuple: (signing_input, payload_dict, signature_bytes)
+
+    Raises:
+        ValueError: If the receipt is not a v1 receipt with a JSON object payload
+    """
+    parts = receipt.strip().split(".")
+    if len(parts) != 3 or parts[0] != RECEIPT_VERSION:
+        raise ValueError("Unsupported receipt format")
+
+    payload = json.loads(b64url_decode(parts[1]))
+    if not isinstance(payload, dict):
+        raise ValueError("Receipt payload is not a JSON object")
+    signature = b64url_decode(parts[2])
+    signing_input = f"{parts[0]}.{parts[1]}".encode("ascii")
+    return signing_input, payload, signature
+
+
+def verify_receipt(receipt, public_keys):
+    """
+    Verify a receipt offline
+
+    Args:
+        receipt (str): Compact receipt string
+        public_keys: Issuer public key (bytes or hex), or a dict of key_id -> key
+
+    Returns:
+        tuple: (certificate_dict, error_message) - certificate_dict is None when invalid
+    """
+    try:
+        signing_input, payload, signature = decode_receipt(receipt)
+    except (ValueError, UnicodeDecodeError):
+        return None, "Malformed receipt"
+
+    if isinstance(public_keys, dict):
+        public_key = public_keys.get(payload.get("kid"))
+        if public_key is None:
+            return None, "Unknown issuer key"
+    else:
+        public_key = public_keys
+
+    if isinstance(public_key, str):
+        try:
+            public_key = bytes.fromhex(public_key)
+        except ValueError:
+            return None, "Invalid issuer public key"
+
+    if payload.get("kid") != key_id_for(public_key):
+        return None, "Receipt was not issued with this key"
+
+    if not ed25519_verify(public_key, signing_input, signature):
+        return None, "Invalid receipt signature"
+
+    certificate = {RECEIPT_FIELDS.get(key, key): value for key, value in payload.items()}
+    return certificate, None
+
+
+class RevocationList:
+    """
+    Local copy of the issuer's revocation list
+
+    Load a snapshot from GET /revocations once, then keep it current with
+    GET /revocations/delta?since=<height>. Lookups are O(1) and offline.
+    """
+
+    def __init__(self):
+        self.height = -1
+        self.revoked_ids = set()
+        self.bitmap = bytearray()
+
+    def apply_snapshot(self, snapshot):
+        """Replace local state with a snapshot response"""
+        raw = gzip.decompress(base64.b64decode(snapshot["data"]))
+        if snapshot["format"] == "bitmap":
+            self.bitmap = bytearray(raw)
+            self.revoked_ids = set()
+        else:
+            self.revoked_ids = set(raw.decode("utf-8").split("\n")) if raw else set()
+            self.bitmap = bytearray()
+        self.height = snapshot["height"]
+
+    def apply_delta(self, delta):
+        """Merge a delta response into local state"""
+        for entry in delta["revocations"]:
+            self.revoked_ids.add(entry["certificate_id"])
+            block_index = entry.get("issue_block_index")
+            if block_index is not None:
+                if (block_index >> 3) >= len(self.bitmap):
+                    self.bitmap.extend(bytes((block_index >> 3) + 1 - len(self.bitmap)))
+                self.bitmap[block_index >> 3] |= 1 << (block_index & 7)
+        self.height = delta["height"]
+
+    def is_revoked(self, certificate):
+        """Check a verified receipt (as returned by verify_receipt)"""
+        if certificate["certificate_id"] in self.revoked_ids:
+            return True
+        block_index = certificate.get("block_index")
+        if block_index is None or (block_index >> 3) >= len(self.bitmap):
+            return False
+        return bool(self.bitmap[block_index >> 3] & (1 << (block_index & 7)))
+
+
+def extract_receipt(qr_payload):
+    """Extract the receipt from a scanned QR verification URL"""
+    if "#r=" in qr_payload:
+        return qr_payload.split("#r=", 1)[1]
+    return qr_payload
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__.strip())
+        return 2
+
+    certificate, error = verify_receipt(extract_receipt(sys.argv[1]), sys.argv[2])
+    if error:
+        print(f"❌ {error}")
+        return 1
+
+    print("✅ Receipt signature is valid")
+    for field, value in certificate.items():
+        print(f"  - {field}: {value}")
+    print("ℹ️  Revocation status must still be checked against the issuer")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
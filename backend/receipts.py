@@ -0,0 +1,101 @@
+import json
+import os
+from flask import current_app
+from receipt_verifier import (
+    RECEIPT_VERSION, b64url_encode, ed25519_public_key, ed25519_sign, key_id_for
+)
+
+# The pure-Python signer is always available; use the native one when installed
+try:
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+except ImportError:
+    Ed25519PrivateKey = None
+
+
+class ReceiptSigner:
+    """Issues compact Ed25519-signed certificate receipts"""
+
+    def __init__(self, seed):
+        """Initialize the signer from a 32-byte secret seed"""
+        if len(seed) != 32:
+            raise ValueError("Receipt signing key must be 32 bytes")
+        self._seed = seed
+        self._native_key = Ed25519PrivateKey.from_private_bytes(seed) if Ed25519PrivateKey else None
+        self.public_key = ed25519_public_key(seed)
+        self.key_id = key_id_for(self.public_key)
+
+    @classmethod
+    def load(cls, key_hex=None, key_path=None):
+        """
+        Load the signing key from a hex string or a key file
+
+        If neither is configured yet, a new key is generated and written to
+        key_path so that receipts stay verifiable across restarts.
+        """
+        if key_hex:
+            return cls(bytes.fromhex(key_hex.strip()))
+
+        if key_path and os.path.exists(key_path):
+            with open(key_path, "r") as key_file:
+                return cls(bytes.fromhex(key_file.read().strip()))
+
+        seed = os.urandom(32)
+        if key_path:
+            os.makedirs(os.path.dirname(key_path), exist_ok=True)
+            with open(key_path, "w") as key_file:
+                key_file.write(seed.hex())
+            os.chmod(key_path, 0o600)
+        return cls(seed)
+
+    def sign(self, message):
+        """Sign raw bytes"""
+        if self._native_key is not None:
+            return self._native_key.sign(message)
+        return ed25519_sign(self._seed, message, self.public_key)
+
+    def issue_receipt(self, certificate_data, block):
+        """
+        Create a receipt for an issued certificate
+
+        Args:
+            certificate_data (dict): Certificate fields stored in the block
+            block (Block): The block the certificate was recorded in
+
+        Returns:
+            str: Compact receipt ("v1.<payload>.<signature>")
+        """
+        payload = {
+            "cid": certificate_data["certificate_id"],
+            "sn": certificate_data["student_name"],
+            "dg": certificate_data["degree"],
+            "dt": certificate_data["issue_date"],
+            "ib": certificate_data["issued_by"],
+            "bi": block.index,
+            "bh": block.hash,
+            "kid": self.key_id
+        }
+        encoded = b64url_encode(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        signing_input = f"{RECEIPT_VERSION}.{encoded}"
+        signature = self.sign(signing_input.encode("ascii"))
+        return f"{signing_input}.{b64url_encode(signature)}"
+
+    def public_key_info(self):
+        """Public key details for offline verifiers"""
+        return {
+            "algorithm": "Ed25519",
+            "key_id": self.key_id,
+            "public_key": self.public_key.hex(),
+            "receipt_version": RECEIPT_VERSION
+        }
+
+
+def get_receipt_signer():
+    """Get the application's receipt signer, loading it on first use"""
+    signer = current_app.extensions.get("receipt_signer")
+    if signer is None:
+        signer = ReceiptSigner.load(
+            current_app.config.get("RECEIPT_SIGNING_KEY"),
+            current_app.config.get("RECEIPT_KEY_PATH")
+        )
+        current_app.extensions["receipt_signer"] = signer
+    return signer
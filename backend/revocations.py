@@ -0,0 +1,99 @@
+import base64
+import gzip
+
+SNAPSHOT_FORMATS = ("ids", "bitmap")
+
+# The chain is append-only, so a snapshot stays valid until the tip changes
+_snapshot_cache = {}
+
+
+def _compress(data):
+    """gzip + base64 so the payload can travel inside JSON"""
+    return base64.b64encode(gzip.compress(data, mtime=0)).decode("ascii")
+
+
+def _revocation_entry(blockchain, block):
+    """Describe a REVOKE_CERTIFICATE block for the feed"""
+    certificate_id = block.certificate_data["certificate_id"]
+    issue_block = blockchain.find_certificate(certificate_id)
+    return {
+        "certificate_id": certificate_id,
+        "issue_block_index": issue_block.index if issue_block else None,
+        "revocation_block_index": block.index,
+        "revoked_at": block.certificate_data.get("revoked_at")
+    }
+
+
+def build_snapshot(blockchain, snapshot_format="ids"):
+    """
+    Build a compressed snapshot of every revoked certificate
+
+    Args:
+        blockchain (Blockchain): Chain to read REVOKE_CERTIFICATE blocks from
+        snapshot_format (str): "ids" for newline-separated certificate IDs, or
+            "bitmap" for one bit per issuance block index (bit set = revoked)
+
+    Returns:
+        dict: Snapshot with the chain height it is valid for
+    """
+    if snapshot_format not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Snapshot format must be one of: {', '.join(SNAPSHOT_FORMATS)}")
+
+    latest_block = blockchain.get_latest_block()
+    cache_key = (snapshot_format, latest_block.hash)
+    if cache_key in _snapshot_cache:
+        return _snapshot_cache[cache_key]
+
+    revoked_ids = {block.certificate_data["certificate_id"] for block in blockchain.revocations}
+
+    if snapshot_format == "ids":
+        raw = "\n".join(sorted(revoked_ids)).encode("utf-8")
+    else:
+        bitmap = bytearray((latest_block.index + 8) // 8)
+        for certificate_id in revoked_ids:
+            issue_block = blockchain.find_certificate(certificate_id)
+            if issue_block:
+                bitmap[issue_block.index >> 3] |= 1 << (issue_block.index & 7)
+        raw = bytes(bitmap)
+
+    snapshot = {
+        "format": snapshot_format,
+        "encoding": "gzip+base64",
+        "height": latest_block.index,
+        "latest_block_hash": latest_block.hash,
+        "revoked_count": len(revoked_ids),
+        "data": _compress(raw)
+    }
+
+    if len(_snapshot_cache) >= 8:
+        _snapshot_cache.clear()
+    _snapshot_cache[cache_key] = snapshot
+    return snapshot
+
+
+def build_delta(blockchain, since_height):
+    """
+    List revocations recorded after a given block height
+
+    Args:
+        blockchain (Blockchain): Chain to read REVOKE_CERTIFICATE blocks from
+        since_height (int): Height of the verifier's last snapshot or delta
+
+    Returns:
+        dict: Revocations in chain order and the new height
+    """
+    latest_block = blockchain.get_latest_block()
+    if since_height < 0 or since_height > latest_block.index:
+        raise ValueError(f"since must be between 0 and {latest_block.index}")
+
+    # Walk back from the tip so the cost is proportional to the delta size
+    start = len(blockchain.revocations)
+    while start > 0 and blockchain.revocations[start - 1].index > since_height:
+        start -= 1
+
+    return {
+        "since": since_height,
+        "height": latest_block.index,
+        "latest_block_hash": latest_block.hash,
+        "revocations": [_revocation_entry(blockchain, block) for block in blockchain.revocations[start:]]
+    }
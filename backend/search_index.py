@@ -0,0 +1,230 @@
+import shlex
+from flask import current_app
+from sqlalchemy import bindparam, func, literal_column, select, text
+from database import db
+
+# Query field names accepted in "field:value" terms
+SEARCH_FIELDS = {
+    "id": "certificate_id",
+    "certificate_id": "certificate_id",
+    "name": "student_name",
+    "student": "student_name",
+    "student_name": "student_name",
+    "degree": "degree",
+    "status": "status"
+}
+
+# Postgres: one tsvector per row, fields told apart by weight label
+TSVECTOR_WEIGHTS = {
+    "certificate_id": "A",
+    "student_name": "B",
+    "degree": "C",
+    "status": "D"
+}
+
+# SQLite: bm25 column weights (certificate_id, student_name, degree, status)
+FTS5_WEIGHTS = (10.0, 5.0, 2.0, 0.0)
+
+
+def parse_search_query(query):
+    """
+    Split a search string into (field, value) terms
+
+    Supported syntax:
+        john smi          every term must match, each as a prefix
+        "john smith"      phrase (the last word matches as a prefix)
+        degree:computer   restrict a term to one field (id, name, degree, status)
+    """
+    try:
+        parts = shlex.split(query)
+    except ValueError:
+        parts = query.replace('"', " ").split()
+
+    terms = []
+    for part in parts:
+        field = None
+        name, separator, value = part.partition(":")
+        if separator and name.lower() in SEARCH_FIELDS:
+            field = SEARCH_FIELDS[name.lower()]
+            part = value
+
+        value = part.rstrip("*").strip()
+        if value:
+            terms.append((field, value))
+    return terms
+
+
+def _fts5_match(terms):
+    """Build an FTS5 MATCH expression; every value is quoted so user input is never FTS syntax"""
+    clauses = []
+    for field, value in terms:
+        phrase = '"' + value.replace('"', '""') + '"*'
+        clauses.append(f"{field} : {phrase}" if field else phrase)
+    return " AND ".join(clauses)
+
+
+def _tsquery(terms):
+    """Build a Postgres to_tsquery expression using weight labels for field filters"""
+    clauses = []
+    for field, value in terms:
+        words = [
+            "".join(ch for ch in word if ch.isalnum() or ch == "_")
+            for word in value.split()
+        ]
+        words = [word for word in words if word]
+        if not words:
+            continue
+        suffix = ":*" + (TSVECTOR_WEIGHTS[field] if field else "")
+        clauses.append(" <-> ".join(f"{word}{suffix}" for word in words))
+    return " & ".join(f"({clause})" for clause in clauses)
+
+
+def search_backend():
+    """Full-text backend in use: "fts5", "tsvector" or None (fall back to LIKE)"""
+    return current_app.extensions.get("search_backend")
+
+
+def ensure_search_index():
+    """
+    Create the full-text index if needed and resynchronize it with the certificate table
+
+    Called at startup inside an application context.
+    """
+    dialect = db.engine.dialect.name
+    backend = None
+
+    if dialect == "sqlite":
+        try:
+            # Indexes built with tokenchars '_' kept CERT_2024_0001 as one token, so
+            # searching for part of an ID (2024, 0001) found nothing; rebuild them
+            existing = db.session.execute(text(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'certificate_fts'"
+            )).scalar()
+            if existing and "tokenchars" in existing:
+                db.session.execute(text("DROP TABLE certificate_fts"))
+
+            # "_" separates tokens, so each part of an ID is searchable on its own
+            db.session.execute(text("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS certificate_fts USING fts5(
+                    certificate_id, student_name, degree, status,
+                    tokenize = "unicode61 remove_diacritics 2",
+                    prefix = '2 3 4'
+                )
+            """))
+            indexed = db.session.execute(text("SELECT count(*) FROM certificate_fts")).scalar()
+            total = db.session.execute(text("SELECT count(*) FROM certificate")).scalar()
+            if indexed != total:
+                print(f"Rebuilding search index ({indexed} indexed, {total} certificates)...")
+                db.session.execute(text("DELETE FROM certificate_fts"))
+                db.session.execute(text("""
+                    INSERT INTO certificate_fts (rowid, certificate_id, student_name, degree, status)
+                    SELECT id, certificate_id, student_name, degree, status FROM certificate
+                """))
+            db.session.commit()
+            backend = "fts5"
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  SQLite FTS5 unavailable, search falls back to LIKE: {str(e)}")
+
+    elif dialect == "postgresql":
+        weighted = " || ".join(
+            f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+            for column, weight in TSVECTOR_WEIGHTS.items()
+        )
+        db.session.execute(text(
+            f"ALTER TABLE certificate ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({weighted}) STORED"
+        ))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_certificate_search_vector ON certificate USING GIN (search_vector)"
+        ))
+        db.session.commit()
+        backend = "tsvector"
+
+    current_app.extensions["search_backend"] = backend
+    return backend
+
+
+def index_certificate(cert):
+    """Add a new certificate to the search index (call before committing the insert)"""
+    if search_backend() != "fts5":
+        return  # Postgres keeps search_vector up to date as a generated column
+
+    db.session.flush()
+    db.session.execute(text("""
+        INSERT INTO certificate_fts (rowid, certificate_id, student_name, degree, status)
+        VALUES (:id, :certificate_id, :student_name, :degree, :status)
+    """), {
+        "id": cert.id,
+        "certificate_id": cert.certificate_id,
+        "student_name": cert.student_name,
+        "degree": cert.degree,
+        "status": cert.status or "active"
+    })
+
+
+def index_certificate_ids(certificate_ids):
+    """Add a batch of newly inserted certificates to the search index in one statement"""
+    if search_backend() != "fts5" or not certificate_ids:
+        return
+
+    db.session.execute(text("""
+        INSERT INTO certificate_fts (rowid, certificate_id, student_name, degree, status)
+        SELECT id, certificate_id, student_name, degree, status FROM certificate
+        WHERE certificate_id IN :certificate_ids
+    """).bindparams(bindparam("certificate_ids", expanding=True)), {"certificate_ids": list(certificate_ids)})
+
+
+def update_certificate_status(cert):
+    """Reflect a status change (e.g. revocation) in the search index"""
+    if search_backend() != "fts5":
+        return
+
+    db.session.execute(
+        text("UPDATE certificate_fts SET status = :status WHERE rowid = :id"),
+        {"status": cert.status, "id": cert.id}
+    )
+
+
+def apply_text_search(certificates_query, query, model):
+    """
+    Restrict a Certificate query to full-text matches
+
+    Args:
+        certificates_query: Query on the Certificate model
+        query (str): User search string (see parse_search_query)
+        model: The Certificate model class
+
+    Returns:
+        tuple: (filtered_query, rank) where rank is a column expression that
+            sorts the best matches first in ascending order (None if there are
+            no terms), or None when no full-text backend is available
+    """
+    backend = search_backend()
+    terms = parse_search_query(query)
+
+    if backend == "fts5":
+        match = _fts5_match(terms)
+        if not match:
+            return certificates_query, None
+        ranked = select(
+            literal_column("rowid").label("id"),
+            literal_column(f"bm25(certificate_fts, {', '.join(str(w) for w in FTS5_WEIGHTS)})").label("score")
+        ).select_from(text("certificate_fts")).where(
+            text("certificate_fts MATCH :match").bindparams(match=match)
+        ).subquery()
+        # bm25 scores are negative: lower is more relevant
+        return certificates_query.join(ranked, ranked.c.id == model.id), ranked.c.score
+
+    if backend == "tsvector":
+        tsquery = _tsquery(terms)
+        if not tsquery:
+            return certificates_query, None
+        search_vector = literal_column("certificate.search_vector")
+        parsed = func.to_tsquery("simple", tsquery)
+        return (
+            certificates_query.filter(search_vector.op("@@")(parsed)),
+            -func.ts_rank(search_vector, parsed)
+        )
+
+    return None
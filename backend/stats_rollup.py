@@ -0,0 +1,190 @@
+import datetime
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database import db
+from models import Certificate, CertificateRollup
+
+_UPSERTS = {
+    "sqlite": sqlite_insert,
+    "postgresql": postgresql_insert
+}
+
+
+def _bump_many(buckets, now):
+    """
+    Add deltas to rollup buckets, creating them if needed (runs in the caller's transaction)
+
+    Args:
+        buckets (dict): (day, degree, issuer, status) -> delta
+        now (datetime): updated_at for every touched bucket
+    """
+    insert = _UPSERTS.get(db.engine.dialect.name)
+    if insert is not None:
+        statement = insert(CertificateRollup.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["day", "degree", "issuer", "status"],
+            set_={
+                "certificate_count": CertificateRollup.certificate_count + statement.excluded.certificate_count,
+                "updated_at": statement.excluded.updated_at
+            }
+        )
+        db.session.execute(statement, [
+            {"day": day, "degree": degree, "issuer": issuer, "status": status,
+             "certificate_count": delta, "updated_at": now}
+            for (day, degree, issuer, status), delta in buckets.items()
+        ])
+        return
+
+    for (day, degree, issuer, status), delta in buckets.items():
+        bucket = CertificateRollup.query.filter_by(day=day, degree=degree, issuer=issuer, status=status).first()
+        if bucket is None:
+            db.session.add(CertificateRollup(
+                day=day, degree=degree, issuer=issuer, status=status,
+                certificate_count=delta, updated_at=now
+            ))
+        else:
+            bucket.certificate_count += delta
+            bucket.updated_at = now
+
+
+def _bump(day, degree, issuer, status, delta, now):
+    """Add delta to one rollup bucket, creating it if needed (runs in the caller's transaction)"""
+    _bump_many({(day, degree, issuer, status): delta}, now)
+
+
+def record_issue(cert):
+    """Count a newly issued certificate (call before committing the insert)"""
+    _bump(cert.issue_date, cert.degree, cert.created_by, cert.status or 'active', 1, datetime.datetime.utcnow())
+
+
+def record_issues(rows):
+    """
+    Count a batch of newly issued certificates with a single executemany upsert
+
+    Args:
+        rows (list): Certificate column dicts (issue_date, degree, created_by, status)
+    """
+    buckets = {}
+    for row in rows:
+        key = (row["issue_date"], row["degree"], row["created_by"], row.get("status") or 'active')
+        buckets[key] = buckets.get(key, 0) + 1
+
+    if buckets:
+        _bump_many(buckets, datetime.datetime.utcnow())
+
+
+def record_revocation(cert):
+    """Move a certificate from the active to the revoked bucket (call before committing)"""
+    _bump_many({
+        (cert.issue_date, cert.degree, cert.created_by, 'active'): -1,
+        (cert.issue_date, cert.degree, cert.created_by, 'revoked'): 1
+    }, datetime.datetime.utcnow())
+
+
+def rebuild_rollups():
+    """
+    Recompute every rollup bucket from the certificate table
+
+    Returns:
+        int: Number of buckets written
+    """
+    now = datetime.datetime.utcnow()
+    grouped = db.session.query(
+        Certificate.issue_date,
+        Certificate.degree,
+        Certificate.created_by,
+        Certificate.status,
+        func.count(Certificate.id),
+        literal(now, db.DateTime)
+    ).group_by(Certificate.issue_date, Certificate.degree, Certificate.created_by, Certificate.status)
+
+    CertificateRollup.query.delete()
+    db.session.execute(CertificateRollup.__table__.insert().from_select(
+        ["day", "degree", "issuer", "status", "certificate_count", "updated_at"],
+        grouped
+    ))
+    db.session.commit()
+    return CertificateRollup.query.count()
+
+
+def ensure_rollups():
+    """
+    Rebuild the rollups if their per-status totals disagree with the certificate table
+
+    Called at startup inside an application context; catches certificates
+    written by scripts that bypass the API.
+    """
+    expected = dict(db.session.query(Certificate.status, func.count(Certificate.id)).group_by(Certificate.status).all())
+    counted = dict(
+        db.session.query(CertificateRollup.status, func.sum(CertificateRollup.certificate_count))
+        .group_by(CertificateRollup.status).all()
+    )
+    counted = {status: count for status, count in counted.items() if count}
+    if expected != counted:
+        print(f"Rebuilding statistics rollups ({sum(counted.values())} counted, {sum(expected.values())} certificates)...")
+        rebuild_rollups()
+
+
+def monthly_windows(today, months):
+    """The /stats trend windows: 30-day periods starting at the first of this month, going back"""
+    first = today.replace(day=1)
+    return [first - datetime.timedelta(days=i * 30) for i in range(months)]
+
+
+def rollup_summary(today, top_degrees=5, months=6):
+    """
+    Certificate statistics read from the rollup table
+
+    Args:
+        today (date): Reference day for "today" and the monthly windows
+        top_degrees (int): Number of degrees to return, most common first
+        months (int): Number of 30-day trend windows (0 to skip)
+
+    Returns:
+        dict: total, by_status, today, top_degrees, monthly_trends (oldest
+            first) and as_of (time of the latest rollup write)
+    """
+    by_status = {}
+    as_of = None
+    for status, count, updated_at in db.session.query(
+        CertificateRollup.status,
+        func.sum(CertificateRollup.certificate_count),
+        func.max(CertificateRollup.updated_at)
+    ).group_by(CertificateRollup.status):
+        by_status[status] = int(count or 0)
+        if updated_at and (as_of is None or updated_at > as_of):
+            as_of = updated_at
+
+    certificates_today = db.session.query(
+        func.coalesce(func.sum(CertificateRollup.certificate_count), 0)
+    ).filter(CertificateRollup.day == today).scalar()
+
+    degree_total = func.sum(CertificateRollup.certificate_count)
+    degrees = db.session.query(CertificateRollup.degree, degree_total).group_by(
+        CertificateRollup.degree
+    ).having(degree_total > 0).order_by(degree_total.desc()).limit(top_degrees).all()
+
+    monthly_trends = []
+    if months:
+        windows = monthly_windows(today, months)
+        per_day = db.session.query(CertificateRollup.day, func.sum(CertificateRollup.certificate_count)).filter(
+            CertificateRollup.day >= windows[-1],
+            CertificateRollup.day < windows[0] + datetime.timedelta(days=30)
+        ).group_by(CertificateRollup.day).all()
+        for start in windows:
+            end = start + datetime.timedelta(days=30)
+            monthly_trends.append({
+                "month": start.strftime("%Y-%m"),
+                "count": sum(int(count) for day, count in per_day if start <= day < end)
+            })
+        monthly_trends.reverse()
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "today": int(certificates_today),
+        "top_degrees": [(degree, int(count)) for degree, count in degrees],
+        "monthly_trends": monthly_trends,
+        "as_of": as_of.isoformat() if as_of else None
+    }
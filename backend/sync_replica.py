@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Local Read Replica Sync Script
+Copies a SQLite primary database into a replica file with the online backup
+API, so the read/write split (DATABASE_REPLICA_URL) can be exercised without
+a real replication setup. Use --interval to keep re-syncing with a lag.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+def sqlite_path(value):
+    """Accept a file path or a sqlite:/// URL"""
+    if value.startswith("sqlite:///"):
+        return value[len("sqlite:///"):]
+    return value
+
+def sync(primary, replica):
+    """Copy the primary into the replica in one consistent snapshot"""
+    source = sqlite3.connect(primary)
+    target = sqlite3.connect(replica)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("primary", help="Primary database file or sqlite:/// URL (DATABASE_URL)")
+    parser.add_argument("replica", help="Replica database file or sqlite:/// URL (DATABASE_REPLICA_URL)")
+    parser.add_argument("--interval", type=float, default=0, help="Re-sync every N seconds (0 = once)")
+    args = parser.parse_args()
+
+    primary = sqlite_path(args.primary)
+    replica = sqlite_path(args.replica)
+    if not os.path.exists(primary):
+        print(f"❌ Primary database not found: {primary}")
+        sys.exit(1)
+
+    while True:
+        sync(primary, replica)
+        print(f"🔁 Replica synced at {time.strftime('%H:%M:%S')}: {primary} -> {replica}")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
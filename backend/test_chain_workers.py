@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Two worker processes issuing certificates against one database
+
+Each worker keeps its own in-memory chain over the shared chain_block table.
+The workers take turns issuing and revoking; every write must succeed, the
+stored chain must stay contiguous and linked, and what one worker wrote must
+be verifiable and in the revocation feed of the other. Runs offline.
+"""
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def run_worker(directory, name, connection):
+    """Load the app, then answer ("add", id) / ("revoke", id) / ("verify", id) / ("revocations",) / ("chain",) until None"""
+    from app_loader import load_app
+    app = load_app(directory, f"worker_{name}", PASSWORD_HASH_WORKERS="0", RATE_LIMIT_ENABLED="false", CHAIN_SYNC_SECONDS="0")
+    client = app.test_client()
+    client.post('/api/auth/register', json={"username": f"admin_{name}", "password": "worker-password", "role": "Admin"})
+    token = client.post('/api/auth/login', json={"username": f"admin_{name}", "password": "worker-password"}).json["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    connection.send("ready")
+
+    for command in iter(connection.recv, None):
+        if command[0] == "add":
+            response = client.post('/api/add_certificate', headers=headers, json={
+                "certificate_id": command[1],
+                "student_name": f"Student {command[1]}",
+                "degree": "BSc Computer Science",
+                "issue_date": "2024-03-01"
+            })
+            connection.send((response.status_code, response.json.get("data", {}).get("block", {}).get("index")))
+        elif command[0] == "revoke":
+            response = client.delete(f'/api/delete_certificate/{command[1]}', headers=headers)
+            connection.send((response.status_code, response.json.get("data", {}).get("revocation_block", {}).get("index")))
+        elif command[0] == "verify":
+            response = client.get(f'/api/verify/{command[1]}', headers=headers)
+            connection.send((response.status_code, response.json.get("data", {}).get("blockchain_data", {}).get("index")))
+        elif command[0] == "revocations":
+            response = client.get('/api/revocations/delta', query_string={"since": 0})
+            connection.send([entry["certificate_id"] for entry in response.json["revocations"]])
+        elif command[0] == "chain":
+            import certificates
+            connection.send((len(certificates.blockchain.chain), certificates.blockchain.is_chain_valid()))
+
+def start_worker(context, directory, name):
+    parent, child = context.Pipe()
+    process = context.Process(target=run_worker, args=(directory, name, child), daemon=True)
+    process.start()
+    assert parent.poll(120), f"worker {name} did not start"
+    assert parent.recv() == "ready"
+    return process, parent
+
+def call(connection, *command):
+    connection.send(command)
+    assert connection.poll(60), f"no answer to {command}"
+    return connection.recv()
+
+def test_workers_share_one_chain():
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        # One after the other, so only the first runs the schema migrations
+        worker_a, a = start_worker(context, directory, "a")
+        worker_b, b = start_worker(context, directory, "b")
+        try:
+            # B's chain lags behind each time A appends, and the other way round
+            assert call(a, "add", "WORKER_A1") == (201, 1)
+            # Issued by A: B finds it without having appended anything itself
+            assert call(b, "verify", "WORKER_A1") == (200, 1)
+            assert call(b, "add", "WORKER_B1") == (201, 2)
+            assert call(a, "add", "WORKER_A2") == (201, 3)
+            assert call(b, "revoke", "WORKER_A1") == (200, 4)
+            assert call(a, "revocations") == ["WORKER_A1"]
+            assert call(a, "verify", "WORKER_B1") == (200, 2)
+            assert call(a, "add", "WORKER_A3") == (201, 5)
+            assert call(a, "chain") == (6, True)
+            assert call(b, "add", "WORKER_B2") == (201, 6)
+            assert call(b, "chain") == (7, True)
+        finally:
+            for connection, process in ((a, worker_a), (b, worker_b)):
+                connection.send(None)
+                process.join(30)
+
+        with sqlite3.connect(os.path.join(directory, "app.db")) as connection:
+            rows = connection.execute("SELECT block_index, previous_hash, hash FROM chain_block ORDER BY block_index").fetchall()
+        assert [row[0] for row in rows] == list(range(7))
+        assert all(rows[i][1] == rows[i - 1][2] for i in range(1, len(rows)))
+
+if __name__ == "__main__":
+    test_workers_share_one_chain()
+    print("✅ Both workers appended to one contiguous chain")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Readiness checks for the background deep health check
+
+A deep check that raises says nothing about the chain: readiness must
+report it as "error" without failing the probe, and retry it after
+retry_after rather than max_age. Runs offline against an in-memory database.
+"""
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+import health
+from database import db
+from health import HealthMonitor
+
+def create_app():
+    """Create a Flask app backed by an in-memory database"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def failing_deep_check():
+    raise RuntimeError("database is locked")
+
+def finish_deep_check(monitor):
+    monitor._thread.join(30)
+    assert not monitor.running
+
+def test_failed_deep_check_is_retried_without_failing_readiness():
+    app = create_app()
+    with app.app_context():
+        import models  # noqa: F401  (registers the tables)
+        db.create_all()
+        monitor = HealthMonitor(app, max_age=300, retry_after=5)
+
+        original = health.deep_check
+        health.deep_check = failing_deep_check
+        try:
+            assert monitor.start_deep_check()
+            finish_deep_check(monitor)
+        finally:
+            health.deep_check = original
+
+        ready, details = monitor.readiness()
+        assert ready, details
+        assert details["blockchain"]["status"] == "error"
+        assert details["blockchain"]["error"] == "database is locked"
+        assert not details["deep_check_running"]
+
+        # Past retry_after (well before max_age) the next probe starts a new check
+        monitor.last_check["finished_at"] = time.time() - 10
+        monitor.readiness()
+        finish_deep_check(monitor)
+        assert "error" not in monitor.last_check
+
+        ready, details = monitor.readiness()
+        assert ready, details
+        assert details["blockchain"]["status"] == "valid"
+        assert not details["deep_check_running"]
+
+if __name__ == "__main__":
+    test_failed_deep_check_is_retried_without_failing_readiness()
+    print("✅ A failed deep check is reported as an error and retried")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Schema migration checks
+
+Runs the versioned migrations against temporary SQLite files and asserts that
+the result matches models.py, that every migration reverts cleanly, and that a
+database written by the old migrate_database.py (wrong column types, string
+dates, no issued_at) is upgraded without losing rows. Runs offline.
+"""
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import DateTime, String, create_engine, inspect
+from sqlalchemy.dialects import postgresql
+from database import db
+import models  # noqa: F401 - registers the tables on db.metadata
+from migrations import current_version, downgrade, head_version, upgrade
+from migrations.operations import Operations
+from migrations.versions import m0003_typed_dates_and_indexes as m0003
+
+def quiet(message):
+    pass
+
+def temporary_engine(directory, name="test.db"):
+    return create_engine(f"sqlite:///{os.path.join(directory, name)}")
+
+def model_schema(dialect):
+    """Columns, indexes and unique constraints declared in models.py"""
+    schema = {}
+    for table in db.metadata.sorted_tables:
+        unique = {tuple(c.name for c in constraint.columns) for constraint in table.constraints
+                  if constraint.__class__.__name__ == "UniqueConstraint"}
+        unique |= {(column.name,) for column in table.columns if column.unique}
+        schema[table.name] = {
+            "columns": {column.name: (column.type.compile(dialect=dialect), column.nullable) for column in table.columns},
+            "indexes": {index.name for index in table.indexes},
+            "unique": unique
+        }
+    return schema
+
+def database_schema(engine):
+    """The same shape, reflected from the database"""
+    inspector = inspect(engine)
+    schema = {}
+    for table in inspector.get_table_names():
+        if table == "schema_migrations" or table.startswith("certificate_fts"):
+            continue
+        schema[table] = {
+            "columns": {column["name"]: (column["type"].compile(dialect=engine.dialect), column["nullable"])
+                        for column in inspector.get_columns(table)},
+            "indexes": {index["name"] for index in inspector.get_indexes(table)},
+            "unique": {tuple(constraint["column_names"]) for constraint in inspector.get_unique_constraints(table)}
+        }
+    return schema
+
+def assert_matches_models(engine):
+    expected = model_schema(engine.dialect)
+    actual = database_schema(engine)
+    assert actual == expected, f"schema drift:\n  models:   {expected}\n  database: {actual}"
+
+def test_upgrade_matches_models():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = temporary_engine(directory)
+        upgrade(engine, log=quiet)
+        assert current_version(engine) == head_version()
+        assert_matches_models(engine)
+        assert upgrade(engine, log=quiet) == []
+        engine.dispose()
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = temporary_engine(directory)
+        upgrade(engine, log=quiet)
+
+        # Step down one version at a time, then back up
+        for target in range(head_version() - 1, -1, -1):
+            assert downgrade(engine, target, log=quiet) == [target + 1]
+            assert current_version(engine) == target
+        assert set(inspect(engine).get_table_names()) == {"schema_migrations"}
+
+        upgrade(engine, log=quiet)
+        assert_matches_models(engine)
+        engine.dispose()
+
+def test_create_all_database_is_adopted():
+    """Databases created with db.create_all() before migrations existed"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = temporary_engine(directory)
+        db.metadata.create_all(engine)
+        upgrade(engine, log=quiet)
+        assert current_version(engine) == head_version()
+        assert_matches_models(engine)
+        engine.dispose()
+
+def test_legacy_database_is_upgraded():
+    """Databases written by the old hand-rolled migrate_database.py"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "legacy.db")
+        connection = sqlite3.connect(path)
+        connection.executescript("""
+            CREATE TABLE user (id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, password_hash VARCHAR(128) NOT NULL,
+                               role VARCHAR(10) NOT NULL, PRIMARY KEY (id), UNIQUE (username));
+            CREATE TABLE certificate (id INTEGER NOT NULL, certificate_id VARCHAR(64) NOT NULL,
+                                      student_name VARCHAR(120) NOT NULL, degree VARCHAR(120) NOT NULL,
+                                      issue_date VARCHAR(20) NOT NULL, qr_code_path VARCHAR(256),
+                                      created_by VARCHAR(80) NOT NULL, PRIMARY KEY (id), UNIQUE (certificate_id));
+            ALTER TABLE certificate ADD COLUMN status VARCHAR(20) DEFAULT 'active';
+            ALTER TABLE certificate ADD COLUMN revoked_by INTEGER;
+            ALTER TABLE certificate ADD COLUMN revoked_at DATETIME;
+        """)
+        connection.executemany(
+            "INSERT INTO certificate (certificate_id, student_name, degree, issue_date, created_by, status, revoked_by, revoked_at) "
+            "VALUES (?, ?, ?, ?, 'admin', ?, ?, ?)",
+            [(f"LEGACY_{i}", f"Student {i}", "BSc", f"2024-01-{i + 1:02d} 00:00:00",
+              "revoked" if i == 0 else "active", "12345" if i == 0 else None, "2024-02-01T10:00:00" if i == 0 else None)
+             for i in range(7)]
+        )
+        connection.commit()
+        connection.close()
+
+        engine = temporary_engine(directory, "legacy.db")
+        upgrade(engine, batch_size=2, log=quiet)
+        assert_matches_models(engine)
+
+        connection = sqlite3.connect(path)
+        rows = connection.execute(
+            "SELECT certificate_id, issue_date, issued_at, revoked_by, typeof(revoked_by) FROM certificate ORDER BY id"
+        ).fetchall()
+        connection.close()
+        assert len(rows) == 7
+        assert rows[0] == ("LEGACY_0", "2024-01-01", "2024-01-01 00:00:00.000000", "12345", "text")
+        assert all(issued_at for _, _, issued_at, _, _ in rows)
+        engine.dispose()
+
+class RecordingConnection:
+    """Stands in for a Postgres connection: keeps the SQL instead of running it"""
+
+    def __init__(self):
+        self.dialect = postgresql.dialect()
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(" ".join(str(statement.compile(dialect=self.dialect)).split()))
+        return SimpleNamespace(rowcount=0)
+
+    def commit(self):
+        pass
+
+    def execution_options(self, **options):
+        return self
+
+class RecordingOperations(Operations):
+    """Reports the given columns instead of reflecting a database"""
+
+    def __init__(self, tables):
+        super().__init__(RecordingConnection(), transactional=False, log=quiet)
+        self.tables = tables
+
+    def has_table(self, table):
+        return table in self.tables
+
+    def columns(self, table):
+        return self.tables.get(table, {})
+
+    def add_column(self, table, column):
+        super().add_column(table, column)
+        self.tables[table][column.name] = {"type": column.type, "nullable": column.nullable}
+
+def assert_identifiers_quoted(statements):
+    """user is reserved in Postgres, so it must only appear quoted"""
+    unquoted = [statement for statement in statements if re.search(r'(?<!")\buser\b(?!")', statement)]
+    assert not unquoted, f"unquoted user table: {unquoted}"
+
+def test_typed_dates_migration_compiles_for_postgres():
+    """m0003 (which indexes the user table) against the postgresql dialect"""
+    op = RecordingOperations({
+        "user": {"role": {"type": String(10), "nullable": False}},
+        "certificate": {"issue_date": {"type": String(20), "nullable": False}}
+    })
+    m0003.upgrade(op)
+    statements = op.connection.statements
+    assert_identifiers_quoted(statements)
+    assert "ALTER TABLE certificate ADD COLUMN issued_at TIMESTAMP WITHOUT TIME ZONE" in statements
+    assert "ALTER TABLE certificate ALTER COLUMN issued_at SET NOT NULL" in statements
+    assert 'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_role ON "user" (role)' in statements
+    assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_certificate_status_issue_date ON certificate (status, issue_date)" in statements
+
+    op = RecordingOperations({
+        "user": {"role": {"type": String(10), "nullable": False}},
+        "certificate": {"issue_date": {"type": postgresql.DATE(), "nullable": False},
+                        "issued_at": {"type": DateTime(), "nullable": False}}
+    })
+    m0003.downgrade(op)
+    statements = op.connection.statements
+    assert_identifiers_quoted(statements)
+    assert "DROP INDEX IF EXISTS ix_user_role" in statements
+    assert "ALTER TABLE certificate DROP COLUMN issued_at" in statements
+
+if __name__ == "__main__":
+    for check in (test_upgrade_matches_models, test_round_trip, test_create_all_database_is_adopted,
+                  test_legacy_database_is_upgraded, test_typed_dates_migration_compiles_for_postgres):
+        check()
+        print(f"✅ {check.__name__}")
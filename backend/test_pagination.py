@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Cursor pagination checks for /api/certificates and /api/search
+
+Walks every page of both endpoints through next_cursor and checks that
+out-of-range limits are clamped and non-integer ones rejected. Runs
+offline against a temporary SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_loader import load_app
+from pagination import parse_limit, parse_offset
+
+CERTIFICATES = 23
+
+def load_pagination_app(directory):
+    """Load the application with a fresh chain (another test may have loaded one in this process)"""
+    import certificates
+    certificates.init_blockchain()
+    return load_app(directory, "pagination_app", PASSWORD_HASH_WORKERS="0", RATE_LIMIT_ENABLED="false")
+
+def issue_certificates(client):
+    client.post('/api/auth/register', json={"username": "page_admin", "password": "page-password", "role": "Admin"})
+    token = client.post('/api/auth/login', json={"username": "page_admin", "password": "page-password"}).json["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(CERTIFICATES):
+        response = client.post('/api/add_certificate', headers=headers, json={
+            "certificate_id": f"PAGE_{i:04d}",
+            "student_name": f"Student {i}",
+            "degree": "BSc Computer Science",
+            "issue_date": "2024-03-01"
+        })
+        assert response.status_code == 201, response.json
+    return headers
+
+# Key of the page's rows in each endpoint's response
+ROWS = {'/api/certificates': "certificates", '/api/search': "results"}
+
+def walk(client, headers, path, params):
+    """Every certificate ID reachable from the first page through next_cursor"""
+    ids, cursor = [], None
+    while True:
+        response = client.get(path, headers=headers, query_string={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.json
+        data = response.json["data"]
+        ids.extend(cert["certificate_id"] for cert in data[ROWS[path]])
+        cursor = data["pagination"]["next_cursor"]
+        assert data["pagination"]["has_more"] == (cursor is not None)
+        if cursor is None:
+            return ids
+
+def test_cursor_walk_and_limits():
+    with tempfile.TemporaryDirectory() as directory:
+        client = load_pagination_app(directory).test_client()
+        headers = issue_certificates(client)
+        newest_first = [f"PAGE_{i:04d}" for i in reversed(range(CERTIFICATES))]
+
+        assert walk(client, headers, '/api/certificates', {"limit": 5}) == newest_first
+        assert sorted(walk(client, headers, '/api/search', {"q": "Student", "limit": 5})) == sorted(newest_first)
+
+        for path in ('/api/certificates', '/api/search'):
+            for limit in ("0", "-1"):
+                response = client.get(path, headers=headers, query_string={"limit": limit})
+                assert response.status_code == 200, response.json
+                assert response.json["data"]["pagination"]["limit"] == 1
+                assert len(response.json["data"][ROWS[path]]) == 1
+            assert client.get(path, headers=headers, query_string={"limit": "abc"}).status_code == 400
+
+        # The deprecated offset of /api/search is validated like limit
+        for offset in ("abc", "-1"):
+            assert client.get('/api/search', headers=headers, query_string={"offset": offset}).status_code == 400
+        response = client.get('/api/search', headers=headers, query_string={"q": "Student", "limit": 5, "offset": 20})
+        assert response.status_code == 200, response.json
+        assert len(response.json["data"]["results"]) == CERTIFICATES - 20
+
+        response = client.get('/api/certificates', headers=headers, query_string={"limit": 100000})
+        assert response.json["data"]["pagination"]["limit"] == 500
+        assert len(response.json["data"]["certificates"]) == CERTIFICATES
+
+def test_parse_limit():
+    assert parse_limit(None, 20, 100) == 20
+    assert parse_limit("", 20, 100) == 20
+    assert parse_limit("0", 20, 100) == 1
+    assert parse_limit("-5", 20, 100) == 1
+    assert parse_limit("250", 20, 100) == 100
+    assert parse_limit(" 7 ", 20, 100) == 7
+    try:
+        parse_limit("abc", 20, 100)
+    except ValueError as error:
+        assert "integer" in str(error)
+    else:
+        raise AssertionError("a non-integer limit was accepted")
+
+def test_parse_offset():
+    assert parse_offset(None) == 0
+    assert parse_offset("") == 0
+    assert parse_offset("0") == 0
+    assert parse_offset(" 40 ") == 40
+    for value, message in (("abc", "integer"), ("1.5", "integer"), ("-1", "negative")):
+        try:
+            parse_offset(value)
+        except ValueError as error:
+            assert message in str(error)
+        else:
+            raise AssertionError(f"offset {value!r} was accepted")
+
+if __name__ == "__main__":
+    test_parse_limit()
+    test_parse_offset()
+    test_cursor_walk_and_limits()
+    print("✅ Cursor pagination and limit checks passed")
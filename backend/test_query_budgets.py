@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Query budget checks for the API endpoints
+
+Loads the application against a temporary SQLite database with
+QUERY_BUDGET_ASSERT on, so any request that runs more queries than its
+endpoint's budget (or repeats one statement shape, N+1 style) raises
+QueryBudgetExceeded and fails the check. Runs offline.
+"""
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import text
+from app_loader import load_app
+from database import db
+from query_monitor import QueryBudgetExceeded, QueryMonitor, normalize_sql
+
+CERTIFICATES = 60
+
+# Queries each endpoint may run; tighten these when an endpoint gets cheaper
+BUDGETS = {
+    "cert.add_certificate": 12,
+    "cert.delete_certificate": 8,
+    "cert.get_certificates": 2,
+    "cert.search_certificates": 2,
+    "cert.get_stats": 7,
+    "cert.get_dashboard_data": 5,
+    "cert.verify_certificate": 1,
+    "cert.verify_certificate_public": 1,
+    "cert.get_certificate_status": 1,
+    "cert.live_verify_certificate": 1,
+    "cert.debug_certificate": 4,
+    "health_check": 1,
+    "health_ready": 1,
+    "health_live": 0
+}
+
+GET_ENDPOINTS = [
+    "/api/certificates",
+    "/api/certificates?limit=50",
+    "/api/search?q=Student",
+    "/api/stats",
+    "/api/dashboard",
+    "/api/verify/BUDGET_0001",
+    "/api/verify/simple/BUDGET_0001",
+    "/api/verify/status/BUDGET_0001",
+    "/api/verify/live/BUDGET_0001",
+    "/api/debug/certificate/BUDGET_0001",
+    "/api/health",
+    "/api/health/ready",
+    "/api/health/live"
+]
+
+def load_budget_app(directory):
+    """Load the application against a throwaway database with the budgets asserted"""
+    app = load_app(
+        directory, "budget_app",
+        PASSWORD_HASH_WORKERS="0",
+        RATE_LIMIT_ENABLED="false",
+        QUERY_BUDGET_ASSERT="true",
+        QUERY_BUDGETS=";".join(f"{endpoint}={budget}" for endpoint, budget in BUDGETS.items())
+    )
+    app.testing = True  # Let QueryBudgetExceeded reach the test instead of becoming a 500
+    return app
+
+def run_checks(app):
+    """Issue certificates, call each endpoint and return {path: status}"""
+    client = app.test_client()
+    client.post('/api/auth/register', json={"username": "budget_admin", "password": "budget-password", "role": "Admin"})
+    token = client.post('/api/auth/login', json={"username": "budget_admin", "password": "budget-password"}).json["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for i in range(CERTIFICATES):
+        response = client.post('/api/add_certificate', headers=headers, json={
+            "certificate_id": f"BUDGET_{i:04d}",
+            "student_name": f"Student {i}",
+            "degree": f"Degree {i % 5}",
+            "issue_date": "2024-03-01"
+        })
+        assert response.status_code == 201, response.json
+
+    results = {}
+    for path in GET_ENDPOINTS:
+        results[path] = client.get(path, headers=headers).status_code
+        assert results[path] == 200, f"{path} answered {results[path]}"
+
+    # Second page through the cursor of the first
+    next_cursor = client.get('/api/certificates?limit=50', headers=headers).json["data"]["pagination"]["next_cursor"]
+    response = client.get('/api/certificates', headers=headers, query_string={"limit": 50, "cursor": next_cursor})
+    assert response.status_code == 200 and len(response.json["data"]["certificates"]) == CERTIFICATES - 50, response.json
+    results["/api/certificates?limit=50&cursor=..."] = response.status_code
+    results["DELETE /api/delete_certificate/BUDGET_0002"] = client.delete(
+        '/api/delete_certificate/BUDGET_0002', headers=headers
+    ).status_code
+    return results
+
+def test_endpoints_stay_within_query_budgets():
+    with tempfile.TemporaryDirectory() as directory:
+        run_checks(load_budget_app(directory))
+
+def test_per_row_queries_are_flagged():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    monitor = QueryMonitor(default_budget=50, repeat_threshold=5, assert_budgets=True)
+    with app.app_context():
+        monitor.attach(db.engine)
+
+    @app.route('/per_row')
+    def per_row():
+        for i in range(8):
+            db.session.execute(text(f"SELECT {i}"))
+        return "ok"
+
+    with app.test_request_context('/per_row'):
+        monitor.start_request()
+        per_row()
+        try:
+            monitor.finish_request()
+        except QueryBudgetExceeded as error:
+            assert "8x SELECT ?" in str(error)
+        else:
+            raise AssertionError("per-row queries were not flagged")
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT * FROM certificate\n WHERE id IN (?, ?, ?) AND status = 'active' LIMIT 20") == \
+        "SELECT * FROM certificate WHERE id IN (?...) AND status = ? LIMIT ?"
+    assert normalize_sql("SELECT sum_1 FROM anon_1 WHERE x = %(x_1)s") == "SELECT sum_1 FROM anon_1 WHERE x = %(x_1)s"
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        for path, status in run_checks(load_budget_app(directory)).items():
+            print(f"✅ {path} ({status}) within budget")
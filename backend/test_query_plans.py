@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Query plan checks for the /search, /stats and /dashboard filters
+
+Runs EXPLAIN QUERY PLAN on the queries the endpoints build and asserts that
+SQLite uses the secondary indexes declared on models.Certificate instead of
+scanning the table. Runs offline against an in-memory database.
+"""
+import datetime
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import func, text
+from database import db
+from models import Certificate, User
+
+def create_app():
+    """Create a Flask app backed by an in-memory database"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def seed(count=2000):
+    """Insert enough rows for the planner statistics to be meaningful"""
+    start = datetime.date(2024, 1, 1)
+    for i in range(count):
+        db.session.add(Certificate(
+            certificate_id=f"PLAN_{i:06d}",
+            student_name=f"Student {i}",
+            degree=f"Degree {i % 25}",
+            issue_date=start + datetime.timedelta(days=i % 500),
+            created_by=f"admin{i % 5}",
+            status='revoked' if i % 20 == 0 else 'active'
+        ))
+    db.session.add(User(username="admin", password_hash="x", role="Admin"))
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+
+def query_plan(query):
+    """Return the EXPLAIN QUERY PLAN output of a SQLAlchemy query as one string"""
+    statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {statement}")).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+def check_plan(query, index_name):
+    plan = query_plan(query)
+    assert index_name in plan, f"expected {index_name} in plan:\n{plan}"
+    return plan
+
+def run_checks():
+    """Build each endpoint query and check its plan"""
+    today = datetime.date(2024, 6, 1)
+    return {
+        "stats: certificates today": check_plan(
+            Certificate.query.filter(Certificate.issue_date == today).with_entities(func.count()),
+            "ix_certificate_issue_date"
+        ),
+        "stats: monthly trend": check_plan(
+            Certificate.query.filter(
+                Certificate.issue_date >= today,
+                Certificate.issue_date < today + datetime.timedelta(days=30)
+            ).with_entities(func.count()),
+            "ix_certificate_issue_date"
+        ),
+        "stats/dashboard: degree distribution": check_plan(
+            db.session.query(Certificate.degree, func.count(Certificate.id))
+            .group_by(Certificate.degree).order_by(func.count(Certificate.id).desc()).limit(5),
+            "ix_certificate_degree"
+        ),
+        "stats: revoked today": check_plan(
+            Certificate.query.filter(Certificate.status == 'revoked', Certificate.issue_date == today)
+            .with_entities(func.count()),
+            "ix_certificate_status_issue_date"
+        ),
+        "search: date range": check_plan(
+            Certificate.query.filter(
+                Certificate.issue_date >= today,
+                Certificate.issue_date <= today + datetime.timedelta(days=7)
+            ).order_by(Certificate.id.desc()).limit(20),
+            "ix_certificate_issue_date"
+        ),
+        "certificates by issuer": check_plan(
+            Certificate.query.filter(Certificate.created_by == "admin1")
+            .order_by(Certificate.issued_at.desc()).limit(10),
+            "ix_certificate_created_by_issued_at"
+        ),
+        "stats: users per role": check_plan(
+            User.query.filter_by(role='Admin').with_entities(func.count()),
+            "ix_user_role"
+        )
+    }
+
+def test_endpoint_queries_use_indexes():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+        run_checks()
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+        for name, plan in run_checks().items():
+            print(f"✅ {name}")
+            for line in plan.splitlines():
+                print(f"    {line}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline receipt verification checks
+
+Issues a receipt with a throwaway key and checks that verify_receipt accepts
+it, and that tampered or malformed receipts (including payloads that are
+valid JSON but not an object) are rejected with an error message rather
+than an exception. Runs offline.
+"""
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from blockchain import Blockchain
+from receipt_verifier import RECEIPT_VERSION, b64url_encode, verify_receipt
+from receipts import ReceiptSigner
+
+CERTIFICATE = {
+    "certificate_id": "CERT_2024_0001",
+    "student_name": "Amina Khan",
+    "degree": "BSc Computer Science",
+    "issue_date": "2024-03-01",
+    "issued_by": "admin"
+}
+
+def issue():
+    signer = ReceiptSigner(bytes(range(32)))
+    block = Blockchain().add_block(CERTIFICATE)
+    return signer, signer.issue_receipt(CERTIFICATE, block)
+
+def with_payload(receipt, payload):
+    """The receipt with its payload part replaced (the signature no longer matches)"""
+    _, _, signature = receipt.split(".")
+    return f"{RECEIPT_VERSION}.{b64url_encode(payload)}.{signature}"
+
+def test_valid_receipt_verifies():
+    signer, receipt = issue()
+    for keys in (signer.public_key, signer.public_key.hex(), {signer.key_id: signer.public_key}):
+        certificate, error = verify_receipt(receipt, keys)
+        assert error is None, error
+        assert certificate["certificate_id"] == CERTIFICATE["certificate_id"]
+
+def test_tampered_receipt_is_rejected():
+    signer, receipt = issue()
+    forged = with_payload(receipt, receipt.split(".")[1].encode("ascii")[::-1])
+    assert verify_receipt(forged, signer.public_key) == (None, "Malformed receipt")
+
+    _, payload, signature = receipt.split(".")
+    flipped = signature[:-2] + ("AA" if signature[-2:] != "AA" else "BA")
+    assert verify_receipt(f"{RECEIPT_VERSION}.{payload}.{flipped}", signer.public_key)[1] == "Invalid receipt signature"
+
+def test_malformed_receipts_are_rejected():
+    signer, receipt = issue()
+    malformed = [
+        "",
+        "not-a-receipt",
+        f"v0.{receipt.split('.', 1)[1]}",
+        f"{RECEIPT_VERSION}.!!!.{receipt.split('.')[2]}",
+        with_payload(receipt, b"{not json"),
+        # Valid JSON, but not an object
+        with_payload(receipt, b"[]"),
+        with_payload(receipt, b'"x"'),
+        with_payload(receipt, b"1"),
+        with_payload(receipt, b"null")
+    ]
+    for bad in malformed:
+        for keys in (signer.public_key, {signer.key_id: signer.public_key}):
+            assert verify_receipt(bad, keys) == (None, "Malformed receipt"), bad
+
+if __name__ == "__main__":
+    for check in (test_valid_receipt_verifies, test_tampered_receipt_is_rejected, test_malformed_receipts_are_rejected):
+        check()
+        print(f"✅ {check.__name__}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Full-text search checks for /search
+
+Builds the SQLite FTS5 index over a few certificates and checks which IDs
+each search string finds, including parts of an ID (CERT_2024_0001 by 2024
+or 0001). Runs offline against an in-memory database.
+"""
+import datetime
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import text
+from database import db
+from models import Certificate
+from search_index import apply_text_search, ensure_search_index, index_certificate
+
+CERTIFICATES = (
+    ("CERT_2024_0001", "Amina Khan", "BSc Computer Science"),
+    ("CERT_2024_0002", "Bilal Ahmed", "BSc Physics"),
+    ("CERT_2023_0417", "Chen Wei", "MSc Data Science"),
+    ("LEGACY1234", "Dana Costa", "BA Economics")
+)
+
+# Search string -> certificate IDs it must find
+EXPECTED = {
+    "0001": {"CERT_2024_0001"},
+    "2024": {"CERT_2024_0001", "CERT_2024_0002"},
+    "CERT_2024": {"CERT_2024_0001", "CERT_2024_0002"},
+    "CERT_2024_0001": {"CERT_2024_0001"},
+    "cert_2023_04": {"CERT_2023_0417"},
+    "id:0417": {"CERT_2023_0417"},
+    "LEGACY": {"LEGACY1234"},
+    "amina": {"CERT_2024_0001"},
+    "degree:science": {"CERT_2024_0001", "CERT_2023_0417"},
+    "2025": set()
+}
+
+def create_app():
+    """Create a Flask app backed by an in-memory database"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def seed():
+    for certificate_id, student_name, degree in CERTIFICATES:
+        cert = Certificate(
+            certificate_id=certificate_id,
+            student_name=student_name,
+            degree=degree,
+            issue_date=datetime.date(2024, 3, 1),
+            created_by="admin",
+            status="active"
+        )
+        db.session.add(cert)
+        index_certificate(cert)
+    db.session.commit()
+
+def search(query):
+    searched, _ = apply_text_search(Certificate.query, query, Certificate)
+    return {cert.certificate_id for cert in searched}
+
+def run_checks():
+    """Search for each EXPECTED string; returns {query: found IDs}"""
+    results = {}
+    for query, expected in EXPECTED.items():
+        results[query] = search(query)
+        assert results[query] == expected, f"{query!r} found {sorted(results[query])}, expected {sorted(expected)}"
+    return results
+
+def test_search_finds_parts_of_certificate_ids():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        assert ensure_search_index() == "fts5"
+        seed()
+        run_checks()
+
+def test_index_with_underscore_tokens_is_rebuilt():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        # The tokenizer the index was first created with
+        db.session.execute(text("""
+            CREATE VIRTUAL TABLE certificate_fts USING fts5(
+                certificate_id, student_name, degree, status,
+                tokenize = "unicode61 remove_diacritics 2 tokenchars '_'",
+                prefix = '2 3 4'
+            )
+        """))
+        db.session.commit()
+        app.extensions["search_backend"] = "fts5"
+        seed()
+        assert search("0001") == set()
+
+        assert ensure_search_index() == "fts5"
+        run_checks()
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        ensure_search_index()
+        seed()
+        for query, found in run_checks().items():
+            print(f"✅ {query!r}: {', '.join(sorted(found)) or 'no results'}")
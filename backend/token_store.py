@@ -0,0 +1,251 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Answers "definitely not added" or "possibly added"; the false positive rate
+    stays near error_rate until more than capacity items have been added.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _hashes(self, item):
+        # Double hashing: all k positions come from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item):
+        first, second = self._hashes(item)
+        for i in range(self.hash_count):
+            position = (first + i * second) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        first, second = self._hashes(item)
+        bits, size = self.bits, self.size
+        for i in range(self.hash_count):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False  # Usually on the first probe or two for unknown tokens
+        return True
+
+
+class MemoryRevocationStore:
+    """
+    Per-process revocation store with time-bucketed expiry
+
+    Entries are grouped into buckets of bucket_seconds by expiry time, so
+    purging expired tokens drops whole buckets instead of scanning every entry.
+    """
+
+    def __init__(self, bucket_seconds=300):
+        self.bucket_seconds = bucket_seconds
+        self._expiry = {}  # jti -> expires_at
+        self._buckets = {}  # bucket number -> set of jti
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def revoke(self, jti, expires_at):
+        bucket = int(expires_at // self.bucket_seconds)
+        with self._lock:
+            self._expiry[jti] = expires_at
+            self._buckets.setdefault(bucket, set()).add(jti)
+            self._sequence += 1
+
+    def is_revoked(self, jti, now=None):
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > (now or time.time())
+
+    def changes_since(self, sequence):
+        """(latest sequence, jtis revoked by other processes) - none for a per-process store"""
+        return self._sequence, []
+
+    def active(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            return [jti for jti, expires_at in self._expiry.items() if expires_at > now]
+
+    def purge(self, now=None):
+        """Drop every bucket whose tokens have all expired; returns the number of tokens dropped"""
+        current = int((now or time.time()) // self.bucket_seconds)
+        dropped = 0
+        with self._lock:
+            for bucket in [bucket for bucket in self._buckets if bucket < current]:
+                for jti in self._buckets.pop(bucket):
+                    del self._expiry[jti]
+                    dropped += 1
+        return dropped
+
+    def __len__(self):
+        return len(self._expiry)
+
+
+class SQLiteRevocationStore:
+    """
+    Revocation store in a small SQLite file shared by every worker on the host
+
+    Stands in for a shared key-value store such as Redis: revoke, lookup,
+    an append-only sequence for incremental sync, and expiry purges.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS revoked_token (
+                sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+                jti TEXT NOT NULL UNIQUE,
+                expires_at REAL NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_revoked_token_expires_at ON revoked_token (expires_at)")
+        connection.commit()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def revoke(self, jti, expires_at):
+        connection = self._connection()
+        connection.execute("INSERT OR IGNORE INTO revoked_token (jti, expires_at) VALUES (?, ?)", (jti, expires_at))
+        connection.commit()
+
+    def is_revoked(self, jti, now=None):
+        row = self._connection().execute(
+            "SELECT 1 FROM revoked_token WHERE jti = ? AND expires_at > ?", (jti, now or time.time())
+        ).fetchone()
+        return row is not None
+
+    def changes_since(self, sequence):
+        """(latest sequence, jtis revoked after sequence by any process)"""
+        rows = self._connection().execute(
+            "SELECT sequence, jti FROM revoked_token WHERE sequence > ? ORDER BY sequence", (sequence,)
+        ).fetchall()
+        if not rows:
+            return sequence, []
+        return rows[-1][0], [jti for _, jti in rows]
+
+    def active(self, now=None):
+        rows = self._connection().execute(
+            "SELECT jti FROM revoked_token WHERE expires_at > ?", (now or time.time(),)
+        ).fetchall()
+        return [jti for jti, in rows]
+
+    def purge(self, now=None):
+        connection = self._connection()
+        cursor = connection.execute("DELETE FROM revoked_token WHERE expires_at <= ?", (now or time.time(),))
+        connection.commit()
+        return cursor.rowcount
+
+    def __len__(self):
+        return self._connection().execute("SELECT count(*) FROM revoked_token").fetchone()[0]
+
+
+class TokenRevocationList:
+    """
+    JWT revocation checks with an in-process Bloom prefilter
+
+    A token that was never revoked - nearly every request - is answered from
+    the Bloom filter without touching the store. Possible hits are confirmed
+    against the store. Revocations made by other workers are pulled into the
+    filter at most sync_seconds after they happen.
+    """
+
+    def __init__(self, store, bloom_capacity=100000, error_rate=0.001, sync_seconds=1.0, purge_seconds=300):
+        self.store = store
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.purge_seconds = purge_seconds
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        self._next_purge = 0.0
+        self._sequence, _ = store.changes_since(0)
+        self._rebuild()
+
+    def _rebuild(self):
+        """Start a fresh filter from the live entries (drops expired tokens' bits)"""
+        bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+        for jti in self.store.active():
+            bloom.add(jti)
+        self.bloom = bloom
+
+    def _sync(self):
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_seconds
+            self._sequence, revoked = self.store.changes_since(self._sequence)
+            for jti in revoked:
+                self.bloom.add(jti)
+
+            if now >= self._next_purge:
+                self._next_purge = now + self.purge_seconds
+                if self.store.purge() or self.bloom.count > self.bloom.capacity:
+                    self._rebuild()
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until it expires
+
+        Args:
+            jti (str): Token ID
+            expires_at (float): The token's exp claim (Unix time)
+        """
+        self.store.revoke(jti, expires_at)
+        with self._lock:
+            self.bloom.add(jti)
+
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self.bloom:
+            return False
+        return self.store.is_revoked(jti)
+
+
+def create_revocation_store(config):
+    """Build the revocation store selected by JWT_REVOCATION_STORE"""
+    backend = config.get("JWT_REVOCATION_STORE", "sqlite")
+    if backend == "memory":
+        return MemoryRevocationStore(config.get("JWT_REVOCATION_BUCKET_SECONDS", 300))
+    if backend == "sqlite":
+        return SQLiteRevocationStore(config["JWT_REVOCATION_DB_PATH"])
+    raise ValueError(f"Unknown JWT revocation store: {backend}")
+
+
+def get_revocation_list():
+    """Get the application's token revocation list, creating it on first use"""
+    revocations = current_app.extensions.get("token_revocations")
+    if revocations is None:
+        revocations = TokenRevocationList(
+            create_revocation_store(current_app.config),
+            current_app.config.get("JWT_REVOCATION_BLOOM_CAPACITY", 100000),
+            sync_seconds=current_app.config.get("JWT_REVOCATION_SYNC_SECONDS", 1.0)
+        )
+        current_app.extensions["token_revocations"] = revocations
+    return revocations
@@ -1,44 +1,75 @@
-import qrcode
+import datetime
 import os
-from PIL import Image
 
-def generate_qr_code(certificate_id, base_url="http://localhost:3000"):
+# Legacy pre-rendered QR codes live here; new ones are rendered lazily (see qr_cache.py)
+QR_CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "qrcodes")
+
+def verification_url(certificate_id, base_url="http://localhost:3000", receipt=None):
     """
-    Generate QR code for certificate verification
+    Build the URL encoded in a certificate's QR code
     
     Args:
         certificate_id (str): The certificate ID
         base_url (str): Base URL for the frontend verification page
+        receipt (str): Optional signed receipt, embedded in the URL fragment
+    
+    Returns:
+        str: Verification URL
+    """
+    url = f"{base_url}/verify/{certificate_id}"
+    if receipt:
+        # Fragments are never sent to the server, so scanners can verify offline
+        url += f"#r={receipt}"
+    return url
+
+def qr_code_url(certificate_id):
+    """API path that serves (and lazily renders) a certificate's QR code"""
+    return f"/api/static/qrcodes/{certificate_id}.png"
+
+def legacy_qr_code_paths(certificate_id, qr_dir=QR_CODE_DIR):
+    """
+    Possible locations of a pre-rendered QR code PNG
+    
+    Returns:
+        list: Sharded path first, then the old flat static/qrcodes/<id>.png
+    """
+    from qr_cache import sharded_path
+    
+    return [
+        sharded_path(qr_dir, certificate_id, "png"),
+        os.path.join(qr_dir, f"{certificate_id}.png")
+    ]
+
+def generate_qr_code(certificate_id, base_url="http://localhost:3000", receipt=None,
+                     qr_dir=QR_CODE_DIR, output_format="png"):
+    """
+    Generate QR code for certificate verification and write it to disk
+    
+    Issuance no longer calls this; serve_qr_code renders on first request.
+    It is kept for scripts that need an image file eagerly.
+    
+    Args:
+        certificate_id (str): The certificate ID
+        base_url (str): Base URL for the frontend verification page
+        receipt (str): Optional signed receipt, embedded in the URL fragment
+        qr_dir (str): Root of the sharded QR directory
+        output_format (str): "png", "png1" (compact 1-bit) or "svg"
     
     Returns:
         str: Path to the generated QR code image
     """
     try:
-        # Create verification URL
-        verification_url = f"{base_url}/verify/{certificate_id}"
-        
-        # Create QR code instance
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
+        from qr_cache import OUTPUT_FORMATS, render_qr, sharded_path
         
-        # Add data and make QR code
-        qr.add_data(verification_url)
-        qr.make(fit=True)
+        image = render_qr(verification_url(certificate_id, base_url, receipt), output_format)
         
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Ensure directory exists
-        qr_dir = os.path.join("static", "qrcodes")
-        os.makedirs(qr_dir, exist_ok=True)
+        # Ensure shard directory exists
+        qr_path = sharded_path(qr_dir, certificate_id, OUTPUT_FORMATS[output_format][0])
+        os.makedirs(os.path.dirname(qr_path), exist_ok=True)
         
         # Save image
-        qr_path = os.path.join(qr_dir, f"{certificate_id}.png")
-        img.save(qr_path)
+        with open(qr_path, "wb") as image_file:
+            image_file.write(image)
         
         return qr_path
     
@@ -79,10 +110,14 @@ def validate_certificate_data(data):
     if len(degree) < 2 or len(degree) > 100:
         return False, "Degree must be 2-100 characters long"
     
-    # Validate issue_date format (basic check)
+    # Validate issue_date format (stored in a DATE column)
     issue_date = data["issue_date"]
     if len(issue_date) != 10 or issue_date.count("-") != 2:
         return False, "Issue date must be in YYYY-MM-DD format"
+    try:
+        datetime.date.fromisoformat(issue_date)
+    except ValueError:
+        return False, "Issue date must be a valid calendar date"
     
     return True, None
 
@@ -10,6 +10,9 @@ const AdminCertificates: React.FC = () => {
   const [certificates, setCertificates] = useState<Certificate[]>([]);
   const [filteredCertificates, setFilteredCertificates] = useState<Certificate[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [totalCount, setTotalCount] = useState<number | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState<'all' | 'active' | 'revoked'>('all');
   const [searchType, setSearchType] = useState<'all' | 'student' | 'degree' | 'id'>('all');
@@ -85,23 +88,36 @@ const AdminCertificates: React.FC = () => {
     link.click();
   };
 
+  // /certificates is paged (newest first, at most 500 per page); later pages are loaded on demand
+  const fetchPage = async (cursor?: string) => {
+    const response = await certificateAPI.getAllCertificates(
+      cursor ? { limit: 500, cursor } : { limit: 500, count: 'exact' }
+    );
+    const responseData = response.data as {
+      status: string;
+      data: { certificates: any[]; total_count: number | null; pagination: { next_cursor: string | null } };
+    };
+    const certs: Certificate[] = responseData.data.certificates.map((cert: any) => ({
+      id: cert.certificate_id,
+      studentName: cert.student_name,
+      degreeTitle: cert.degree,
+      issueDate: cert.issue_date,
+      status: cert.status || 'active',
+      createdAt: cert.issue_date,
+      blockHash: cert.qr_code_path ? 'verified' : '',
+      isValid: cert.status === 'active'
+    }));
+    setNextCursor(responseData.data.pagination.next_cursor);
+    return { certs, totalCount: responseData.data.total_count };
+  };
+
   const fetchCertificates = async () => {
     try {
       setIsLoading(true);
-      const response = await certificateAPI.getAllCertificates();
-      const responseData = response.data as { status: string; data: { certificates: any[] } };
-      const certs = responseData.data.certificates.map((cert: any) => ({
-        id: cert.certificate_id,
-        studentName: cert.student_name,
-        degreeTitle: cert.degree,
-        issueDate: cert.issue_date,
-        status: cert.status || 'active',
-        createdAt: cert.issue_date,
-        blockHash: cert.qr_code_path ? 'verified' : '',
-        isValid: cert.status === 'active'
-      }));
-      setCertificates(certs);
-      setFilteredCertificates(certs);
+      const page = await fetchPage();
+      setCertificates(page.certs);
+      setFilteredCertificates(page.certs);
+      setTotalCount(page.totalCount);
     } catch (error) {
       console.error('Failed to fetch certificates:', error);
       setToast({
@@ -114,6 +130,27 @@ const AdminCertificates: React.FC = () => {
     }
   };
 
+  const loadMoreCertificates = async () => {
+    if (!nextCursor) return;
+    try {
+      setIsLoadingMore(true);
+      const page = await fetchPage(nextCursor);
+      setCertificates(prev => [...prev, ...page.certs]);
+    } catch (error) {
+      console.error('Failed to load more certificates:', error);
+      setToast({
+        message: 'Failed to load more certificates. Please try again.',
+        type: 'error',
+        isVisible: true
+      });
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  // Total across all pages (falls back to the loaded rows if the count is unavailable)
+  const totalCertificates = totalCount ?? certificates.length;
+
   useEffect(() => {
     let filtered = certificates;
 
@@ -476,7 +513,7 @@ const AdminCertificates: React.FC = () => {
                     <Search className="h-4 w-4 mr-2" />
                     <span className="text-sm font-medium">
                       Found {filteredCertificates.length} certificate{filteredCertificates.length !== 1 ? 's' : ''} 
-                      {certificates.length > 0 && ` out of ${certificates.length} total`}
+                      {certificates.length > 0 && ` out of ${certificates.length} loaded (${totalCertificates} total)`}
                     </span>
                   </div>
                   {filteredCertificates.length === 0 && (
@@ -609,7 +646,17 @@ const AdminCertificates: React.FC = () => {
           {/* Summary */}
           {certificates.length > 0 && (
             <div className="mt-6 text-sm text-gray-600 dark:text-gray-400 text-center">
-              Showing {filteredCertificates.length} of {certificates.length} certificates
+              Showing {filteredCertificates.length} of {totalCertificates} certificates
+              {certificates.length < totalCertificates && ` (${certificates.length} loaded)`}
+              {nextCursor && (
+                <button
+                  onClick={loadMoreCertificates}
+                  disabled={isLoadingMore}
+                  className="ml-3 text-sm text-blue-600 dark:text-blue-400 hover:text-blue-800 dark:hover:text-blue-200 font-medium disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {isLoadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
         </div>
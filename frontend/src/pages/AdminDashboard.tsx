@@ -9,19 +9,26 @@ import {
   AlertCircle
 } from 'lucide-react';
 import AdminSidebar from '../components/AdminSidebar';
-import { certificateAPI } from '../services/api';
+import { certificateAPI, systemAPI } from '../services/api';
 import { Certificate } from '../types';
 
 const AdminDashboard: React.FC = () => {
   const [certificates, setCertificates] = useState<Certificate[]>([]);
+  const [totals, setTotals] = useState<{ total: number; active: number } | null>(null);
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
     const fetchCertificates = async () => {
       try {
         setIsLoading(true);
-        const response = await certificateAPI.getAllCertificates();
+        // The list is paged, so only the newest few are fetched; totals come from /stats
+        const [response, statsResponse] = await Promise.all([
+          certificateAPI.getAllCertificates({ limit: 5, count: 'none' }),
+          systemAPI.getStats()
+        ]);
         const responseData = response.data as { status: string; data: { certificates: any[] } };
+        const overview = (statsResponse.data as { data: { overview: { total_certificates: number; active_certificates: number } } }).data.overview;
+        setTotals({ total: overview.total_certificates, active: overview.active_certificates });
         const certs = responseData.data.certificates.map((cert: any) => ({
           id: cert.certificate_id,
           studentName: cert.student_name,
@@ -51,7 +58,7 @@ const AdminDashboard: React.FC = () => {
     { 
       icon: FileText, 
       label: 'Total Certificates', 
-      value: certificates.length.toString(),
+      value: (totals ? totals.total : certificates.length).toString(),
       change: '+12%',
       changeType: 'positive' as const
     },
@@ -65,7 +72,7 @@ const AdminDashboard: React.FC = () => {
     { 
       icon: Users, 
       label: 'Active Students', 
-      value: certificates.length > 0 ? certificates.length.toString() : '0',
+      value: (totals ? totals.active : certificates.length).toString(),
       change: '+5%',
       changeType: 'positive' as const
     },
@@ -78,7 +85,7 @@ const AdminDashboard: React.FC = () => {
     }
   ];
 
-  const recentCertificates = certificates.slice(-5).reverse();
+  const recentCertificates = certificates.slice(0, 5); // Newest first
 
   return (
     <div className="flex h-screen bg-gray-50 dark:bg-gray-900">
@@ -93,7 +93,11 @@ export const certificateAPI = {
   liveVerifyCertificate: (certificateId: string) =>
     api.get(`/verify/live/${certificateId}`),
   
-  getAllCertificates: () => api.get('/certificates'),
+  getAllCertificates: (params?: {
+    limit?: number;
+    cursor?: string;
+    count?: 'exact' | 'approx' | 'none';
+  }) => api.get('/certificates', { params }),
   
   searchCertificates: (params: {
     q?: string;
@@ -102,6 +106,8 @@ export const certificateAPI = {
     date_to?: string;
     limit?: number;
     offset?: number;
+    cursor?: string;
+    count?: 'exact' | 'approx' | 'none';
   }) => api.get('/search', { params }),
   
   // Debug certificate